@@ -0,0 +1,91 @@
+"""
+Hot/cold split: task list reads before and after `archive_tasks`.
+
+Seeds `--assignments` rows (60% finished, end dates over the year before
+the seeding anchor), times the member task list (`view/`) and the full
+team task list (`dashboard/` without paging) with their payload sizes,
+archives finished assignments that ended over `--older-than` days before
+the anchor, and times the same reads again.
+
+    python benchmarks/bench_archive.py --assignments 1000000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import timedelta
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--assignments', type=int, default=200_000)
+    parser.add_argument('--members-per-team', type=int, default=50)
+    parser.add_argument('--tasks-per-member', type=int, default=100)
+    parser.add_argument('--older-than', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--samples', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django('bench_archive.sqlite3')
+    migrate()
+    per_team = args.members_per_team * args.tasks_per_member
+    seed(max(1, args.assignments // per_team), args.members_per_team, args.tasks_per_member)
+
+    from django.db import reset_queries
+    from core import models
+    from core.seeding import DEFAULT_ANCHOR
+    from core.repositories import TeamMemberTaskRepository
+    from core.services import TaskService
+    from core.views import _serialize_dashboard_task, _serialize_member_task
+
+    rng = random.Random(1)
+    members = list(models.Member.objects.all())
+    teams = list(models.Team.objects.all())
+    picks_m = [rng.choice(members) for _ in range(args.samples)]
+    picks_t = [rng.choice(teams) for _ in range(args.samples)]
+
+    def measure(fn, keys):
+        """Mean ms and JSON bytes per call."""
+        size = 0
+        start = time.perf_counter()
+        for key in keys:
+            size += len(json.dumps(fn(key)))
+        reset_queries()
+        return ((time.perf_counter() - start) * 1000 / len(keys), size // len(keys))
+
+    def member_list(member):
+        return [_serialize_member_task(row) for row in TeamMemberTaskRepository.get_rows_for_member(member)]
+
+    def team_list(team):
+        return [_serialize_dashboard_task(row) for row in TeamMemberTaskRepository.get_rows_for_team(team)]
+
+    def reads():
+        return [measure(member_list, picks_m), measure(team_list, picks_t)]
+
+    before = reads()
+    cutoff = DEFAULT_ANCHOR - timedelta(days=args.older_than)
+    start = time.perf_counter()
+    archived = 0
+    while True:
+        n = TaskService.archive_finished(cutoff, args.batch_size)
+        archived += n
+        if n < args.batch_size:
+            break
+    elapsed = time.perf_counter() - start
+    after = reads()
+
+    rows = [
+        (label, f'{b[0]:.2f}', f'{a[0]:.2f}', b[1], a[1])
+        for label, b, a in zip(('member task list', 'team task list'), before, after)
+    ]
+    print_table(
+        f'archived {archived} of {archived + models.TeamMemberTask.objects.count()} assignments in '
+        f'{elapsed:.1f}s ({archived / max(elapsed, 1e-9):.0f} rows/s)',
+        rows, ('read', 'ms before', 'ms after', 'bytes before', 'bytes after'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Throughput of the async (ASGI) read path against the sync (WSGI) path.
+
+Seeds one scratch database, then runs each mode in its own process so the
+URLconf picks up the right views:
+
+- wsgi: sync views driven by `--concurrency` threads, as a threaded WSGI
+  worker would run them;
+- asgi: async views (TASKFLOW_ASYNC_VIEWS=True) driven by `--concurrency`
+  concurrent coroutines on one event loop.
+
+Both go through Django's real request handlers and full middleware stack
+(via the test clients), so no server is required.
+
+    python benchmarks/bench_asgi.py --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from common import migrate, print_table, seed, setup_django
+
+ENDPOINTS = ('/view/', '/dashboard/?limit=100')
+
+
+def _session_key(username):
+    from django.contrib.sessions.backends.db import SessionStore
+
+    session = SessionStore()
+    session['member_username'] = username
+    session.save()
+    return session.session_key
+
+
+def run_wsgi(concurrency, total, path, username):
+    from django.conf import settings
+    from django.test import Client
+
+    key = _session_key(username)
+
+    def worker(n):
+        client = Client(HTTP_ACCEPT='application/json')
+        client.cookies[settings.SESSION_COOKIE_NAME] = key
+        for _ in range(n):
+            assert client.get(path, secure=True).status_code == 200
+
+    per_worker = total // concurrency
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, [per_worker] * concurrency))
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+def run_asgi(concurrency, total, path, username):
+    from django.conf import settings
+    from django.test import AsyncClient
+
+    key = _session_key(username)
+
+    async def worker(n):
+        client = AsyncClient(headers={'Accept': 'application/json'})
+        client.cookies[settings.SESSION_COOKIE_NAME] = key
+        for _ in range(n):
+            response = await client.get(path, secure=True)
+            assert response.status_code == 200
+
+    async def main():
+        per_worker = total // concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+def child(args):
+    if args.mode == 'asgi':
+        os.environ['TASKFLOW_ASYNC_VIEWS'] = 'True'
+    setup_django()
+    from core import models
+
+    admin = models.TeamMember.objects.filter(is_admin=True).select_related('member').first().member
+    runner = run_asgi if args.mode == 'asgi' else run_wsgi
+    results = {path: runner(args.concurrency, args.requests, path, admin.username) for path in ENDPOINTS}
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), help=argparse.SUPPRESS)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--members-per-team', type=int, default=20)
+    parser.add_argument('--tasks-per-member', type=int, default=25)
+    args = parser.parse_args()
+    if args.mode:
+        return child(args)
+
+    db_path = Path(tempfile.gettempdir()) / 'bench_asgi.sqlite3'
+    setup_django(db_path.name)
+    migrate()
+    seed(args.teams, args.members_per_team, args.tasks_per_member)
+
+    # Production-like settings: no per-query debug logging.
+    env = dict(os.environ, BENCH_DATABASE_URL=f'sqlite:///{db_path}', DEBUG='False', ALLOWED_HOSTS='testserver')
+    rows = {}
+    for mode in ('wsgi', 'asgi'):
+        out = subprocess.run(
+            [sys.executable, __file__, '--mode', mode,
+             '--concurrency', str(args.concurrency), '--requests', str(args.requests)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        rows[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print_table(
+        f'requests/s at concurrency {args.concurrency}',
+        [(path, f"{rows['wsgi'][path]:.0f}", f"{rows['asgi'][path]:.0f}") for path in ENDPOINTS],
+        ('endpoint', 'wsgi (sync)', 'asgi (async)'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Deadline reminders: one `scan_deadlines` run over a large table.
+
+Seeds `--assignments` rows, then times each phase of a run as of a day
+inside the seeded date range (scan, deliver into the locmem backend, a
+rescan that must queue nothing) with its query count and peak Python
+memory, against loading every open assignment in the window at once.
+
+    python benchmarks/bench_deadlines.py --assignments 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import timedelta
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--assignments', type=int, default=200_000)
+    parser.add_argument('--members-per-team', type=int, default=50)
+    parser.add_argument('--tasks-per-member', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--due-within', type=int, default=1)
+    parser.add_argument('--overdue-days', type=int, default=7)
+    args = parser.parse_args()
+
+    setup_django('bench_deadlines.sqlite3')
+    migrate()
+    per_team = args.members_per_team * args.tasks_per_member
+    seed(max(1, args.assignments // per_team), args.members_per_team, args.tasks_per_member)
+
+    from django.core import mail
+    from django.db import connection, reset_queries
+    from core import deadlines, models
+    from core.seeding import DEFAULT_ANCHOR
+
+    today = DEFAULT_ANCHOR - timedelta(days=30)
+    sink = deadlines.get_sink('locmem')
+    mail.outbox = []
+
+    def measure(label, fn):
+        reset_queries()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        return (label, result, f'{elapsed:.1f}', len(connection.queries), f'{peak:.1f}')
+
+    def load_all():
+        start = today - timedelta(days=args.overdue_days)
+        end = today + timedelta(days=args.due_within)
+        return len(list(
+            models.TeamMemberTask.objects.filter(is_finish=False, end_date__gte=start, end_date__lte=end)
+            .select_related('task', 'team_member__member', 'team_member__team')
+        ))
+
+    window = (args.due_within, args.overdue_days, args.batch_size)
+    rows = [
+        measure('scan', lambda: deadlines.scan(today, *window)),
+        measure('deliver', lambda: deadlines.deliver(sink, today, max(1, args.batch_size // 10))[0]),
+        measure('rescan', lambda: deadlines.scan(today, *window)),
+        measure('load window at once', load_all),
+    ]
+    print_table(
+        f'scan_deadlines as of {today} ({models.TeamMemberTask.objects.count()} assignments, '
+        f'batches of {args.batch_size})',
+        rows, ('phase', 'rows/digests', 'ms', 'queries', 'peak MiB'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Cost of idle events/ subscribers and of fanning an event out to them.
+
+Opens N event streams against the in-process broker (as the SSE view does),
+reports the memory held per idle stream, then times one team event
+delivered to every stream.
+
+    python benchmarks/bench_events.py --streams 10000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from common import print_table, setup_django
+
+
+async def run(streams, teams):
+    from core import async_views
+    from core.events import LocalBroker, team_channel
+
+    broker = LocalBroker()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    subscriptions = [broker.subscribe([team_channel(i % teams)]) for i in range(streams)]
+    readers = [async_views._event_stream(s) for s in subscriptions]
+    for reader in readers:
+        await anext(reader)  # retry: frame
+    pending = [asyncio.ensure_future(anext(reader)) for reader in readers]
+    await asyncio.sleep(0.1)
+    per_stream = (tracemalloc.get_traced_memory()[0] - base) / streams
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for team in range(teams):
+        broker.publish(team_channel(team), {'kind': 'task', 'action': 'saved', 'id': 1, 'version': 1})
+    await asyncio.gather(*pending)
+    fanout = time.perf_counter() - start
+
+    for reader in readers:
+        await reader.aclose()
+    return per_stream, fanout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--streams', type=int, default=10_000)
+    parser.add_argument('--teams', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django('bench_events.sqlite3')
+    per_stream, fanout = asyncio.run(run(args.streams, args.teams))
+    print_table(f'{args.streams} idle streams over {args.teams} teams', [
+        ('memory per idle stream', f'{per_stream / 1024:.1f} KiB'),
+        ('deliver one event to every stream', f'{fanout * 1000:.0f} ms'),
+    ], ('measure', 'value'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Bulk member import cost at the configured password work factors.
+
+Imports `--rows` members with plain-text passwords through
+`TeamService.import_members`, which hashes them with
+`TASKFLOW_IMPORT_PASSWORD_ITERATIONS`, then times `--sample` hashes at the
+full `TASKFLOW_PASSWORD_ITERATIONS` and extrapolates what the same import
+would cost at that work factor. Uses the settings' defaults unless the
+environment overrides them.
+
+    python benchmarks/bench_import.py --rows 10000
+"""
+import argparse
+import io
+import time
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--sample', type=int, default=10, help='Full-strength hashes to time')
+    args = parser.parse_args()
+
+    setup_django('bench_import.sqlite3')
+    migrate()
+    seed(1, 2, 1)
+
+    from django.conf import settings
+    from core import models
+    from core.hashers import PBKDF2PasswordHasher
+    from core.importers import iter_member_rows
+    from core.passwords import hash_passwords
+    from core.services import TeamService
+
+    admin = models.Member.objects.get(teammember__is_admin=True)
+    body = 'username,name,gmail,password\n' + ''.join(
+        f'imp{i},Imported {i},imp{i}@example.com,pw-{i}\n' for i in range(args.rows)
+    )
+
+    start = time.perf_counter()
+    summary, _ = TeamService.import_members(admin, iter_member_rows(io.BytesIO(body.encode()), 'csv'))
+    imported = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hash_passwords((f'pw-{i}' for i in range(args.sample)), hasher=PBKDF2PasswordHasher())
+    per_row = (time.perf_counter() - start) / args.sample
+
+    print_table(
+        f"Importing {summary['created']} members",
+        [
+            (settings.TASKFLOW_IMPORT_PASSWORD_ITERATIONS, f'{imported:.1f}', 'measured'),
+            (settings.TASKFLOW_PASSWORD_ITERATIONS, f'{per_row * args.rows:.1f}',
+             f'extrapolated from {args.sample} hashes'),
+        ],
+        ('PBKDF2 iterations', 's', ''),
+    )
+
+
+if __name__ == '__main__':
+    main()
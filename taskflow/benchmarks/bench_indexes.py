@@ -0,0 +1,125 @@
+"""
+Before/after benchmark for the 0004 query indexes.
+
+Seeds a dataset, drops the 0004 indexes (composite indexes and the unique
+`name_task`) to get the schema as of 0003, times the hot repository
+queries, restores the indexes and times them again on the same rows.
+
+    python benchmarks/bench_indexes.py --assignments 1000000
+"""
+import argparse
+import random
+import time
+
+from common import migrate, print_table, seed, setup_django
+
+
+def run_queries(samples, members, teams, task_names):
+    """Time each access pattern over `samples` random keys; returns {label: ms/op}."""
+    from django.db import reset_queries
+    from core.models import Task
+    from core.repositories import TeamMemberRepository, TeamMemberTaskRepository
+
+    rng = random.Random(1)
+    picks_m = [rng.choice(members) for _ in range(samples)]
+    picks_t = [rng.choice(teams) for _ in range(samples)]
+    picks_n = [rng.choice(task_names) for _ in range(samples)]
+    timings = {}
+
+    def measure(label, fn, keys):
+        start = time.perf_counter()
+        for key in keys:
+            fn(key)
+        reset_queries()
+        timings[label] = (time.perf_counter() - start) * 1000 / len(keys)
+
+    measure('get_admin_for_member', TeamMemberRepository.get_admin_for_member, picks_m)
+    measure('member open tasks', lambda m: list(
+        TeamMemberTaskRepository.get_all_for_member(m).filter(is_finish=False).order_by('end_date')
+    ), picks_m)
+    measure('member task rows', lambda m: list(TeamMemberTaskRepository.get_rows_for_member(m)), picks_m)
+    measure('team dashboard page', lambda t: list(TeamMemberTaskRepository.get_rows_for_team(t, limit=100)), picks_t)
+    # The database lookup behind TaskRepository.get_or_create_id, bypassing the name cache.
+    measure('task id by name', lambda n: Task.objects.filter(name_task=n).values_list('id').first(), picks_n)
+    return timings
+
+
+INDEXES_0004 = ('core_tm_member_admin_idx', 'core_tmt_member_finish_idx')
+
+
+def _name_task_fields():
+    from core import models
+
+    unique = models.Task._meta.get_field('name_task')
+    plain = unique.clone()
+    plain._unique = False
+    plain.set_attributes_from_name('name_task')
+    plain.model = models.Task
+    return plain, unique
+
+
+def drop_indexes():
+    """Bring the indexes back to their 0003 state; the rest of the schema stays current."""
+    from django.db import connection
+    from core import models
+
+    plain, unique = _name_task_fields()
+    with connection.schema_editor() as editor:
+        for model in (models.TeamMember, models.TeamMemberTask):
+            for index in model._meta.indexes:
+                if index.name in INDEXES_0004:
+                    editor.remove_index(model, index)
+        editor.alter_field(models.Task, unique, plain)
+
+
+def restore_indexes():
+    from django.db import connection
+    from core import models
+
+    plain, unique = _name_task_fields()
+    with connection.schema_editor() as editor:
+        for model in (models.TeamMember, models.TeamMemberTask):
+            for index in model._meta.indexes:
+                if index.name in INDEXES_0004:
+                    editor.add_index(model, index)
+        editor.alter_field(models.Task, plain, unique)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--assignments', type=int, default=1_000_000)
+    parser.add_argument('--members-per-team', type=int, default=50)
+    parser.add_argument('--tasks-per-member', type=int, default=20)
+    parser.add_argument('--samples', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django('bench_indexes.sqlite3')
+    migrate()
+
+    per_team = args.members_per_team * args.tasks_per_member
+    teams = max(1, args.assignments // per_team)
+    start = time.perf_counter()
+    created = seed(teams, args.members_per_team, args.tasks_per_member)
+    print(f'seeded {created} assignments across {teams} teams in {time.perf_counter() - start:.1f}s')
+    drop_indexes()
+
+    from core import models
+    members = list(models.Member.objects.all()[: args.samples * 5])
+    team_objs = list(models.Team.objects.all()[: args.samples * 5])
+    names = list(models.Task.objects.values_list('name_task', flat=True)[: args.samples * 5])
+
+    before = run_queries(args.samples, members, team_objs, names)
+    start = time.perf_counter()
+    restore_indexes()
+    print(f'restored 0004 indexes in {time.perf_counter() - start:.1f}s')
+    after = run_queries(args.samples, members, team_objs, names)
+
+    rows = [
+        (label, f'{before[label]:.3f}', f'{after[label]:.3f}', f'{before[label] / after[label]:.1f}x')
+        for label in before
+    ]
+    print_table('ms per call', rows, ('query', 'before', 'after', 'speedup'))
+
+
+if __name__ == '__main__':
+    main()
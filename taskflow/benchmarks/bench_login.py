@@ -0,0 +1,91 @@
+"""
+Login throughput with hashed passwords.
+
+Runs a login storm through `AuthService.login` (sync, one thread per
+simulated worker) and `AuthService.alogin` (async, one coroutine per
+client), and while the async storm runs measures how late a 10 ms ticker
+on the same event loop fires. A low tick delay shows verification is off
+the loop.
+
+    python benchmarks/bench_login.py --clients 32 --logins 256 --iterations 600000
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=256)
+    parser.add_argument('--iterations', type=int, help='PBKDF2 work factor (default: settings)')
+    parser.add_argument('--workers', type=int, help='password pool size (default: CPU count)')
+    args = parser.parse_args()
+
+    if args.iterations:
+        os.environ['TASKFLOW_PASSWORD_ITERATIONS'] = str(args.iterations)
+    if args.workers:
+        os.environ['TASKFLOW_PASSWORD_WORKERS'] = str(args.workers)
+    setup_django('bench_login.sqlite3')
+    migrate()
+    seed(1, args.clients, 0)
+
+    from django.conf import settings
+    from django.db import close_old_connections
+    from core.services import AuthService
+
+    usernames = [f'user0_{i}' for i in range(args.clients)]
+    per_client = max(1, args.logins // args.clients)
+    total = per_client * args.clients
+    rows = []
+
+    def sync_client(username):
+        for _ in range(per_client):
+            member, _, error = AuthService.login(username, 'secret')
+            assert member and not error, error
+        close_old_connections()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(sync_client, usernames))
+    elapsed = time.perf_counter() - start
+    rows.append(('sync login', f'{total / elapsed:.1f}', '-'))
+
+    async def storm():
+        delays = []
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                expected = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                delays.append(time.perf_counter() - expected)
+
+        async def client(username):
+            for _ in range(per_client):
+                member, _, error = await AuthService.alogin(username, 'secret')
+                assert member and not error, error
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(client(u) for u in usernames))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await tick
+        return elapsed, max(delays) * 1000 if delays else 0.0
+
+    elapsed, worst_tick = asyncio.run(storm())
+    rows.append(('async login', f'{total / elapsed:.1f}', f'{worst_tick:.1f}'))
+
+    print_table(
+        f'{total} logins, {args.clients} clients, {settings.TASKFLOW_PASSWORD_ITERATIONS} PBKDF2 iterations',
+        rows, ('path', 'logins/s', 'worst loop delay ms'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Member removal: deleting a member with a long task history.
+
+Seeds one small team, gives one member `--tasks` assignments, then times
+`TeamMemberRepository.delete_member` (batched DELETEs) against Django's
+collector (`member.delete()` with its per-assignment signals) on a copy
+of the same history, with query counts and peak Python memory. Each
+path commits as it does in production: a transaction per batch for
+`delete_member`, one for the collector.
+
+    python benchmarks/bench_member_removal.py --tasks 20000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import date
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--skip-collector', action='store_true',
+                        help='Only time the batched removal')
+    args = parser.parse_args()
+
+    setup_django('bench_member_removal.sqlite3')
+    migrate()
+    seed(1, 3, 10)
+
+    from django.db import connection
+    from core import models
+    from core.repositories import TeamMemberRepository
+
+    team = models.Team.objects.get()
+    task = models.Task.objects.first()
+
+    def make_member(username):
+        member = models.Member.objects.create(username=username, name=username, gmail=f'{username}@example.com')
+        tm = models.TeamMember.objects.create(team=team, member=member)
+        models.TeamMemberTask.objects.bulk_create(
+            [
+                models.TeamMemberTask(task=task, team_member=tm, start_date=date(2024, 1, 1),
+                                      end_date=date(2024, 1, 2))
+                for _ in range(args.tasks)
+            ],
+            batch_size=5000,
+        )
+        return member
+
+    def measure(label, fn):
+        # Counted here rather than from connection.queries, whose log is
+        # capped below what the collector issues.
+        queries = 0
+
+        def count(execute, *args):
+            nonlocal queries
+            queries += 1
+            return execute(*args)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with connection.execute_wrapper(count):
+            fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        return (label, f'{elapsed:.1f}', queries, f'{peak:.1f}')
+
+    member = make_member('bench_batched')
+    rows = [measure('delete_member', lambda: TeamMemberRepository.delete_member(member, args.batch_size))]
+    if not args.skip_collector:
+        member = make_member('bench_collector')
+        rows.append(measure('member.delete()', member.delete))
+    print_table(
+        f'Removing a member with {args.tasks} assignments (batches of {args.batch_size})',
+        rows, ('path', 'ms', 'queries', 'peak MiB'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Read replica routing with two SQLite files.
+
+The primary and the replica are scratch SQLite files; `copy_replica` plays
+replication, so the replica lags until the next copy. The script reports
+where the queries of GET dashboard/ went (replica reads skip the dashboard
+cache, see `core.routers`), then shows read-your-writes: the
+admin who added a task sees it right away (pinned to the primary), while
+another browser only sees it after the next copy.
+
+    python benchmarks/bench_replica.py --requests 200
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+from importlib import import_module
+from pathlib import Path
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    replica_path = Path(tempfile.gettempdir()) / 'bench_replica_copy.sqlite3'
+    os.environ['REPLICA_DATABASE_URL'] = f'sqlite:///{replica_path}'
+    os.environ.setdefault('DEBUG', 'False')
+    os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+    setup_django('bench_replica.sqlite3')
+    migrate()
+    seed(5, 20, 20)
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from core import models
+    from core.routers import PIN_COOKIE
+
+    call_command('copy_replica', stdout=io.StringIO())
+    tm = models.TeamMember.objects.filter(is_admin=True).select_related('member').first()
+
+    def client():
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store['member_username'] = tm.member.username
+        store.save()
+        browser = Client(HTTP_ACCEPT='application/json')
+        browser.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        return browser
+
+    def dashboard(browser):
+        response = browser.get('/dashboard/', secure=True)
+        assert response.status_code == 200, response.status_code
+        return response.content.decode()
+
+    writer, reader = client(), client()
+    rows = []
+    for label, pinned in (('replica', False), ('primary (pinned)', True)):
+        if pinned:
+            writer.cookies[PIN_COOKIE] = '1'
+        else:
+            writer.cookies.pop(PIN_COOKIE, None)
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                dashboard(writer)
+            elapsed = time.perf_counter() - start
+        rows.append((
+            label,
+            f'{len(primary.captured_queries) / args.requests:.1f}',
+            f'{len(replica.captured_queries) / args.requests:.1f}',
+            f'{elapsed * 1000 / args.requests:.2f}',
+        ))
+    print_table(f'GET dashboard/ ({args.requests} requests)', rows,
+                ('reads from', 'primary q/req', 'replica q/req', 'ms/req'))
+
+    writer.cookies.pop(PIN_COOKIE, None)
+    response = writer.post('/add-task/', {
+        'task_name': 'Replica lag probe', 'team_member_id': tm.id,
+        'start_date': '2030-01-01', 'end_date': '2030-01-02',
+    }, secure=True)
+    assert response.status_code in (200, 201), response.status_code
+    # The reader goes first: the writer's pinned GET refills the dashboard
+    # cache with fresh data, which the reader would then be served.
+    visible = [
+        ('other browser, before copy', 'Replica lag probe' in dashboard(reader)),
+        ('writer, pinned after POST', 'Replica lag probe' in dashboard(writer)),
+    ]
+    call_command('copy_replica', stdout=io.StringIO())
+    visible.append(('other browser, after copy', 'Replica lag probe' in dashboard(reader)))
+    print_table('Read-your-writes', visible, ('request', 'sees new task'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Team search: the token index behind `search/` against `icontains` scans.
+
+Seeds `--assignments` rows, then for a few query shapes times one page of
+`ViewService.search_team` (index range scan plus the page's rows) and the
+same lookup written as `icontains` filters over the team's assignments
+and members, for random admins.
+
+    python benchmarks/bench_search.py --assignments 1000000
+"""
+import argparse
+import random
+import time
+
+from common import migrate, print_table, seed, setup_django
+
+QUERIES = ('ta', 'task 12', '12', 'ask 4', 'user', '3-1')
+
+
+def icontains_page(team, query, limit):
+    """The naive lookup: substring filters over the team's rows, one page of each kind."""
+    from django.db.models import Q
+    from core import models
+
+    tasks = list(
+        models.TeamMemberTask.objects.filter(team_member__team=team, task__name_task__icontains=query)
+        .values_list('task_id', flat=True).distinct().order_by('task_id')[:limit]
+    )
+    members = list(
+        models.TeamMember.objects.filter(team=team)
+        .filter(Q(member__name__icontains=query) | Q(member__username__icontains=query))
+        .values_list('id', flat=True).order_by('id')[:limit]
+    )
+    return tasks + members
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--assignments', type=int, default=200_000)
+    parser.add_argument('--members-per-team', type=int, default=50)
+    parser.add_argument('--tasks-per-member', type=int, default=100)
+    parser.add_argument('--samples', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django('bench_search.sqlite3')
+    migrate()
+    per_team = args.members_per_team * args.tasks_per_member
+    seed(max(1, args.assignments // per_team), args.members_per_team, args.tasks_per_member)
+
+    from django.db import reset_queries
+    from core import models
+    from core.services import ViewService
+
+    admins = list(models.TeamMember.objects.filter(is_admin=True).select_related('team', 'member'))
+    rng = random.Random(1)
+    picks = [rng.choice(admins) for _ in range(args.samples)]
+
+    def measure(fn):
+        start = time.perf_counter()
+        for admin_tm in picks:
+            fn(admin_tm)
+        reset_queries()
+        return (time.perf_counter() - start) * 1000 / len(picks)
+
+    rows = []
+    for query in QUERIES:
+        indexed = measure(lambda tm: ViewService.search_team(tm.member, query, limit=args.limit, admin_tm=tm))
+        scanned = measure(lambda tm: icontains_page(tm.team, query, args.limit))
+        rows.append((repr(query), f'{indexed:.2f}', f'{scanned:.2f}'))
+    print_table(
+        f'search, ms per page of {args.limit} ({models.TeamMemberTask.objects.count()} assignments, '
+        f'{models.SearchToken.objects.count()} tokens)',
+        rows, ('query', 'token index', 'icontains'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-request cost of each session engine, and batched purging.
+
+Replays GET view/ (as a member) and GET dashboard/ (as an admin) under
+every `TASKFLOW_SESSION_ENGINES` entry and reports SQL statements and
+milliseconds per request. Then fills the session table with expired rows
+and times `manage.py purge_sessions`.
+
+    python benchmarks/bench_sessions.py --requests 500 --expired 200000
+"""
+import argparse
+import io
+import os
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from common import migrate, print_table, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--expired', type=int, default=100_000, help='Expired sessions to purge')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DEBUG', 'False')
+    os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+    setup_django('bench_sessions.sqlite3')
+    migrate()
+    seed(5, 20, 20)
+
+    from django.conf import settings
+    from django.contrib.sessions.models import Session
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from core import models
+
+    admin = models.TeamMember.objects.filter(is_admin=True).select_related('member').first().member
+    member = models.TeamMember.objects.filter(is_admin=False).select_related('member').first().member
+
+    def client_for(engine, username):
+        store = import_module(engine).SessionStore()
+        store['member_username'] = username
+        store.save()
+        client = Client(HTTP_ACCEPT='application/json')
+        client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        return client
+
+    rows = []
+    for name, engine in settings.TASKFLOW_SESSION_ENGINES.items():
+        with override_settings(SESSION_ENGINE=engine):
+            cache.clear()
+            for path, user in (('/view/', member), ('/dashboard/', admin)):
+                client = client_for(engine, user.username)
+                client.get(path, secure=True)  # warm caches
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    for _ in range(args.requests):
+                        response = client.get(path, secure=True)
+                        assert response.status_code == 200, response.status_code
+                    elapsed = time.perf_counter() - start
+                rows.append((
+                    name, path,
+                    f'{len(ctx.captured_queries) / args.requests:.1f}',
+                    f'{elapsed * 1000 / args.requests:.2f}',
+                ))
+    print_table(f'Session engines ({args.requests} requests each)', rows, ('engine', 'path', 'queries/req', 'ms/req'))
+
+    expire = timezone.now() - timedelta(days=1)
+    Session.objects.bulk_create(
+        (Session(session_key=f'expired{i:012d}', session_data='', expire_date=expire) for i in range(args.expired)),
+        batch_size=5000,
+    )
+    start = time.perf_counter()
+    call_command('purge_sessions', batch_size=args.batch_size, stdout=io.StringIO())
+    elapsed = time.perf_counter() - start
+    print_table('purge_sessions', [(args.expired, args.batch_size, f'{elapsed:.2f}')],
+                ('expired rows', 'batch size', 'seconds'))
+
+
+if __name__ == '__main__':
+    main()
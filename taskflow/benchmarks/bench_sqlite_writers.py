@@ -0,0 +1,127 @@
+"""
+Concurrent writers and readers on SQLite, with and without the tuned profile
+(TASKFLOW_SQLITE_TUNED, see settings.py).
+
+Each mode runs in its own process against a fresh database file. Writer
+threads loop over `TaskService.add_task` followed by `mark_task_complete`
+for the new assignment; reader threads loop over
+`ViewService.get_member_tasks`. Reported per mode: committed writes per
+second, writes that failed with "database is locked", and reader latency.
+
+    python benchmarks/bench_sqlite_writers.py --writers 8 --readers 4 --seconds 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from common import migrate, print_table, seed, setup_django
+
+MODES = {'plain': 'False', 'tuned': 'True'}
+
+
+def child(args):
+    os.environ['TASKFLOW_SQLITE_TUNED'] = MODES[args.mode]
+    setup_django(f'bench_writers_{args.mode}.sqlite3')
+    migrate()
+    seed(1, args.writers + args.readers, 20)
+
+    from django.db import OperationalError, connection
+    from core import models
+    from core.services import TaskService, ViewService
+
+    admin_tm = models.TeamMember.objects.filter(is_admin=True).select_related('team', 'member').first()
+    members = list(models.TeamMember.objects.filter(team=admin_tm.team).select_related('member'))
+    # Nothing is written until the threads start.
+    connection.close()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    counts = {'writes': 0, 'locked': 0}
+    latencies = []
+
+    def writer(tm):
+        start, end = date.today(), date.today() + timedelta(days=7)
+        n = 0
+        while not stop.is_set():
+            n += 1
+            try:
+                tmt, error = TaskService.add_task(
+                    admin_tm.member, f'Stress {tm.id} {n}', tm.id, start, end, admin_tm=admin_tm,
+                )
+                assert error is None, error
+                error = TaskService.mark_task_complete(tm.member, tmt.id)
+                assert error is None, error
+                outcome = 'writes'
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                outcome = 'locked'
+            with lock:
+                counts[outcome] += 1
+        connection.close()
+
+    def reader(tm):
+        seen = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            list(ViewService.get_member_tasks(tm.member))
+            seen.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(seen)
+        connection.close()
+
+    threads = [threading.Thread(target=writer, args=(tm,)) for tm in members[:args.writers]]
+    threads += [threading.Thread(target=reader, args=(tm,)) for tm in members[args.writers:]]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    print(json.dumps({
+        'writes/s': counts['writes'] / args.seconds,
+        'locked': counts['locked'],
+        'read p50 ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'read p99 ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    if args.mode:
+        return child(args)
+
+    # Production-like settings: no per-query debug logging.
+    env = dict(os.environ, DEBUG='False')
+    env.pop('BENCH_DATABASE_URL', None)
+    rows = []
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--writers', str(args.writers),
+             '--readers', str(args.readers), '--seconds', str(args.seconds)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        rows.append((mode, *(f'{value:.1f}' if isinstance(value, float) else value for value in result.values())))
+
+    print_table(
+        f'{args.writers} writers, {args.readers} readers, {args.seconds:g}s',
+        rows, ('profile', 'writes/s', 'locked', 'read p50 ms', 'read p99 ms'),
+    )
+
+
+if __name__ == '__main__':
+    main()
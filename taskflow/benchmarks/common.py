@@ -0,0 +1,72 @@
+"""
+Shared helpers for the standalone benchmark scripts in this directory.
+
+Benchmarks never touch the development `db.sqlite3`: `setup_django` points
+Django at a scratch SQLite file (or at `BENCH_DATABASE_URL` when set) before
+settings are loaded.
+
+Run any script from the project root, e.g.::
+
+    python benchmarks/bench_indexes.py --assignments 1000000
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_name='bench.sqlite3'):
+    """Configure Django against a scratch database and return its URL."""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    db_url = os.environ.get('BENCH_DATABASE_URL')
+    if not db_url:
+        db_path = Path(tempfile.gettempdir()) / db_name
+        # A stale WAL file would be replayed into the fresh database.
+        for path in (db_path, db_path.with_name(db_name + '-wal'), db_path.with_name(db_name + '-shm')):
+            if path.exists():
+                path.unlink()
+        db_url = f'sqlite:///{db_path}'
+    os.environ['DATABASE_URL'] = db_url
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskflow.settings')
+
+    import django
+    django.setup()
+    return db_url
+
+
+def migrate(target=None):
+    """Apply core migrations up to `target` (all of them when None)."""
+    from django.core.management import call_command
+
+    args = ['core', target] if target else []
+    call_command('migrate', *args, verbosity=0)
+
+
+def seed(teams, members_per_team, tasks_per_member, **kwargs):
+    """Seed the scratch database; see `core.seeding.seed_dataset`."""
+    from core.seeding import seed_dataset
+
+    return seed_dataset(teams, members_per_team, tasks_per_member, **kwargs)['assignments']
+
+
+@contextmanager
+def timer(results, label):
+    """Append `(label, seconds)` to `results` for the wrapped block."""
+    start = time.perf_counter()
+    yield
+    results.append((label, time.perf_counter() - start))
+
+
+def print_table(title, rows, headers):
+    """Print a small fixed-width results table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print(f'\n{title}')
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
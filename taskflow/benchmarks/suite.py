@@ -0,0 +1,481 @@
+"""
+Benchmark suite for the service layer and every view.
+
+Seeds a scratch database with `manage.py seed_benchmark_data`, then runs
+each case `--repeat` times inside a rolled-back transaction, recording:
+
+- seconds: median wall time over the repeats;
+- queries: SQL statements issued by one run;
+- peak_kib: peak Python memory allocated during one run (tracemalloc).
+
+Results are compared with a stored baseline and the script exits with
+status 1 when a case regresses: more queries than the baseline, or time or
+memory above the baseline by more than `--threshold` (plus a small absolute
+noise floor). A missing baseline file is an error, not a skipped check.
+
+benchmarks/baseline.json is committed as the reference; re-record it with
+--save-baseline in the change that moves a number on purpose. Its query
+counts hold on any machine, but wall times are machine-specific: CI should
+check out the base commit, record a baseline there on the same runner
+(`--save-baseline --baseline base.json`), then compare the change against
+it (`--baseline base.json`).
+
+    python benchmarks/suite.py --save-baseline        # record benchmarks/baseline.json
+    python benchmarks/suite.py                        # compare against it
+    python benchmarks/suite.py --only dashboard       # cases whose name contains 'dashboard'
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import migrate, print_table, setup_django
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+# Absolute slack below which time/memory differences are treated as noise.
+TIME_FLOOR_SECONDS = 0.002
+MEMORY_FLOOR_KIB = 64
+
+CASES = []
+
+
+def case(name, warm=False):
+    """Register a benchmark case. `warm` cases keep the cache between repeats."""
+    def register(fn):
+        CASES.append((name, fn, warm))
+        return fn
+    return register
+
+
+class Fixture:
+    """Handles on seeded rows shared by the cases."""
+
+    def __init__(self):
+        from django.conf import settings
+        from django.contrib.sessions.backends.db import SessionStore
+        from django.test import Client
+        from core import models
+
+        self.admin_tm = (
+            models.TeamMember.objects.filter(is_admin=True).select_related('member', 'team').order_by('id').first()
+        )
+        self.admin = self.admin_tm.member
+        self.team = self.admin_tm.team
+        self.member_tm = (
+            models.TeamMember.objects.filter(team=self.team, is_admin=False).select_related('member').order_by('id').first()
+        )
+        self.member = self.member_tm.member
+        self.assignment = models.TeamMemberTask.objects.filter(team_member=self.member_tm).order_by('id').first()
+        self.team_task_ids = list(
+            models.TeamMemberTask.objects.filter(team_member__team=self.team).order_by('id').values_list('id', flat=True)[:100]
+        )
+        self.counter = itertools.count()
+
+        def client_for(member):
+            session = SessionStore()
+            session['member_username'] = member.username
+            session.save()
+            client = Client(HTTP_ACCEPT='application/json')
+            client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+            return client
+
+        self.admin_client = client_for(self.admin)
+        self.member_client = client_for(self.member)
+        self.anon_client = Client(HTTP_ACCEPT='application/json')
+
+    def unique(self, prefix):
+        return f'{prefix}{next(self.counter)}'
+
+    def task_rows(self, n):
+        return [
+            {'task_name': f'Bulk {i % 10}', 'team_member_id': self.member_tm.id,
+             'start_date': '2025-02-01', 'end_date': '2025-02-10'}
+            for i in range(n)
+        ]
+
+    def member_csv(self, n):
+        prefix = self.unique('imp')
+        lines = ['username,name,gmail,password']
+        lines += [f'{prefix}_{i},Imported {i},{prefix}_{i}@example.com,pw' for i in range(n)]
+        return '\n'.join(lines).encode()
+
+
+# --- services -------------------------------------------------------------
+
+@case('AuthService.login')
+def _(f):
+    from core.services import AuthService
+    AuthService.login(f.admin.username, 'secret')
+
+
+@case('AuthService.register')
+def _(f):
+    from core.services import AuthService
+    name = f.unique('reg')
+    AuthService.register(name, 'Reg', f'{name}@example.com', 'pw', 'New team')
+
+
+@case('TeamService.add_member_to_team')
+def _(f):
+    from core.services import TeamService
+    name = f.unique('add')
+    TeamService.add_member_to_team(f.admin, name, 'Added', f'{name}@example.com', 'pw')
+
+
+@case('TeamService.import_members[100]')
+def _(f):
+    from core.importers import iter_member_rows
+    from core.services import TeamService
+    TeamService.import_members(f.admin, iter_member_rows(io.BytesIO(f.member_csv(100)), 'csv'))
+
+
+@case('TeamService.edit_member')
+def _(f):
+    from core.services import TeamService
+    m = f.member
+    TeamService.edit_member(f.admin, f.member_tm.id, m.name, m.username, m.gmail, 'pw')
+
+
+@case('TeamService.remove_member')
+def _(f):
+    from core.services import TeamService
+    TeamService.remove_member(f.admin, f.member_tm.id)
+
+
+@case('TaskService.add_task')
+def _(f):
+    from core.services import TaskService
+    TaskService.add_task(f.admin, 'Review', f.member_tm.id, '2025-02-01', '2025-02-10')
+
+
+@case('TaskService.add_task (interned name)', warm=True)
+def _(f):
+    from core.services import TaskService
+    TaskService.add_task(f.admin, 'Task 1', f.member_tm.id, '2025-02-01', '2025-02-10')
+
+
+@case('TaskService.add_tasks_bulk[100]')
+def _(f):
+    from core.services import TaskService
+    TaskService.add_tasks_bulk(f.admin, f.task_rows(100))
+
+
+@case('TaskService.edit_task')
+def _(f):
+    from core.services import TaskService
+    TaskService.edit_task(f.admin, f.assignment.id, 'Review', f.member_tm.id, '2025-02-01', '2025-02-11')
+
+
+@case('TaskService.delete_task')
+def _(f):
+    from core.services import TaskService
+    TaskService.delete_task(f.admin, f.assignment.id)
+
+
+@case('TaskService.mark_task_complete')
+def _(f):
+    from core.services import TaskService
+    TaskService.mark_task_complete(f.member, f.assignment.id)
+
+
+@case('TaskService.complete_tasks+reopen_tasks[100]')
+def _(f):
+    from core.services import TaskService
+    TaskService.complete_tasks(f.admin, f.team_task_ids, admin_tm=f.admin_tm)
+    TaskService.reopen_tasks(f.admin, f.team_task_ids, admin_tm=f.admin_tm)
+
+
+@case('TaskService.shift_tasks[100]')
+def _(f):
+    from core.services import TaskService
+    TaskService.shift_tasks(f.admin, f.team_task_ids, 1, admin_tm=f.admin_tm)
+
+
+@case('ViewService.get_member_tasks')
+def _(f):
+    from core.services import ViewService
+    list(ViewService.get_member_tasks(f.member))
+
+
+@case('ViewService.get_team_dashboard')
+def _(f):
+    from core.services import ViewService
+    team, members, tasks, error = ViewService.get_team_dashboard(f.admin)
+    list(members)
+    list(tasks)
+
+
+# --- views ----------------------------------------------------------------
+
+def _ok(response):
+    assert response.status_code < 400, (response.status_code, getattr(response, 'content', b'')[:200])
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+@case('GET csrf-token/')
+def _(f):
+    _ok(f.anon_client.get('/csrf-token/', secure=True))
+
+
+@case('POST login/')
+def _(f):
+    _ok(f.anon_client.post('/login/', {'username': f.admin.username, 'password': 'secret'}, secure=True))
+
+
+@case('POST register/')
+def _(f):
+    name = f.unique('vreg')
+    _ok(f.anon_client.post('/register/', {
+        'username': name, 'name': 'Reg', 'gmail': f'{name}@example.com', 'password': 'pw', 'team_name': 'T',
+    }, secure=True))
+
+
+@case('GET view/')
+def _(f):
+    _ok(f.member_client.get('/view/', secure=True))
+
+
+@case('GET dashboard/')
+def _(f):
+    _ok(f.admin_client.get('/dashboard/', secure=True))
+
+
+@case('GET dashboard/ (cached)', warm=True)
+def _(f):
+    _ok(f.admin_client.get('/dashboard/', secure=True))
+
+
+@case('GET dashboard/?limit=100')
+def _(f):
+    _ok(f.admin_client.get('/dashboard/?limit=100', secure=True))
+
+
+@case('GET stats/')
+def _(f):
+    _ok(f.admin_client.get('/stats/', secure=True))
+
+
+@case('GET stats/ (stats table)')
+def _(f):
+    from django.test import override_settings
+    with override_settings(TASKFLOW_TASK_STATS_TABLE=True):
+        _ok(f.admin_client.get('/stats/', secure=True))
+
+
+@case('GET search/')
+def _(f):
+    _ok(f.admin_client.get('/search/?q=task+1', secure=True))
+
+
+@case('GET dashboard/?stream=1')
+def _(f):
+    _ok(f.admin_client.get('/dashboard/?stream=1', secure=True))
+
+
+@case('POST add-member/')
+def _(f):
+    name = f.unique('vadd')
+    _ok(f.admin_client.post('/add-member/', {
+        'username': name, 'name': 'Added', 'gmail': f'{name}@example.com', 'password': 'pw',
+    }, secure=True))
+
+
+@case('POST import-members/[100]')
+def _(f):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    upload = SimpleUploadedFile('people.csv', f.member_csv(100))
+    _ok(f.admin_client.post('/import-members/', {'file': upload}, secure=True))
+
+
+@case('GET edit-member/')
+def _(f):
+    _ok(f.admin_client.get(f'/edit-member/{f.member_tm.id}/', secure=True))
+
+
+@case('POST edit-member/')
+def _(f):
+    m = f.member
+    _ok(f.admin_client.post(f'/edit-member/{f.member_tm.id}/', {
+        'member_name': m.name, 'member_username': m.username,
+        'member_email': m.gmail, 'member_password': 'pw',
+    }, secure=True))
+
+
+@case('POST delete-member/')
+def _(f):
+    _ok(f.admin_client.post(f'/delete-member/{f.member_tm.id}/', secure=True))
+
+
+@case('POST add-task/')
+def _(f):
+    _ok(f.admin_client.post('/add-task/', {
+        'task_name': 'Review', 'team_member_id': f.member_tm.id,
+        'start_date': '2025-02-01', 'end_date': '2025-02-10',
+    }, secure=True))
+
+
+@case('POST add-tasks/[100]')
+def _(f):
+    _ok(f.admin_client.post('/add-tasks/', json.dumps({'tasks': f.task_rows(100)}),
+                            content_type='application/json', secure=True))
+
+
+@case('POST edit-task/')
+def _(f):
+    _ok(f.admin_client.post(f'/edit-task/{f.assignment.id}/', {
+        'task_name': 'Review', 'team_member_id': f.member_tm.id,
+        'start_date': '2025-02-01', 'end_date': '2025-02-11',
+    }, secure=True))
+
+
+@case('POST delete-task/')
+def _(f):
+    _ok(f.admin_client.post(f'/delete-task/{f.assignment.id}/', secure=True))
+
+
+@case('POST mark-task-complete/')
+def _(f):
+    _ok(f.member_client.post(f'/mark-task-complete/{f.assignment.id}/', secure=True))
+
+
+# --- runner ---------------------------------------------------------------
+
+def _run_once(fn, fixture):
+    from django.db import transaction
+
+    with transaction.atomic():
+        fn(fixture)
+        transaction.set_rollback(True)
+
+
+def measure(fn, fixture, repeat, warm):
+    """Return {'seconds', 'queries', 'peak_kib'} for one case."""
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    if warm:
+        _run_once(fn, fixture)
+
+    timings = []
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        start = time.perf_counter()
+        _run_once(fn, fixture)
+        timings.append(time.perf_counter() - start)
+
+    if not warm:
+        cache.clear()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as ctx:
+        _run_once(fn, fixture)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds': statistics.median(timings),
+        'queries': len(ctx.captured_queries),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (case, reason) regressions."""
+    regressions = []
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if now['queries'] > base['queries']:
+            regressions.append((name, f"queries {base['queries']} -> {now['queries']}"))
+        if now['seconds'] > base['seconds'] * (1 + threshold) + TIME_FLOOR_SECONDS:
+            regressions.append((name, f"time {base['seconds'] * 1000:.2f}ms -> {now['seconds'] * 1000:.2f}ms"))
+        if now['peak_kib'] > base['peak_kib'] * (1 + threshold) + MEMORY_FLOOR_KIB:
+            regressions.append((name, f"memory {base['peak_kib']}KiB -> {now['peak_kib']}KiB"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--members-per-team', type=int, default=20)
+    parser.add_argument('--tasks-per-member', type=int, default=50)
+    parser.add_argument('--password-iterations', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='Run only cases whose name contains this text')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown (0.25 = 25%%)')
+    args = parser.parse_args()
+    if not args.save_baseline and not args.baseline.exists():
+        sys.exit(f'No baseline at {args.baseline}; run with --save-baseline to record one')
+
+    os.environ['TASKFLOW_PASSWORD_ITERATIONS'] = str(args.password_iterations)
+    # Production-like request handling: no DEBUG query log.
+    os.environ.setdefault('DEBUG', 'False')
+    os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+    setup_django('bench_suite.sqlite3')
+    migrate()
+
+    from django.core.management import call_command
+
+    params = {
+        'teams': args.teams,
+        'members_per_team': args.members_per_team,
+        'tasks_per_member': args.tasks_per_member,
+        'password_iterations': args.password_iterations,
+    }
+    call_command(
+        'seed_benchmark_data', '--flush',
+        '--teams', str(args.teams),
+        '--members-per-team', str(args.members_per_team),
+        '--tasks-per-member', str(args.tasks_per_member),
+        stdout=io.StringIO(),
+    )
+    fixture = Fixture()
+
+    results = {}
+    for name, fn, warm in CASES:
+        if args.only and args.only not in name:
+            continue
+        results[name] = measure(fn, fixture, args.repeat, warm)
+
+    baseline = {}
+    if not args.save_baseline:
+        stored = json.loads(args.baseline.read_text())
+        if stored['params'] != params:
+            sys.exit(f'Baseline {args.baseline} was recorded with {stored["params"]}; rerun with those options')
+        baseline = stored['results']
+
+    rows = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{(r['seconds'] / base['seconds'] - 1) * 100:+.0f}%" if base and base['seconds'] else '-'
+        rows.append((name, f"{r['seconds'] * 1000:.2f}", delta, r['queries'], r['peak_kib']))
+    print_table(f'{len(results)} cases, {params}', rows, ('case', 'ms', 'vs base', 'queries', 'peak KiB'))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({'params': params, 'results': results}, indent=2, sort_keys=True) + '\n')
+        print(f'\nbaseline written to {args.baseline}')
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, reason in regressions:
+        print(f'REGRESSION {name}: {reason}')
+    if regressions:
+        sys.exit(1)
+    print('\nno regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Register model signal handlers and system checks
+        from . import checks, signals  # noqa: F401
+
+        # Count SQL per request for the metrics middleware
+        from django.db.backends.signals import connection_created
+        from . import metrics
+        if metrics.enabled():
+            connection_created.connect(metrics.install_query_hook)
@@ -0,0 +1,253 @@
+"""Async counterparts of the hot read endpoints.
+
+Under the ASGI entry point (`taskflow/asgi.py`) these replace the sync
+`get_csrf_token`, `login`, `view` and `dashboard` views from
+`core.views`, so those requests run on the event loop and use Django's
+async ORM instead of each being pushed onto a worker thread. Responses are
+byte-for-byte the same as the sync views.
+
+The URLconf picks them when `TASKFLOW_ASYNC_VIEWS` is enabled; the WSGI
+entry point keeps the sync views, where async views would only add an
+event loop per request. `events` (Server-Sent Events) has no sync
+counterpart and is only routed under ASGI.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import require_GET
+
+from .events import HEARTBEAT_INTERVAL, RESYNC, get_broker, member_channel, team_channel
+from .caching import aget_dashboard, aset_dashboard, ateam_generation, dashboard_cache_key, dashboard_etag
+from .pagination import encode_cursor, parse_limit, parse_since
+from .routers import reading_from_replica
+from .services import AuthService, ViewService
+from .views import (
+    STREAM_CHUNK_SIZE,
+    SYNC_TOKEN_EXPIRED,
+    _is_api_request,
+    _serialize_dashboard_task,
+    _serialize_member_task,
+    _serialize_team_member,
+    _sync_fields,
+    _with_etag,
+    archive_page,
+    spa_index,
+)
+
+
+@require_GET
+@ensure_csrf_cookie
+async def get_csrf_token(request):
+    """Async variant of `core.views.get_csrf_token`."""
+    return JsonResponse({'detail': 'CSRF cookie set'})
+
+
+async def login(request):
+    """Async variant of `core.views.login`."""
+    if request.method == 'POST':
+        username = request.POST.get('username', '').strip()
+        password = request.POST.get('password', '').strip()
+
+        member, is_admin, error = await AuthService.alogin(username, password)
+        if error or not member:
+            return JsonResponse({'error': error or 'Login failed'}, status=401)
+
+        await request.session.aset('member_username', member.username)
+        return JsonResponse({'member_name': member.name, 'member_username': member.username, 'is_admin': is_admin})
+
+    return spa_index(request)
+
+
+async def view(request):
+    """Async variant of `core.views.view`."""
+    if request.method == 'GET' and not _is_api_request(request):
+        return spa_index(request)
+
+    if not await request.session.aget('member_username'):
+        return spa_index(request)
+
+    member = request.member
+    if not member:
+        return JsonResponse({'error': 'User not found.'}, status=404)
+
+    if request.GET.get('include_archived') == '1':
+        # Archive pages are cold; they run on a worker thread.
+        return await sync_to_async(archive_page)(request, member)
+
+    try:
+        since = parse_since(request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid since token.'}, status=400)
+    horizon = await ViewService.aget_sync_horizon()
+    if since is not None and since < horizon:
+        return JsonResponse({'error': SYNC_TOKEN_EXPIRED}, status=410)
+
+    rows = [task async for task in ViewService.get_member_tasks(member, since=since)]
+    removals = [r async for r in ViewService.get_member_removals(member, since)] if since is not None else ()
+
+    tasks_data = [_serialize_member_task(task) for task in rows]
+
+    return JsonResponse({
+        'member_name': member.name,
+        'team_tasks': tasks_data,
+        **_sync_fields(rows, removals, since, horizon),
+    })
+
+
+async def dashboard(request):
+    """Async variant of `core.views.dashboard`."""
+    if request.method == 'GET' and not _is_api_request(request):
+        return spa_index(request)
+
+    if not await request.session.aget('member_username'):
+        return spa_index(request)
+
+    member = request.member
+    if not member:
+        return JsonResponse({'error': 'Member not found.'}, status=404)
+
+    if request.GET.get('include_archived') == '1':
+        return await sync_to_async(archive_page)(request, member, team=True)
+
+    try:
+        limit = parse_limit(request.GET.get('limit'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+    try:
+        since = parse_since(request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid since token.'}, status=400)
+    horizon = await ViewService.aget_sync_horizon()
+    if since is not None and since < horizon:
+        return JsonResponse({'error': SYNC_TOKEN_EXPIRED}, status=410)
+    cursor = request.GET.get('cursor') or None
+    stream = request.GET.get('stream') == '1' and since is None
+
+    cache_key = etag = None
+    admin_tm = request.admin_tm
+    if admin_tm and not stream and since is None:
+        generation = await ateam_generation(admin_tm.team_id)
+        cache_key = dashboard_cache_key(admin_tm.team_id, generation, member.id, cursor, limit)
+        etag = dashboard_etag(cache_key)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return _with_etag(HttpResponseNotModified(), etag)
+        body = await aget_dashboard(cache_key)
+        if body is not None:
+            return _with_etag(HttpResponse(body, content_type='application/json'), etag)
+
+    team, team_members, team_tasks, error = await ViewService.aget_team_dashboard(
+        member, cursor=cursor, limit=limit, admin_tm=request.admin_tm, since=since
+    )
+    if error or not team or team_members is None or team_tasks is None:
+        return JsonResponse({'error': error or 'Dashboard data not found.'}, status=400 if error and 'cursor' in error else 403)
+
+    members_data = [_serialize_team_member(tm) async for tm in team_members]
+
+    if stream:
+        return StreamingHttpResponse(
+            _astream_dashboard(member.name, members_data, team_tasks, horizon),
+            content_type='application/json',
+        )
+
+    rows = [task async for task in team_tasks]
+    tasks_data = [_serialize_dashboard_task(task) for task in rows]
+    removals = [r async for r in ViewService.get_team_removals(team, since)] if since is not None else ()
+
+    payload = {
+        'member_name': member.name,
+        'team_members': members_data,
+        'team_tasks': tasks_data,
+        **_sync_fields(rows, removals, since, horizon),
+    }
+    if limit:
+        last = rows[-1] if len(rows) == limit else None
+        payload['next_cursor'] = encode_cursor(last['end_date'], last['id']) if last else None
+    response = JsonResponse(payload)
+    # Replica reads may lag; caching them would outlive the lag (see core.routers).
+    if cache_key and not reading_from_replica():
+        await aset_dashboard(cache_key, response.content)
+        _with_etag(response, etag)
+    return response
+
+
+async def _astream_dashboard(member_name, members_data, team_tasks, horizon=0):
+    """Async variant of `core.views._stream_dashboard`."""
+    yield '{"member_name": %s, "team_members": %s, "team_tasks": [' % (
+        json.dumps(member_name), json.dumps(members_data),
+    )
+    separator = ''
+    chunk = []
+    token = horizon
+    async for task in team_tasks.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+        chunk.append(json.dumps(_serialize_dashboard_task(task)))
+        token = max(token, task['version'])
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield '], "sync_token": %d}' % token
+
+
+async def events(request):
+    """Stream change events for the session member as Server-Sent Events.
+
+    Subscribes to the member's channel and, for admins, their team's
+    channel (see `core.events`). Each `change` event's data is the JSON
+    event; on receiving one the SPA fetches `view/?since=` or
+    `dashboard/?since=`. `resync` means events were dropped and the client
+    should reload in full.
+    """
+    if not await request.session.aget('member_username'):
+        return JsonResponse({'error': 'Not logged in.'}, status=401)
+
+    member = request.member
+    if not member:
+        return JsonResponse({'error': 'Member not found.'}, status=404)
+
+    channels = [member_channel(member.id)]
+    if request.admin_tm:
+        channels.append(team_channel(request.admin_tm.team_id))
+
+    # The stream never queries again; don't pin a database connection.
+    await sync_to_async(_release_connection)()
+    return EventStreamResponse(get_broker().subscribe(channels))
+
+
+def _release_connection():
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    """SSE response for a subscription; Django's `close()` unsubscribes it,
+    including when the client disconnects mid-stream."""
+
+    def __init__(self, subscription):
+        super().__init__(_event_stream(subscription), content_type='text/event-stream')
+        self.subscription = subscription
+        self['Cache-Control'] = 'no-cache'
+        self['X-Accel-Buffering'] = 'no'
+
+    def close(self):
+        self.subscription.close()
+        super().close()
+
+
+async def _event_stream(subscription):
+    """Yield SSE frames for `subscription` until the client disconnects."""
+    yield 'retry: 3000\n\n'
+    while True:
+        message = await subscription.get(HEARTBEAT_INTERVAL)
+        if message is None:
+            yield ': keep-alive\n\n'
+        elif message is RESYNC:
+            yield 'event: resync\ndata: {}\n\n'
+        else:
+            yield f'event: change\ndata: {message}\n\n'
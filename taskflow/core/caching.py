@@ -0,0 +1,79 @@
+"""
+Per-team response caching for the admin dashboard.
+
+Every team has a generation token in Django's cache. Any change to the
+team's members, their profiles, tasks or assignments replaces the token
+(see `core.signals`), which orphans every cached payload and ETag built
+from the previous one. Tokens are random rather than incrementing so that a
+token evicted from the cache can never come back and revive an old entry.
+
+Works with any cache backend that implements `get_or_set`/`set`, including
+the locmem and file-based backends. Use a backend shared by all workers
+(file, memcached, redis) when running several processes, otherwise one
+worker cannot invalidate another's entries.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _generation_key(team_id):
+    return f'taskflow:team-gen:{team_id}'
+
+
+def team_generation(team_id):
+    """Return the current generation token for a team."""
+    return cache.get_or_set(_generation_key(team_id), lambda: uuid.uuid4().hex, None)
+
+
+def bump_team_generation(*team_ids):
+    """Invalidate cached dashboard data for the given teams.
+
+    Call this after writes that bypass model signals (`update()`,
+    `bulk_create()`, raw SQL). The new tokens are set once the current
+    transaction commits: set earlier, a concurrent read could cache the
+    old rows under a new token and serve them, with its ETag, until the
+    next write.
+    """
+    keys = [_generation_key(t) for t in team_ids if t is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, None))
+
+
+def dashboard_cache_key(team_id, generation, member_id, cursor, limit):
+    """Cache key (and ETag seed) for one dashboard response."""
+    page = hashlib.sha1(f'{cursor or ""}:{limit or ""}'.encode()).hexdigest()[:12]
+    return f'taskflow:dashboard:{team_id}:{generation}:{member_id}:{page}'
+
+
+def dashboard_etag(cache_key):
+    """Strong ETag for the response cached under `cache_key`.
+
+    Responses are a pure function of the key, so the tag can be checked
+    without building or even loading the body.
+    """
+    return '"%s"' % hashlib.sha1(cache_key.encode()).hexdigest()
+
+
+def get_dashboard(cache_key):
+    return cache.get(cache_key)
+
+
+def set_dashboard(cache_key, body):
+    cache.set(cache_key, body, getattr(settings, 'TASKFLOW_DASHBOARD_CACHE_TIMEOUT', 300))
+
+
+async def ateam_generation(team_id):
+    """Async variant of `team_generation`."""
+    return await cache.aget_or_set(_generation_key(team_id), lambda: uuid.uuid4().hex, None)
+
+
+async def aget_dashboard(cache_key):
+    return await cache.aget(cache_key)
+
+
+async def aset_dashboard(cache_key, body):
+    await cache.aset(cache_key, body, getattr(settings, 'TASKFLOW_DASHBOARD_CACHE_TIMEOUT', 300))
@@ -0,0 +1,39 @@
+"""
+System checks for settings that only work with a cache shared by all
+worker processes (run by `manage.py check`, `migrate` and `runserver`).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Warning, register
+
+CACHE_SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+CACHED_DB_SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+def _is_process_local(alias):
+    return isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+@register()
+def check_session_cache(app_configs, **kwargs):
+    alias = settings.SESSION_CACHE_ALIAS
+    if not _is_process_local(alias):
+        return []
+    if settings.SESSION_ENGINE == CACHE_SESSION_ENGINE:
+        return [Error(
+            f"TASKFLOW_SESSION_ENGINE=cache keeps sessions only in the '{alias}' cache, "
+            "which is private to each worker process.",
+            hint="Set TASKFLOW_CACHE_DIR to a directory shared by all workers, "
+                 "or use TASKFLOW_SESSION_ENGINE=cached_db.",
+            id='core.E001',
+        )]
+    if settings.SESSION_ENGINE == CACHED_DB_SESSION_ENGINE:
+        return [Warning(
+            f"TASKFLOW_SESSION_ENGINE=cached_db with the process-local '{alias}' cache: "
+            "a session ended in one worker stays valid in the others until it expires from their cache.",
+            hint="Set TASKFLOW_CACHE_DIR to a directory shared by all workers.",
+            id='core.W001',
+        )]
+    return []
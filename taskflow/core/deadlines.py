@@ -0,0 +1,116 @@
+"""
+Deadline reminders, run by `manage.py scan_deadlines`.
+
+`scan` walks the open assignments due in a window, in keyset batches over
+the (is_finish, end_date) index, and queues a `DeadlineNotice` for each:
+`overdue` for end dates in the last `overdue_days` days, `due` for end
+dates from today to `due_within` days ahead. A notice is unique per
+(assignment, kind, end date), so rescans queue nothing new and a moved
+end date is reminded again.
+
+`deliver` then sends each member with pending notices one digest and
+marks the notices sent, a batch of members at a time. Notices of tasks
+finished or rescheduled since they were queued are dropped. A crash
+between sending a batch and marking it sends that batch again on the next
+run (at least once).
+
+Digests go out through a sink: any Django e-mail backend, named in
+`TASKFLOW_DEADLINE_SINKS` (console, file, locmem, smtp) or given as a
+dotted path.
+"""
+from datetime import timedelta
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import DeadlineNotice
+from .repositories import DeadlineRepository
+
+
+# Tasks listed in one digest; the rest are counted.
+MAX_DIGEST_ITEMS = 50
+
+
+def get_sink(name=None):
+    """Open the e-mail backend for `name` (a `TASKFLOW_DEADLINE_SINKS` key or a dotted path)."""
+    name = name or settings.TASKFLOW_DEADLINE_SINK
+    return get_connection(settings.TASKFLOW_DEADLINE_SINKS.get(name, name))
+
+
+def scan(today, due_within=1, overdue_days=7, batch_size=1000):
+    """Queue notices for the open assignments in the window. Returns the number queued."""
+    queued = 0
+    windows = (
+        (DeadlineNotice.OVERDUE, today - timedelta(days=overdue_days), today - timedelta(days=1)),
+        (DeadlineNotice.DUE, today, today + timedelta(days=due_within)),
+    )
+    for kind, start, end in windows:
+        after = None
+        while True:
+            rows = DeadlineRepository.get_unnoticed_batch(kind, start, end, after, batch_size)
+            if not rows:
+                break
+            DeadlineRepository.queue(kind, rows)
+            queued += len(rows)
+            assignment_id, end_date, _ = rows[-1]
+            after = (end_date, assignment_id)
+    return queued
+
+
+def build_digest(name, gmail, items, more, today):
+    """Compose one member's digest from their notice rows (overdue first)."""
+    overdue = [row for row in items if row['kind'] == DeadlineNotice.OVERDUE]
+    due = [row for row in items if row['kind'] == DeadlineNotice.DUE]
+    lines = [f'Hi {name},', '']
+    for title, rows in (('Overdue', overdue), ('Due soon', due)):
+        if rows:
+            lines.append(f'{title}:')
+            lines += [f"- {row['task_name']} ({row['team_name']}), due {row['end_date']:%Y-%m-%d}" for row in rows]
+            lines.append('')
+    if more:
+        lines += [f'...and {more} more.', '']
+    counts = [f'{len(rows)} {label}' for label, rows in (('overdue', overdue), ('due soon', due)) if rows]
+    return EmailMessage(
+        subject=f"Taskflow reminders for {today:%Y-%m-%d}: {', '.join(counts)}",
+        body='\n'.join(lines),
+        to=[gmail],
+    )
+
+
+def deliver(sink, today, batch_size=100, now=None):
+    """
+    Send one digest per member with pending notices, `batch_size` members
+    at a time. Returns tuple: (digests_sent, notices_marked).
+    """
+    now = now or timezone.now()
+    sent = marked = 0
+    after = 0
+    while True:
+        member_ids = DeadlineRepository.get_pending_members(after, batch_size)
+        if not member_ids:
+            break
+        rows = DeadlineRepository.get_pending_rows(member_ids, now).iterator()
+        messages = []
+        for _, member_rows in groupby(rows, key=itemgetter('member_id')):
+            items = list(islice(member_rows, MAX_DIGEST_ITEMS))
+            more = sum(1 for _ in member_rows)
+            messages.append(build_digest(items[0]['name'], items[0]['gmail'], items, more, today))
+        if messages:
+            sent += sink.send_messages(messages) or 0
+        marked += DeadlineRepository.mark_sent(member_ids, now, timezone.now())
+        after = member_ids[-1]
+    return (sent, marked)
+
+
+def purge(today, overdue_days=7, batch_size=1000):
+    """Delete sent notices that fell out of the scan window. Returns the number deleted."""
+    before = today - timedelta(days=overdue_days)
+    deleted = 0
+    while True:
+        n = DeadlineRepository.delete_sent(before, batch_size)
+        deleted += n
+        if n < batch_size:
+            return deleted
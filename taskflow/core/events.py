@@ -0,0 +1,276 @@
+"""
+Change events pushed to the SPA with Server-Sent Events.
+
+Model signals (`core.signals`) and the bulk repository paths publish a
+small event whenever an assignment or a team membership changes, once the
+writing transaction commits. Every event goes to the affected team's
+channel and, for assignments, to the assignee's channel:
+
+    {"kind": "task", "action": "saved", "id": 12, "version": 345}
+
+The `events/` endpoint (`core.async_views.events`, ASGI only) streams the
+session member's channel, plus their admin team's channel, to the browser.
+Events only say *that* something changed. Clients fetch the rows with
+`view/?since=` or `dashboard/?since=`, using the sync token they already
+hold.
+
+An idle subscriber is one asyncio queue plus one suspended coroutine. It
+holds no thread and no database connection, so a worker can keep thousands
+open. A subscriber that falls more than `QUEUE_SIZE` events behind gets a
+single `resync` event instead of the backlog.
+
+Brokers (`TASKFLOW_EVENT_BROKER`):
+
+- empty (default): `LocalBroker`, events stay inside the process.
+- `tcp://host:port`: `SocketBroker`. Each worker keeps one connection to
+  the stand-in broker started with `manage.py run_event_broker`, which
+  relays every event to every worker. Events published while the broker is
+  unreachable are dropped; clients catch up on their next sync.
+"""
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before it is told to resync instead.
+QUEUE_SIZE = 100
+
+# Seconds between keep-alive comments on an idle stream.
+HEARTBEAT_INTERVAL = 25
+
+# Marker queued for a subscriber that overflowed.
+RESYNC = object()
+
+
+def team_channel(team_id):
+    return f'team:{team_id}'
+
+
+def member_channel(member_id):
+    return f'member:{member_id}'
+
+
+class Subscription:
+    """Events for a set of channels, consumed on the subscribing event loop."""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def _put(self, message):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """Next message, `RESYNC`, or None when `timeout` seconds pass quietly."""
+        try:
+            async with asyncio.timeout(timeout):
+                return await self.queue.get()
+        except TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+def _put_all(subscriptions, message):
+    for subscription in subscriptions:
+        subscription._put(message)
+
+
+class LocalBroker:
+    """Fan events out to the subscribers of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # channel -> set of Subscription
+
+    def subscribe(self, channels):
+        """Subscribe the running event loop to `channels`."""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        self.deliver(channel, json.dumps(event))
+
+    def deliver(self, channel, message):
+        """Queue `message` (a JSON string) for `channel`; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        # One wake-up per event loop rather than one per subscriber.
+        by_loop = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, batch in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_put_all, batch, message)
+            except RuntimeError:
+                pass  # loop closed; its streams are gone
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._subscribers.values()))
+
+
+class SocketBroker(LocalBroker):
+    """Share events between processes through `run_event_broker`.
+
+    Publishing writes one `channel<TAB>json` line to the broker; a reader
+    thread delivers every line the broker relays back, including this
+    process's own, to the local subscribers.
+    """
+
+    reconnect_delay = 1.0
+
+    def __init__(self, host, port):
+        super().__init__()
+        self.address = (host, port)
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._connected = threading.Event()
+        self._closed = False
+        threading.Thread(target=self._read_forever, name='taskflow-events', daemon=True).start()
+
+    def publish(self, channel, event):
+        line = f'{channel}\t{json.dumps(event)}\n'.encode()
+        with self._send_lock:
+            if self._sock is None:
+                logger.warning('Event broker %s:%s unreachable; dropped event for %s', *self.address, channel)
+                return
+            try:
+                self._sock.sendall(line)
+            except OSError:
+                logger.warning('Event broker send failed; dropped event for %s', channel)
+
+    def wait_connected(self, timeout=None):
+        return self._connected.wait(timeout)
+
+    def close(self):
+        """Disconnect and stop reconnecting."""
+        self._closed = True
+        with self._send_lock:
+            if self._sock is not None:
+                self._sock.shutdown(socket.SHUT_RDWR)
+
+    def _read_forever(self):
+        while not self._closed:
+            try:
+                sock = socket.create_connection(self.address)
+            except OSError:
+                time.sleep(self.reconnect_delay)
+                continue
+            try:
+                lines = sock.makefile('rb')
+                # The broker greets with an empty line once it relays to us.
+                if lines.readline() == b'\n':
+                    with self._send_lock:
+                        self._sock = sock
+                    self._connected.set()
+                for line in lines:
+                    channel, _, message = line.decode().rstrip('\n').partition('\t')
+                    self.deliver(channel, message)
+            except OSError:
+                pass
+            finally:
+                self._connected.clear()
+                with self._send_lock:
+                    self._sock = None
+                sock.close()
+            time.sleep(self.reconnect_delay)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def create_broker(url):
+    """Build the broker for a `TASKFLOW_EVENT_BROKER` value."""
+    if not url:
+        return LocalBroker()
+    parts = urlsplit(url)
+    if parts.scheme != 'tcp' or not parts.hostname or not parts.port:
+        raise ValueError(f'Unsupported TASKFLOW_EVENT_BROKER: {url!r}')
+    return SocketBroker(parts.hostname, parts.port)
+
+
+def get_broker():
+    """Return this process's broker, creating it on first use."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = create_broker(getattr(settings, 'TASKFLOW_EVENT_BROKER', ''))
+    return _broker
+
+
+def publish(channels, event):
+    """Publish `event` to `channels` once the current transaction commits."""
+    channels = list(channels)
+
+    def send():
+        broker = get_broker()
+        for channel in channels:
+            broker.publish(channel, event)
+
+    transaction.on_commit(send)
+
+
+async def serve_broker(host, port, ready=None):
+    """Relay every line received from any client to all clients.
+
+    The stand-in broker behind `manage.py run_event_broker`. `ready`, if
+    given, is called with the listening server.
+    """
+    clients = set()
+
+    async def handle(reader, writer):
+        clients.add(writer)
+        writer.write(b'\n')
+        try:
+            while line := await reader.readline():
+                for client in list(clients):
+                    client.write(line)
+                    if client.transport.get_write_buffer_size() > 1 << 20:
+                        client.close()  # a worker that stopped reading
+                        clients.discard(client)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            clients.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for client in list(clients):
+            client.close()
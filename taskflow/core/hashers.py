@@ -0,0 +1,29 @@
+"""Password hashers with a work factor taken from settings."""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as DjangoPBKDF2PasswordHasher
+
+
+class PBKDF2PasswordHasher(DjangoPBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with `TASKFLOW_PASSWORD_ITERATIONS` iterations.
+
+    Keeps Django's `pbkdf2_sha256` algorithm name, so existing hashes stay
+    verifiable and are upgraded on login whenever the setting changes.
+    """
+
+    @property
+    def iterations(self):
+        return settings.TASKFLOW_PASSWORD_ITERATIONS
+
+
+class ImportPasswordHasher(PBKDF2PasswordHasher):
+    """The same PBKDF2-SHA256 with `TASKFLOW_IMPORT_PASSWORD_ITERATIONS`.
+
+    Used only to hash the plain-text passwords of bulk imports, where the
+    full work factor would cost about a CPU-hour per 10,000 rows. The
+    hashes verify like any other and are upgraded on the member's first
+    login. Not listed in `PASSWORD_HASHERS`.
+    """
+
+    @property
+    def iterations(self):
+        return settings.TASKFLOW_IMPORT_PASSWORD_ITERATIONS
@@ -0,0 +1,74 @@
+"""
+Streaming parsers for bulk member imports.
+
+Both readers take a binary file object and yield one `(line_number, row)`
+pair at a time, so an upload is never held in memory in full. `row` is a
+dict of the raw fields, or None when the line could not be parsed.
+"""
+import csv
+import json
+
+
+MEMBER_FIELDS = ('username', 'name', 'gmail', 'password')
+
+
+class ImportFileError(ValueError):
+    """The rest of an upload cannot be read (e.g. it is not valid UTF-8)."""
+
+
+def iter_csv_rows(binary_file, encoding='utf-8'):
+    """Yield rows from a CSV file with a `username,name,gmail,password` header.
+
+    A record the csv module rejects (such as an oversized field) is yielded
+    as None; an undecodable line ends the file with `ImportFileError`.
+    """
+    line_number = 0
+
+    def decoded_lines():
+        # Decoded line by line, so everything before a bad byte is still read.
+        nonlocal line_number
+        for line_number, line in enumerate(binary_file, start=1):
+            yield line.decode(encoding)
+
+    reader = csv.DictReader(decoded_lines())
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            row = None
+        except UnicodeDecodeError as exc:
+            raise ImportFileError(f'File must be {encoding.upper()} encoded (line {line_number}).') from exc
+        yield (line_number, row)
+
+
+def iter_ndjson_rows(binary_file):
+    """Yield rows from a newline-delimited JSON file (one object per line)."""
+    for line_number, line in enumerate(binary_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield (line_number, row if isinstance(row, dict) else None)
+
+
+def detect_format(filename, explicit=None):
+    """Pick `csv` or `ndjson` from an explicit choice or the file extension."""
+    if explicit:
+        return explicit.lower()
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_member_rows(binary_file, fmt):
+    """Dispatch to the parser for `fmt` ('csv' or 'ndjson')."""
+    if fmt == 'csv':
+        return iter_csv_rows(binary_file)
+    if fmt == 'ndjson':
+        return iter_ndjson_rows(binary_file)
+    raise ValueError(f'Unsupported import format: {fmt}')
@@ -0,0 +1,84 @@
+"""
+Per-process interning of task names.
+
+Assigning a task resolves its name to a `Task` id. The same few names
+("Code review", "Standup notes", ...) come back over and over, so each
+process keeps the most recently used name -> id pairs in a bounded LRU
+(`TASKFLOW_TASK_NAME_CACHE_SIZE` entries) and only asks the database about
+names it has not seen. `TaskRepository.get_or_create_many` fills it; new
+names are inserted with INSERT ... ON CONFLICT DO NOTHING against the
+unique `name_task`, so concurrent admins adding the same name share one row.
+
+Renaming or deleting a task replaces a token in Django's cache (see
+`core.signals`). Every process drops its LRU when it sees a token other
+than the one its entries were read under, so, as for the dashboard cache,
+use a cache backend shared by all workers. Tokens are random for the same
+reason as in `core.caching`.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_TOKEN_KEY = 'taskflow:task-names-gen'
+
+
+def _current_token():
+    return cache.get_or_set(_TOKEN_KEY, lambda: uuid.uuid4().hex, None)
+
+
+class TaskNameCache:
+    """Bounded LRU of task name -> id, cleared whenever the token changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = OrderedDict()
+        self._token = None
+
+    def lookup(self, names):
+        """Return `(token, {name: id})` for the `names` already interned.
+
+        Pass the token back to `store` with the ids read from the database.
+        """
+        token = _current_token()
+        found = {}
+        with self._lock:
+            if token != self._token:
+                self._ids.clear()
+                self._token = token
+            for name in names:
+                task_id = self._ids.get(name)
+                if task_id is not None:
+                    self._ids.move_to_end(name)
+                    found[name] = task_id
+        return token, found
+
+    def store(self, token, ids):
+        """Intern `ids` unless the names were invalidated since `token` was read."""
+        maxsize = getattr(settings, 'TASKFLOW_TASK_NAME_CACHE_SIZE', 4096)
+        with self._lock:
+            if token != self._token:
+                return
+            for name, task_id in ids.items():
+                self._ids[name] = task_id
+                self._ids.move_to_end(name)
+            while len(self._ids) > maxsize:
+                self._ids.popitem(last=False)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+task_names = TaskNameCache()
+
+
+def invalidate_task_names():
+    """Drop every process's interned names.
+
+    Call this after writes that rename or delete tasks without model
+    signals (`update()`, `_raw_delete()`, raw SQL).
+    """
+    cache.set(_TOKEN_KEY, uuid.uuid4().hex, None)
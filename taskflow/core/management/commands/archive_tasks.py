@@ -0,0 +1,44 @@
+"""
+Move finished assignments that ended long ago out of the task lists and
+into the archive (see `TaskService.archive_finished`).
+
+Each batch is one short transaction; `view/` and `dashboard/` stop
+returning the archived rows and serve them with `?include_archived=1`.
+
+    python manage.py archive_tasks --older-than 180
+    python manage.py archive_tasks --older-than 90 --batch-size 500 --pause 0.05
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.services import TaskService
+
+
+class Command(BaseCommand):
+    help = 'Archive finished assignments that ended more than --older-than days ago.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True, metavar='DAYS',
+                            help='Archive finished assignments whose end date is more than DAYS days ago')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 0:
+            raise CommandError('--older-than must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        before = timezone.localdate() - timedelta(days=options['older_than'])
+        total = 0
+        while True:
+            archived = TaskService.archive_finished(before, options['batch_size'])
+            total += archived
+            if archived < options['batch_size']:
+                break
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(f'Archived {total} finished assignments.')
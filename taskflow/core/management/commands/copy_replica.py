@@ -0,0 +1,58 @@
+"""
+Stand-in for replication between two SQLite files, to try the read replica
+(see `core.routers`) locally.
+
+Copies the primary database into the replica with SQLite's online backup
+API, once or every `--interval` seconds; the interval plays the part of
+replication lag.
+
+    DATABASE_URL=sqlite:///primary.sqlite3 REPLICA_DATABASE_URL=sqlite:///replica.sqlite3 \
+        python manage.py copy_replica --interval 2
+"""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import replica_alias
+
+
+def copy_sqlite(target_path, source_alias=DEFAULT_DB_ALIAS):
+    """Copy the SQLite database behind `source_alias` into the file `target_path`."""
+    source = connections[source_alias]
+    if source.in_atomic_block:
+        # SQLite's backup keeps restarting while its source has uncommitted writes.
+        raise CommandError('copy_replica cannot run inside a transaction')
+    source.ensure_connection()
+    target = sqlite3.connect(target_path)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the replica file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', help="Replica file (default: the replica database's NAME)")
+        parser.add_argument('--interval', type=float, help='Keep copying every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('copy_replica only copies SQLite databases')
+        target = options['to']
+        if not target:
+            alias = replica_alias()
+            if alias is None:
+                raise CommandError('No replica configured; set REPLICA_DATABASE_URL or pass --to')
+            target = settings.DATABASES[alias]['NAME']
+
+        while True:
+            copy_sqlite(target)
+            self.stdout.write(f'Copied the primary database to {target}.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
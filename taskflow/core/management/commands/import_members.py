@@ -0,0 +1,45 @@
+"""
+Bulk-import members into a team from a CSV or NDJSON file.
+
+    python manage.py import_members people.csv --admin alice
+    python manage.py import_members people.ndjson --admin alice --batch-size 2000
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import detect_format, iter_member_rows
+from core.repositories import MemberRepository
+from core.services import TeamService
+
+
+class Command(BaseCommand):
+    help = "Stream-import members from a CSV or NDJSON file into an admin's team."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (username,name,gmail,password header) or NDJSON file')
+        parser.add_argument('--admin', required=True, help="Username of the team's admin")
+        parser.add_argument('--format', choices=('csv', 'ndjson'), help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        admin_member = MemberRepository.get_by_username(options['admin'])
+        if not admin_member:
+            raise CommandError(f"Member {options['admin']!r} not found")
+
+        fmt = detect_format(options['path'], options['format'])
+        try:
+            with open(options['path'], 'rb') as fh:
+                summary, error = TeamService.import_members(
+                    admin_member, iter_member_rows(fh, fmt), batch_size=options['batch_size']
+                )
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+        if error:
+            raise CommandError(error)
+
+        for item in summary['errors']:
+            self.stderr.write(f"line {item['line']}: {item['error']}")
+        self.stdout.write(json.dumps({k: v for k, v in summary.items() if k not in ('errors', 'error')}))
+        if 'error' in summary:
+            raise CommandError(summary['error'])
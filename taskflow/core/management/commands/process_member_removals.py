@@ -0,0 +1,40 @@
+"""
+Carry out the member removals queued with `delete-member/` `background=1`
+(see `TeamService.remove_member`).
+
+Each member's assignments are deleted a batch at a time, every batch in
+its own short transaction, so a member with a long task history never
+holds the database locked for long. Run it from cron, or keep it running
+with `--interval`.
+
+    python manage.py process_member_removals
+    python manage.py process_member_removals --batch-size 500 --interval 10
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.repositories import TeamMemberRepository
+
+
+class Command(BaseCommand):
+    help = 'Delete the members queued for background removal.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Assignments deleted per transaction')
+        parser.add_argument('--interval', type=float, help='Keep processing every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        while True:
+            removed = 0
+            while members := TeamMemberRepository.get_queued_removals():
+                for member in members:
+                    TeamMemberRepository.delete_member(member, options['batch_size'])
+                    removed += 1
+            self.stdout.write(f'Removed {removed} members.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+"""
+Delete delta-sync tombstones past their retention (see
+`SyncRepository.purge_tombstones`).
+
+Clients whose `since` token predates the purged tombstones get a 410 from
+`view/` and `dashboard/` and fetch their list in full. Run it daily from
+cron.
+
+    python manage.py purge_tombstones
+    python manage.py purge_tombstones --older-than 7 --batch-size 5000
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.repositories import SyncRepository
+
+
+class Command(BaseCommand):
+    help = 'Delete tombstones older than the delta-sync retention.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, metavar='DAYS',
+                            help='Defaults to TASKFLOW_TOMBSTONE_RETENTION_DAYS')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        days = options['older_than']
+        if days is None:
+            days = settings.TASKFLOW_TOMBSTONE_RETENTION_DAYS
+        if days < 0:
+            raise CommandError('--older-than must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        deleted = SyncRepository.purge_tombstones(timezone.now() - timedelta(days=days), options['batch_size'])
+        self.stdout.write(f'Purged {deleted} tombstones; sync horizon is {SyncRepository.get_horizon()}.')
@@ -0,0 +1,30 @@
+"""
+Rewrite the search token index (`SearchToken`, see `core.search`) from the
+current members, task names and assignments.
+
+Run it after writing members or assignments outside the services (raw SQL,
+the admin site) or after changing how `core.search` tokenizes values:
+
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --team 12
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import models
+from core.repositories import SearchRepository
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the team-scoped search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--team', type=int, help='Only rebuild this team (id)')
+
+    def handle(self, *args, **options):
+        team = None
+        if options['team'] is not None:
+            team = models.Team.objects.filter(pk=options['team']).first()
+            if team is None:
+                raise CommandError(f"Team {options['team']} does not exist")
+        tokens = SearchRepository.rebuild(team)
+        self.stdout.write(f'Indexed {tokens} search tokens.')
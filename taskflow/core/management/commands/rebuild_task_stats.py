@@ -0,0 +1,29 @@
+"""
+Recompute the task stats table (`TeamMemberTaskStats`) from the assignments.
+
+Run it after turning `TASKFLOW_TASK_STATS_TABLE` on, or after writing
+assignments outside the task services (raw SQL, the admin site):
+
+    python manage.py rebuild_task_stats
+    python manage.py rebuild_task_stats --team 12
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import models
+from core.repositories import TaskStatsRepository
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-member open/done assignment counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--team', type=int, help='Only rebuild this team (id)')
+
+    def handle(self, *args, **options):
+        team = None
+        if options['team'] is not None:
+            team = models.Team.objects.filter(pk=options['team']).first()
+            if team is None:
+                raise CommandError(f"Team {options['team']} does not exist")
+        rows = TaskStatsRepository.rebuild(team)
+        self.stdout.write(f'Rebuilt task stats for {rows} team members.')
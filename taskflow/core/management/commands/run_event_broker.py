@@ -0,0 +1,31 @@
+"""
+Run the stand-in event broker that relays change events between workers.
+
+    python manage.py run_event_broker --bind 127.0.0.1:8765
+    TASKFLOW_EVENT_BROKER=tcp://127.0.0.1:8765 uvicorn taskflow.asgi:application --workers 4
+"""
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.events import serve_broker
+
+
+class Command(BaseCommand):
+    help = 'Relay events/ change events between worker processes (see core/events.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default='127.0.0.1:8765', help='host:port to listen on')
+
+    def handle(self, *args, **options):
+        host, _, port = options['bind'].rpartition(':')
+        if not host or not port.isdigit():
+            raise CommandError('--bind must be host:port')
+
+        def ready(server):
+            self.stdout.write(f"Event broker listening on {options['bind']}")
+
+        try:
+            asyncio.run(serve_broker(host, int(port), ready))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,58 @@
+"""
+Queue and send due-soon and overdue reminders (see `core.deadlines`).
+
+Each run queues a notice for every open assignment due within
+`--due-within` days or overdue by at most `--overdue-days` days that has
+not been reminded for its current end date, sends each member one digest
+of their pending notices through the sink, and deletes sent notices that
+fell out of the window. Run it from cron, or keep it running with
+`--interval`.
+
+    python manage.py scan_deadlines
+    python manage.py scan_deadlines --sink smtp --interval 3600
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import deadlines
+
+
+class Command(BaseCommand):
+    help = 'Queue deadline reminders and send one digest per member.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--due-within', type=int, default=1,
+                            help='Remind of tasks due up to this many days ahead')
+        parser.add_argument('--overdue-days', type=int, default=7,
+                            help='Remind of tasks overdue by up to this many days')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Assignments per scan batch; a tenth as many members per send batch')
+        parser.add_argument('--sink', help='TASKFLOW_DEADLINE_SINKS name or e-mail backend path')
+        parser.add_argument('--today', type=date.fromisoformat,
+                            help='Scan as of this date (YYYY-MM-DD) instead of the current one')
+        parser.add_argument('--interval', type=float, help='Keep scanning every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['due_within'] < 0 or options['overdue_days'] < 0:
+            raise CommandError('--due-within and --overdue-days must not be negative')
+        try:
+            sink = deadlines.get_sink(options['sink'])
+        except ImportError as exc:
+            raise CommandError(f'Unknown sink: {exc}') from exc
+
+        while True:
+            today = options['today'] or timezone.localdate()
+            queued = deadlines.scan(
+                today, options['due_within'], options['overdue_days'], options['batch_size']
+            )
+            sent, _ = deadlines.deliver(sink, today, max(1, options['batch_size'] // 10))
+            purged = deadlines.purge(today, options['overdue_days'], options['batch_size'])
+            self.stdout.write(f'Queued {queued} notices; sent {sent} digests; purged {purged} old notices.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
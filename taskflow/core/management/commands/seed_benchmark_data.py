@@ -0,0 +1,50 @@
+"""
+Fill the database with deterministic synthetic data for benchmarking.
+
+    python manage.py seed_benchmark_data --teams 100 --members-per-team 50 --tasks-per-member 20
+    python manage.py seed_benchmark_data --flush --teams 1000   # replace existing data
+"""
+import json
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import models
+from core.seeding import DEFAULT_ANCHOR, flush_core_data, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Bulk-insert deterministic teams, members and task assignments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=100)
+        parser.add_argument('--members-per-team', type=int, default=20)
+        parser.add_argument('--tasks-per-member', type=int, default=20)
+        parser.add_argument('--task-names', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--anchor-date', type=date.fromisoformat, default=DEFAULT_ANCHOR,
+                            help='Generated dates fall in the year before this date (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help='Delete existing Taskflow data first')
+
+    def handle(self, *args, **options):
+        if options['members_per_team'] < 1 or options['task_names'] < 1:
+            raise CommandError('--members-per-team and --task-names must be at least 1')
+        if options['flush']:
+            flush_core_data()
+        elif models.Member.objects.exists() or models.Task.objects.exists():
+            raise CommandError('The database already has data; pass --flush to replace it')
+
+        start = time.perf_counter()
+        counts = seed_dataset(
+            options['teams'],
+            options['members_per_team'],
+            options['tasks_per_member'],
+            task_names=options['task_names'],
+            seed=options['seed'],
+            anchor=options['anchor_date'],
+            batch_size=options['batch_size'],
+        )
+        counts['seconds'] = round(time.perf_counter() - start, 2)
+        self.stdout.write(json.dumps(counts))
@@ -0,0 +1,317 @@
+"""
+Request, SQL and repository metrics in the Prometheus text format.
+
+`core.middleware.MetricsMiddleware` records, per route (the URL pattern,
+e.g. `edit-task/<int:task_id>/`):
+
+- taskflow_http_request_duration_seconds: latency, also labelled by status;
+- taskflow_http_db_queries: SQL statements issued while handling the request
+  (counted by an execute wrapper on every connection);
+- taskflow_http_db_duration_seconds: time spent in those statements;
+- taskflow_http_response_size_bytes: body size.
+
+Every repository method (see `core.repositories`) is timed into
+taskflow_repository_duration_seconds. Methods that return a lazy queryset
+are timed up to building it; the query itself runs when the caller
+iterates it and is counted against the request.
+
+Samples are accumulated per thread, so recording never takes a lock; the
+`/metrics` view sums the per-thread shards when it renders. A thread takes
+the lock once, to register its shard; shards of threads that have exited
+(ASGI runs each request's sync work on a fresh thread) are then folded
+into a process-wide total, so their number stays bounded. Each process
+keeps its own numbers. Under gunicorn (several worker processes) set
+`TASKFLOW_METRICS_DIR` to a directory shared by the workers: each worker
+periodically writes its snapshot there and `/metrics` merges all of them.
+Empty the directory when the server starts, as files of exited workers are
+kept so that totals never go backwards.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help, label names, buckets)
+METRICS = {
+    'taskflow_http_request_duration_seconds': (
+        'Time to produce a response, by route.', ('route', 'method', 'status'), LATENCY_BUCKETS,
+    ),
+    'taskflow_http_db_queries': (
+        'SQL statements per request, by route.', ('route', 'method'), QUERY_COUNT_BUCKETS,
+    ),
+    'taskflow_http_db_duration_seconds': (
+        'Time spent executing SQL per request, by route.', ('route', 'method'), LATENCY_BUCKETS,
+    ),
+    'taskflow_http_response_size_bytes': (
+        'Response body size, by route.', ('route', 'method'), SIZE_BUCKETS,
+    ),
+    'taskflow_repository_duration_seconds': (
+        'Time spent in repository methods.', ('repository', 'method'), LATENCY_BUCKETS,
+    ),
+}
+
+# Seconds between snapshot writes when TASKFLOW_METRICS_DIR is set.
+FLUSH_INTERVAL = 5.0
+
+
+_local = threading.local()
+_lock = threading.Lock()
+_shards = []  # (thread, shard) for every live thread that recorded samples
+_retired = {}  # samples of exited threads, merged
+_next_flush = 0.0
+
+
+def _shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = {}
+        with _lock:
+            _retire_dead_shards()
+            _shards.append((threading.current_thread(), shard))
+        return shard
+
+
+def _retire_dead_shards():
+    """Fold the shards of exited threads into `_retired`. Hold `_lock`."""
+    live = []
+    for thread, shard in _shards:
+        if thread.is_alive():
+            live.append((thread, shard))
+        else:
+            # Nothing writes to a dead thread's shard any more.
+            for (name, labels), series in shard.items():
+                _merge(_retired, name, labels, series)
+    _shards[:] = live
+
+
+def enabled():
+    return getattr(settings, 'TASKFLOW_METRICS', True)
+
+
+def observe(name, labels, value):
+    """Add `value` to the histogram `name` for the `labels` tuple."""
+    shard = _shard()
+    key = (name, labels)
+    series = shard.get(key)
+    if series is None:
+        # One count per bucket plus +Inf, then the running sum.
+        series = shard[key] = [0] * (len(METRICS[name][2]) + 2)
+    series[bisect_left(METRICS[name][2], value)] += 1
+    series[-1] += value
+
+
+def observe_request(route, method, status, seconds, queries, query_seconds, size):
+    """Record one finished request. `size` is None when it is not known yet."""
+    observe('taskflow_http_request_duration_seconds', (route, method, str(status)), seconds)
+    observe('taskflow_http_db_queries', (route, method), queries)
+    observe('taskflow_http_db_duration_seconds', (route, method), query_seconds)
+    if size is not None:
+        observe_response_size(route, method, size)
+    if _metrics_dir() and time.monotonic() >= _next_flush:
+        flush()
+
+
+def observe_response_size(route, method, size):
+    observe('taskflow_http_response_size_bytes', (route, method), size)
+
+
+class QueryTimer:
+    """Count and time the SQL statements run while it is active."""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+_query_timer = ContextVar('taskflow_query_timer', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper passing each statement to the active `QueryTimer`.
+
+    Installed on every database connection by `install_query_hook`. The
+    timer is found through a context variable rather than by wrapping the
+    request's connection, because async views run their queries on a
+    different thread (and connection) than the middleware; the context,
+    and so the timer, follows them there.
+    """
+    timer = _query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """`connection_created` receiver adding `record_query` to the connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements run in this context; yields the `QueryTimer`."""
+    timer = QueryTimer()
+    token = _query_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _query_timer.reset(token)
+
+
+def timed(repository, method, fn):
+    """Wrap `fn` so each call is recorded under (repository, method)."""
+    labels = (repository, method)
+
+    if iscoroutinefunction(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                observe('taskflow_repository_duration_seconds', labels, time.perf_counter() - start)
+    else:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe('taskflow_repository_duration_seconds', labels, time.perf_counter() - start)
+    return wrapper
+
+
+def instrument(cls):
+    """Class decorator timing every public static method of a repository."""
+    if not enabled():
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if isinstance(value, staticmethod) and not attr.startswith('_'):
+            setattr(cls, attr, staticmethod(timed(cls.__name__, attr, value.__func__)))
+    return cls
+
+
+# --- snapshots and exposition ---------------------------------------------
+
+def _merge(into, name, labels, series):
+    key = (name, tuple(labels))
+    current = into.get(key)
+    if current is None:
+        into[key] = list(series)
+    else:
+        for i, v in enumerate(series):
+            current[i] += v
+
+
+def snapshot():
+    """Sum the per-thread shards of this process into one dict."""
+    with _lock:
+        _retire_dead_shards()
+        merged = {key: list(series) for key, series in _retired.items()}
+        shards = [shard for _, shard in _shards]
+    for shard in shards:
+        # dict.copy() is atomic under the GIL; iterating the live dict is not.
+        for (name, labels), series in shard.copy().items():
+            _merge(merged, name, labels, series)
+    return merged
+
+
+def _metrics_dir():
+    return getattr(settings, 'TASKFLOW_METRICS_DIR', None)
+
+
+def flush():
+    """Write this process's snapshot to TASKFLOW_METRICS_DIR."""
+    global _next_flush
+    _next_flush = time.monotonic() + FLUSH_INTERVAL
+    directory = _metrics_dir()
+    data = [[name, list(labels), series] for (name, labels), series in snapshot().items()]
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def collect():
+    """Return the samples to expose: all workers' when a metrics dir is set."""
+    directory = _metrics_dir()
+    if not directory:
+        return snapshot()
+    flush()
+    merged = {}
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue  # removed or replaced between listing and reading
+        for name, labels, series in data:
+            # Skip metrics a worker on other code (e.g. mid-deploy) reported.
+            if name in METRICS and len(series) == len(METRICS[name][2]) + 2:
+                _merge(merged, name, labels, series)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(samples=None):
+    """Render samples in the Prometheus text exposition format (0.0.4)."""
+    samples = collect() if samples is None else samples
+    by_name = {}
+    for (name, labels), series in samples.items():
+        by_name.setdefault(name, []).append((labels, series))
+
+    lines = []
+    for name, (help_text, label_names, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, series in sorted(by_name.get(name, ())):
+            base = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), series):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{base}}} {_format(series[-1])}')
+            lines.append(f'{name}_count{{{base}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Drop every sample recorded by this process (used by tests)."""
+    with _lock:
+        _retire_dead_shards()
+        _retired.clear()
+        for _, shard in _shards:
+            shard.clear()
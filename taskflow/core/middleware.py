@@ -0,0 +1,298 @@
+"""
+Request middleware: member identity and metrics.
+
+Resolves the logged-in member (from `member_username` in the session) and
+their admin `TeamMember` membership, with its team, once per request and
+exposes them as `request.member` and `request.admin_tm`. Views and services
+reuse these instead of repeating the username and admin lookups.
+
+When `TASKFLOW_IDENTITY_SESSION_CACHE` is enabled the resolved identity is
+also stored in the session next to a version stamp kept in Django's cache.
+Signals in `core.signals` drop the stamp whenever the member, their team
+memberships or their admin team change, which forces a fresh lookup on the
+next request. Only enable it with a cache shared by all workers, otherwise
+another process may keep serving a stale identity.
+
+`MetricsMiddleware` records per-route latency, SQL and response size
+metrics; see `core.metrics`. `ReplicaRoutingMiddleware` sends the reads of
+safe requests to the read replica, if one is configured; see
+`core.routers`.
+"""
+import time
+import uuid
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import transaction
+
+from . import metrics, models
+from .repositories import MemberRepository, build_admin_membership
+from .routers import PIN_COOKIE, read_from, replica_alias, use_primary
+
+
+SESSION_KEY = '_taskflow_identity'
+
+
+def identity_stamp_key(member_id):
+    """Cache key holding the current identity version stamp for a member."""
+    return f'taskflow:identity:{member_id}'
+
+
+def invalidate_identity(member_id):
+    """Invalidate every session-cached identity for `member_id`.
+
+    Deferred until the current transaction commits, so no request can
+    re-cache the identity as it was before the change.
+    """
+    transaction.on_commit(lambda: cache.delete(identity_stamp_key(member_id)))
+
+
+def _new_stamp():
+    return uuid.uuid4().hex
+
+
+def _cached_session_member_id(data, username):
+    """Return the member id of session-cached identity data if it matches `username`."""
+    if not data or data['member']['username'] != username:
+        return None
+    return data['member']['id']
+
+
+def _identity_from_session_data(data):
+    fields = data['member']
+    # `password` is left deferred; it is never needed on the request path.
+    member = models.Member.from_db(
+        'default', ['id', 'username', 'name', 'gmail'],
+        [fields['id'], fields['username'], fields['name'], fields['gmail']],
+    )
+    admin = data['admin_tm']
+    if admin is None:
+        return (member, None)
+    return (member, build_admin_membership(member, admin['id'], admin['team_id'], admin['team_name']))
+
+
+def _session_data(member, admin_tm, stamp):
+    return {
+        'stamp': stamp,
+        'member': {
+            'id': member.id,
+            'username': member.username,
+            'name': member.name,
+            'gmail': member.gmail,
+        },
+        'admin_tm': None if admin_tm is None else {
+            'id': admin_tm.id,
+            'team_id': admin_tm.team_id,
+            'team_name': admin_tm.team.name,
+        },
+    }
+
+
+def _use_session_cache():
+    return getattr(settings, 'TASKFLOW_IDENTITY_SESSION_CACHE', False)
+
+
+def _identity_reads():
+    # An identity read from a lagging replica would be cached under the new stamp.
+    return use_primary() if _use_session_cache() else nullcontext()
+
+
+def resolve_identity(request):
+    """Return `(member, admin_tm)` for the session user; both None when anonymous."""
+    username = request.session.get('member_username')
+    if not username:
+        return (None, None)
+
+    if _use_session_cache():
+        data = request.session.get(SESSION_KEY)
+        member_id = _cached_session_member_id(data, username)
+        if member_id is not None and cache.get(identity_stamp_key(member_id)) == data['stamp']:
+            return _identity_from_session_data(data)
+
+    with _identity_reads():
+        member, admin_tm = MemberRepository.get_with_admin_membership(username)
+    if _use_session_cache() and member is not None:
+        stamp = cache.get_or_set(identity_stamp_key(member.id), _new_stamp, None)
+        request.session[SESSION_KEY] = _session_data(member, admin_tm, stamp)
+    return (member, admin_tm)
+
+
+async def aresolve_identity(request):
+    """Async variant of `resolve_identity`."""
+    username = await request.session.aget('member_username')
+    if not username:
+        return (None, None)
+
+    if _use_session_cache():
+        data = await request.session.aget(SESSION_KEY)
+        member_id = _cached_session_member_id(data, username)
+        if member_id is not None and await cache.aget(identity_stamp_key(member_id)) == data['stamp']:
+            return _identity_from_session_data(data)
+
+    with _identity_reads():
+        member, admin_tm = await MemberRepository.aget_with_admin_membership(username)
+    if _use_session_cache() and member is not None:
+        stamp = await cache.aget_or_set(identity_stamp_key(member.id), _new_stamp, None)
+        await request.session.aset(SESSION_KEY, _session_data(member, admin_tm, stamp))
+    return (member, admin_tm)
+
+
+class MemberIdentityMiddleware:
+    """Attach `request.member` and `request.admin_tm` to every request.
+
+    Must come after `SessionMiddleware`. Runs natively in both the WSGI
+    (sync) and ASGI (async) handler chains.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.member, request.admin_tm = resolve_identity(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.member, request.admin_tm = await aresolve_identity(request)
+        return await self.get_response(request)
+
+
+_SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+
+class ReplicaRoutingMiddleware:
+    """Read from the replica in safe requests; pin recent writers to the primary.
+
+    Put it before any middleware that queries the database (after
+    `MetricsMiddleware`). Removed from the chain when no replica is
+    configured. See `core.routers`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.replica = replica_alias()
+        if self.replica is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _alias(self, request):
+        if request.method in _SAFE_METHODS and PIN_COOKIE not in request.COOKIES:
+            return self.replica
+        return None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with read_from(self._alias(request)):
+            response = self.get_response(request)
+        return self._pin(request, response)
+
+    async def __acall__(self, request):
+        with read_from(self._alias(request)):
+            response = await self.get_response(request)
+        return self._pin(request, response)
+
+    @staticmethod
+    def _pin(request, response):
+        if request.method not in _SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'TASKFLOW_REPLICA_PIN_SECONDS', 5),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        return response
+
+
+_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+def _count_bytes(content, done):
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        done(size)
+
+
+async def _acount_bytes(content, done):
+    size = 0
+    try:
+        async for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        done(size)
+
+
+class MetricsMiddleware:
+    """Record latency, SQL queries and response size for every request.
+
+    Should be first in MIDDLEWARE so the numbers cover the whole stack.
+    Streaming responses are timed until their headers are ready; their size
+    is recorded once the body has been sent. Disabled (removed from the
+    chain) when `TASKFLOW_METRICS` is False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with metrics.count_queries() as timer:
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with metrics.count_queries() as timer:
+            response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    @staticmethod
+    def _record(request, response, seconds, timer):
+        match = request.resolver_match
+        route = match.route if match else '<unmatched>'
+        method = request.method if request.method in _METHODS else 'other'
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+        elif response.has_header('Content-Length'):
+            # e.g. FileResponse; leave its body alone so file_wrapper still applies.
+            size = int(response['Content-Length'])
+        else:
+            def done(size):
+                metrics.observe_response_size(route, method, size)
+            count = _acount_bytes if response.is_async else _count_bytes
+            response.streaming_content = count(response.streaming_content, done)
+        metrics.observe_request(route, method, response.status_code, seconds, timer.count, timer.seconds, size)
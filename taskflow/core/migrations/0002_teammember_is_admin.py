@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2025-11-12 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teammember',
+            name='is_admin',
+            field=models.BooleanField(default=False),
+        ),
+    ]
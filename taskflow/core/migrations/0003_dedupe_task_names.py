@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:13
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tasks(apps, schema_editor):
+    """Fold duplicate `Task.name_task` rows into the oldest one.
+
+    Assignments pointing at a duplicate are repointed to the surviving row
+    so the unique constraint added in 0004 can be created.
+    """
+    Task = apps.get_model('core', 'Task')
+    TeamMemberTask = apps.get_model('core', 'TeamMemberTask')
+    duplicates = (
+        Task.objects.values('name_task')
+        .annotate(keep_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        extra = Task.objects.filter(name_task=row['name_task']).exclude(id=row['keep_id'])
+        TeamMemberTask.objects.filter(task__in=extra).update(task_id=row['keep_id'])
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_teammember_is_admin'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tasks, migrations.RunPython.noop),
+    ]
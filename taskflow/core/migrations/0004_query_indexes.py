@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_dedupe_task_names'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='name_task',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['member', 'is_admin'], name='core_tm_member_admin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammembertask',
+            index=models.Index(fields=['team_member', 'is_finish', 'end_date'], name='core_tmt_member_finish_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:40
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.db import migrations
+
+
+BATCH_SIZE = 500
+
+# Pinned here rather than taken from PASSWORD_HASHERS: what the migration
+# writes must not depend on later settings, and the full work factor would
+# cost about 0.4 s per member inside the migration's transaction. Members
+# are upgraded to the configured hasher on their next login.
+ITERATIONS = 10_000
+HASHED_PREFIXES = ('pbkdf2_sha256$', 'pbkdf2_sha1$', 'argon2$', 'bcrypt_sha256$', 'bcrypt$', 'scrypt$')
+
+
+class MigrationPasswordHasher(PBKDF2PasswordHasher):
+    iterations = ITERATIONS
+
+
+def _is_hashed(value):
+    return value.startswith(HASHED_PREFIXES)
+
+
+def hash_plaintext_passwords(apps, schema_editor):
+    """Replace every plain-text `Member.password` with a hash."""
+    Member = apps.get_model('core', 'Member')
+    last_id = 0
+    while True:
+        batch = list(Member.objects.filter(id__gt=last_id).order_by('id').only('id', 'password')[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        stale = [m for m in batch if not _is_hashed(m.password)]
+        for member in stale:
+            member.password = make_password(member.password, hasher=MigrationPasswordHasher())
+        Member.objects.bulk_update(stale, ['password'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_plaintext_passwords, migrations.RunPython.noop),
+    ]
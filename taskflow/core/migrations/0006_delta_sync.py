@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_clock(apps, schema_editor):
+    SyncClock = apps.get_model('core', 'SyncClock')
+    SyncClock.objects.get_or_create(pk=1, defaults={'version': 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_hash_member_passwords'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncClock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assignment_id', models.BigIntegerField()),
+                ('team_id', models.BigIntegerField()),
+                ('member_id', models.BigIntegerField()),
+                ('version', models.BigIntegerField()),
+                ('removed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['member_id', 'version'], name='core_tomb_member_ver_idx'),
+                    models.Index(fields=['team_id', 'version'], name='core_tomb_team_ver_idx'),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name='teammembertask',
+            name='version',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='teammembertask',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(create_clock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_delta_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamMemberTaskStats',
+            fields=[
+                ('team_member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to='core.teammember')),
+                ('open_count', models.IntegerField(default=0)),
+                ('done_count', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:56
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+# A frozen copy of core.search.tokens as of this migration, so that later
+# changes to the tokenizer do not change what this migration writes.
+# `manage.py rebuild_search_index` re-indexes with the current one.
+MAX_TOKEN_LENGTH = 32
+MAX_INDEXED_CHARS = 64
+PREFIX, WORD, SUBSTRING = 0, 1, 2
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', str(text or '')).casefold()
+    chars = (ch if ch.isalnum() else ' ' for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(''.join(chars).split())
+
+
+def tokens(*values):
+    found = {}
+    for value in values:
+        value = normalize(value)[:MAX_INDEXED_CHARS]
+        for i, ch in enumerate(value):
+            if ch == ' ':
+                continue
+            if i == 0:
+                rank = PREFIX
+            elif value[i - 1] == ' ':
+                rank = WORD
+            else:
+                rank = SUBSTRING
+            token = value[i:i + MAX_TOKEN_LENGTH].rstrip()
+            if rank < found.get(token, SUBSTRING + 1):
+                found[token] = rank
+    return found
+
+
+def index_existing_rows(apps, schema_editor):
+    """Index the members and assigned task names of every team."""
+    TeamMember = apps.get_model('core', 'TeamMember')
+    TeamMemberTask = apps.get_model('core', 'TeamMemberTask')
+    SearchToken = apps.get_model('core', 'SearchToken')
+    sources = [
+        (('m', tm_id, team_id, name, username)
+         for tm_id, team_id, name, username in TeamMember.objects.values_list(
+             'id', 'team_id', 'member__name', 'member__username').iterator()),
+        (('t', task_id, team_id, name)
+         for team_id, task_id, name in TeamMemberTask.objects.values_list(
+             'team_member__team_id', 'task_id', 'task__name_task').distinct().iterator()),
+    ]
+    rows = []
+    for source in sources:
+        for kind, object_id, team_id, *values in source:
+            rows.extend(
+                SearchToken(team_id=team_id, kind=kind, object_id=object_id, token=token, rank=rank)
+                for token, rank in tokens(*values).items()
+            )
+            if len(rows) >= BATCH_SIZE:
+                SearchToken.objects.bulk_create(rows)
+                rows = []
+    SearchToken.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_task_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('t', 'task'), ('m', 'member')], max_length=1)),
+                ('object_id', models.BigIntegerField()),
+                ('token', models.CharField(max_length=32)),
+                ('rank', models.SmallIntegerField()),
+                ('team', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['team', 'token'], name='core_search_team_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'team', 'token'), name='core_search_object_token_uniq')],
+            },
+        ),
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
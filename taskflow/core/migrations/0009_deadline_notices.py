@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_search_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadlineNotice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('due', 'due soon'), ('overdue', 'overdue')], max_length=7)),
+                ('end_date', models.DateField()),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='teammembertask',
+            index=models.Index(fields=['is_finish', 'end_date'], name='core_tmt_finish_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='deadlinenotice',
+            name='assignment',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.teammembertask'),
+        ),
+        migrations.AddField(
+            model_name='deadlinenotice',
+            name='member',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.member'),
+        ),
+        migrations.AddIndex(
+            model_name='deadlinenotice',
+            index=models.Index(fields=['sent_at', 'member', 'id'], name='core_notice_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='deadlinenotice',
+            constraint=models.UniqueConstraint(fields=('assignment', 'kind', 'end_date'), name='core_notice_once_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_deadline_notices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.task')),
+                ('team', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.team')),
+                ('team_member', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.teammember')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['team_member', 'end_date', 'id'], name='core_archive_member_idx'), models.Index(fields=['team', 'end_date', 'id'], name='core_archive_team_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_member_removals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncclock',
+            name='horizon',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -10,6 +10,18 @@ This module defines the core domain entities:
   team.
 - `TeamMemberTask`: assignment of a `Task` to a `TeamMember` with start/end
   dates and completion state.
+- `ArchivedTask`: finished assignments moved out of `TeamMemberTask` by
+  `manage.py archive_tasks`.
+- `SyncClock` and `TaskTombstone`: change tracking for delta sync (see
+  `core.repositories.SyncRepository`).
+- `TeamMemberTaskStats`: optional running open/done counts per team member
+  behind the `stats/` endpoint (see `core.repositories.TaskStatsRepository`).
+- `SearchToken`: the team-scoped token index behind the `search/` endpoint
+  (see `core.search`).
+- `DeadlineNotice`: the outbox of due-soon and overdue reminders sent by
+  `manage.py scan_deadlines` (see `core.deadlines`).
+- `MemberRemoval`: member removals queued for `manage.py
+  process_member_removals`.
 
 These classes keep the schema intentionally small and explicit to make the
 application logic easy to reason about. Unique constraints and foreign keys
@@ -27,8 +39,8 @@ class Member(models.Model):
             session identity.
         name (str): human-friendly display name shown in the UI (not unique).
         gmail (str): contact email address.
-        password (str): stored password (plain-text in this demo; replace with
-            a hashed password implementation for production).
+        password (str): password hash in Django's `algorithm$...` format
+            (see `core.passwords`).
     """
 
     username = models.CharField(max_length=255, unique=True)
@@ -57,10 +69,11 @@ class Task(models.Model):
     """A reusable task template stored by name.
 
     Tasks are lightweight and are associated with `TeamMemberTask` when
-    assigned to a team member.
+    assigned to a team member. `name_task` is unique so that name lookups
+    hit an index and concurrent `get_or_create` calls cannot fork a name.
     """
 
-    name_task = models.CharField(max_length=255)
+    name_task = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return self.name_task
@@ -77,6 +90,12 @@ class TeamMember(models.Model):
     member = models.ForeignKey(Member, on_delete=models.CASCADE)
     is_admin = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # get_admin_for_member runs on nearly every authenticated request.
+            models.Index(fields=['member', 'is_admin'], name='core_tm_member_admin_idx'),
+        ]
+
     def __str__(self):
         return f"{self.member.name} in {self.team.name}"
 
@@ -85,6 +104,8 @@ class TeamMemberTask(models.Model):
     """An assignment of a `Task` to a `TeamMember`.
 
     Fields include `start_date`, `end_date` and `is_finish` to track progress.
+    `version` is stamped from `SyncClock` on every write so clients can ask
+    for the rows changed since their last sync.
     """
 
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
@@ -92,6 +113,174 @@ class TeamMemberTask(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     is_finish = models.BooleanField(default=False)
+    version = models.BigIntegerField(default=0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Per-member task lists, optionally narrowed to open tasks and
+            # ordered or bounded by due date.
+            models.Index(
+                fields=['team_member', 'is_finish', 'end_date'],
+                name='core_tmt_member_finish_idx',
+            ),
+            # Open tasks across all teams by due date (deadline scans).
+            models.Index(fields=['is_finish', 'end_date'], name='core_tmt_finish_due_idx'),
+        ]
 
     def __str__(self):
         return f"{self.task.name_task} - {self.team_member.member.name}"
+
+
+class ArchivedTask(models.Model):
+    """A finished assignment moved out of `TeamMemberTask` (the hot table).
+
+    Keeps the assignment's id, so clients see the same row, and its team,
+    so a team's archive is one range of the (team, end_date, id) index.
+    Archived rows are read-only and not versioned; archiving leaves a
+    tombstone for delta sync like a delete.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    team_member = models.ForeignKey(TeamMember, on_delete=models.CASCADE, db_index=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, db_index=False)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pages of a member's and of a team's archive.
+            models.Index(fields=['team_member', 'end_date', 'id'], name='core_archive_member_idx'),
+            models.Index(fields=['team', 'end_date', 'id'], name='core_archive_team_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task.name_task} - {self.team_member.member.name} (archived)"
+
+
+class SyncClock(models.Model):
+    """Single-row counter handing out `TeamMemberTask` versions.
+
+    Incrementing it locks the row until the writing transaction commits, so
+    versions become visible in increasing order. `horizon` is the highest
+    version whose tombstones `manage.py purge_tombstones` may have deleted;
+    delta syncs from an older token are refused.
+    """
+
+    version = models.BigIntegerField(default=0)
+    horizon = models.BigIntegerField(default=0)
+
+
+class TaskTombstone(models.Model):
+    """Records that an assignment left a member's or team's task list.
+
+    Written when a `TeamMemberTask` is deleted (its team and member) or
+    reassigned (its previous member). Ids are plain integers because the
+    rows they point at may be gone.
+    """
+
+    assignment_id = models.BigIntegerField()
+    team_id = models.BigIntegerField()
+    member_id = models.BigIntegerField()
+    version = models.BigIntegerField()
+    removed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['member_id', 'version'], name='core_tomb_member_ver_idx'),
+            models.Index(fields=['team_id', 'version'], name='core_tomb_team_ver_idx'),
+        ]
+
+
+class TeamMemberTaskStats(models.Model):
+    """Running counts of a team member's open and finished assignments.
+
+    Only maintained when `TASKFLOW_TASK_STATS_TABLE` is on: the task
+    services apply `F()` increments in the same transaction as each write.
+    A member without a row has no assignments. Run
+    `manage.py rebuild_task_stats` after turning the setting on.
+    """
+
+    team_member = models.OneToOneField(
+        TeamMember, on_delete=models.CASCADE, primary_key=True, related_name='task_stats'
+    )
+    open_count = models.IntegerField(default=0)
+    done_count = models.IntegerField(default=0)
+
+
+class SearchToken(models.Model):
+    """One indexed suffix of a task name or member name/username in a team.
+
+    `object_id` is a `Task` id (kind `task`) or a `TeamMember` id (kind
+    `member`); it is a plain integer because the index is pruned by the
+    repositories rather than by cascades. `rank` is the match a query
+    prefixing `token` produces (see `core.search`).
+    """
+
+    TASK = 't'
+    MEMBER = 'm'
+    KIND_CHOICES = [(TASK, 'task'), (MEMBER, 'member')]
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, db_index=False)
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    token = models.CharField(max_length=32)
+    rank = models.SmallIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also the index for finding or pruning one object's tokens.
+            models.UniqueConstraint(fields=['kind', 'object_id', 'team', 'token'], name='core_search_object_token_uniq'),
+        ]
+        indexes = [
+            # Prefix range scans within one team.
+            models.Index(fields=['team', 'token'], name='core_search_team_token_idx'),
+        ]
+
+
+class DeadlineNotice(models.Model):
+    """A due-soon or overdue reminder for one assignment, queued for its member.
+
+    Unique per (assignment, kind, end_date), so a rescan never queues the
+    same reminder twice, while a task whose end date moved is reminded
+    again. `sent_at` is set once the member's digest went out. The
+    assignment is not a constraint, so deleting tasks costs no extra
+    query; notices of deleted assignments are simply never sent.
+    """
+
+    DUE = 'due'
+    OVERDUE = 'overdue'
+    KIND_CHOICES = [(DUE, 'due soon'), (OVERDUE, 'overdue')]
+
+    assignment = models.ForeignKey(
+        TeamMemberTask, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    member = models.ForeignKey(Member, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    end_date = models.DateField()
+    queued_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['assignment', 'kind', 'end_date'], name='core_notice_once_uniq'),
+        ]
+        indexes = [
+            # Pending notices grouped by recipient.
+            models.Index(fields=['sent_at', 'member', 'id'], name='core_notice_pending_idx'),
+        ]
+
+
+class MemberRemoval(models.Model):
+    """A member removal queued to run in the background.
+
+    Removing a member with a long task history deletes every one of their
+    assignments; `TeamService.remove_member(..., background=True)` queues
+    it here instead and `manage.py process_member_removals` carries it out.
+    The row goes away with the member.
+    """
+
+    member = models.OneToOneField(Member, on_delete=models.CASCADE)
+    requested_at = models.DateTimeField(auto_now_add=True)
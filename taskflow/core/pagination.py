@@ -0,0 +1,67 @@
+"""
+Keyset (seek) pagination helpers.
+
+Pages are ordered by `(end_date, id)` and addressed with an opaque cursor
+that encodes the sort key of the last row the client received. Unlike
+OFFSET pagination, fetching page N costs the same as fetching page 1.
+
+`parse_since` reads the delta-sync token accepted by the same endpoints.
+"""
+import base64
+from datetime import date
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded."""
+
+
+def encode_cursor(end_date, pk):
+    """Encode the `(end_date, id)` sort key of a row into an opaque cursor."""
+    raw = f"{end_date.isoformat()}:{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor back into an `(end_date, id)` tuple."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        end_date, pk = raw.split(':', 1)
+        return (date.fromisoformat(end_date), int(pk))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def parse_limit(value):
+    """Parse a `limit` query parameter, clamped to `MAX_PAGE_SIZE`."""
+    if value in (None, ''):
+        return None
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_since(value):
+    """Parse a `since` sync token (a version from a previous response)."""
+    if value in (None, ''):
+        return None
+    since = int(value)
+    if since < 0:
+        raise ValueError('since must not be negative')
+    return since
+
+
+def keyset_filter(queryset, after):
+    """Order `queryset` by `(end_date, id)` and seek past the `after` key."""
+    queryset = queryset.order_by('end_date', 'id')
+    if after is None:
+        return queryset
+    end_date, pk = after
+    return queryset.filter(Q(end_date__gt=end_date) | Q(end_date=end_date, id__gt=pk))
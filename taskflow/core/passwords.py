@@ -0,0 +1,78 @@
+"""
+Password hashing and verification off the request thread.
+
+Hashing is deliberately CPU-heavy. All hashing and verification runs on a
+bounded thread pool (`TASKFLOW_PASSWORD_WORKERS` threads) so a login storm
+uses at most that many cores: async workers keep serving other requests
+while they await a result, and sync workers queue instead of all hashing
+at once. hashlib releases the GIL while computing PBKDF2, so the threads
+run in parallel.
+
+Rows that still hold a plain-text password (from before the
+`0005_hash_member_passwords` migration) are compared in constant time and
+flagged for rehashing, like hashes made with an outdated work factor.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password, verify_password
+from django.utils.crypto import constant_time_compare
+
+
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'TASKFLOW_PASSWORD_WORKERS', None) or os.cpu_count() or 1
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password')
+    return _executor
+
+
+def is_hashed(encoded):
+    """Return True if `encoded` is a hash produced by a configured hasher."""
+    try:
+        identify_hasher(encoded)
+    except ValueError:
+        return False
+    return True
+
+
+def _check(raw_password, encoded):
+    """Return (is_correct, needs_rehash) for `raw_password` against a stored value.
+
+    `encoded` may be None for an unknown user; the default hasher still
+    runs so that response times do not reveal which usernames exist.
+    """
+    if encoded and not is_hashed(encoded):
+        return (constant_time_compare(raw_password, encoded), True)
+    return verify_password(raw_password, encoded or '')
+
+
+def hash_password(raw_password):
+    """Hash a password with the current hasher settings (on the pool)."""
+    return _pool().submit(make_password, raw_password).result()
+
+
+def hash_passwords(raw_passwords, hasher='default'):
+    """Hash many passwords in parallel on the pool, preserving order."""
+    return list(_pool().map(partial(make_password, hasher=hasher), raw_passwords))
+
+
+def check_password(raw_password, encoded):
+    """Verify a password on the pool. Returns (is_correct, needs_rehash)."""
+    return _pool().submit(_check, raw_password, encoded).result()
+
+
+async def ahash_password(raw_password):
+    """Async variant of `hash_password`; the event loop is never blocked."""
+    return await asyncio.get_running_loop().run_in_executor(_pool(), make_password, raw_password)
+
+
+async def acheck_password(raw_password, encoded):
+    """Async variant of `check_password`; the event loop is never blocked."""
+    return await asyncio.get_running_loop().run_in_executor(_pool(), _check, raw_password, encoded)
@@ -1,10 +1,75 @@
 """
 Repository layer: encapsulates all database access.
 Use these classes to isolate queries so business logic doesn't depend on ORM details.
+Every public method is timed into the repository metrics (see `core.metrics`).
 """
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import Count, DateField, Exists, F, Max, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
 from . import models
+from .caching import bump_team_generation
+from .events import member_channel, publish, team_channel
+from .interning import task_names
+from .metrics import instrument
+from .pagination import keyset_filter
+from .search import DEFAULT_LIMIT as SEARCH_LIMIT, TOKEN_RANGE_END, tokens as search_tokens
+
+
+# Cache key holding `SyncRepository.get_horizon`.
+SYNC_HORIZON_KEY = 'taskflow:sync-horizon'
+
+
+def _to_python(model, field_name, value):
+    """Coerce a raw value (e.g. a date string from a form) to the field's Python type."""
+    return model._meta.get_field(field_name).to_python(value)
+
 
+def _assign_changed(instance, values):
+    """
+    Set `values` (attribute name -> value) on a model instance and return
+    the names of the fields whose value actually changed, for `update_fields`.
+    """
+    changed = []
+    for attname, value in values.items():
+        if getattr(instance, attname) != value:
+            setattr(instance, attname, value)
+            changed.append(instance._meta.get_field(attname).name)
+    return changed
 
+
+def _delete_assignments(ids):
+    """
+    Delete the TeamMemberTask rows `ids` in one plain DELETE, skipping the
+    collector and the per-row delete signals. That is safe because nothing
+    cascades from an assignment (DeadlineNotice points at it with
+    DO_NOTHING and no constraint), and every caller does in bulk what
+    `signals.assignment_changed` would do per row: write the tombstones,
+    bump the team generations and publish the change.
+    Returns the number of rows deleted.
+    """
+    qs = models.TeamMemberTask.objects.filter(id__in=ids)
+    return qs._raw_delete(qs.db)
+
+
+def build_admin_membership(member, team_member_id, team_id, team_name):
+    """Assemble an admin TeamMember (and its Team) from already-fetched columns."""
+    db = member._state.db
+    team = models.Team.from_db(db, ['id', 'name'], [team_id, team_name])
+    team_member = models.TeamMember.from_db(
+        db, ['id', 'team_id', 'member_id', 'is_admin'], [team_member_id, team_id, member.id, True]
+    )
+    team_member.team = team
+    team_member.member = member
+    return team_member
+
+
+@instrument
 class MemberRepository:
     """Handle all Member database operations."""
 
@@ -13,6 +78,45 @@ class MemberRepository:
         """Retrieve a member by username."""
         return models.Member.objects.filter(username=username).first()
 
+    @staticmethod
+    async def aget_by_username(username):
+        """Async variant of `get_by_username`."""
+        return await models.Member.objects.filter(username=username).afirst()
+
+    @staticmethod
+    def _with_admin_membership(username):
+        admin_tm = models.TeamMember.objects.filter(
+            member=OuterRef('pk'), is_admin=True
+        ).order_by('id')
+        return models.Member.objects.filter(username=username).annotate(
+            admin_tm_id=Subquery(admin_tm.values('id')[:1]),
+            admin_team_id=Subquery(admin_tm.values('team_id')[:1]),
+            admin_team_name=Subquery(admin_tm.values('team__name')[:1]),
+        )
+
+    @staticmethod
+    def _split_admin_membership(member):
+        if member is None or member.admin_tm_id is None:
+            return (member, None)
+        return (member, build_admin_membership(
+            member, member.admin_tm_id, member.admin_team_id, member.admin_team_name
+        ))
+
+    @staticmethod
+    def get_with_admin_membership(username):
+        """
+        Retrieve a member and their admin TeamMember (with team) in one query.
+        Returns tuple: (member, admin_team_member); either may be None.
+        """
+        member = MemberRepository._with_admin_membership(username).first()
+        return MemberRepository._split_admin_membership(member)
+
+    @staticmethod
+    async def aget_with_admin_membership(username):
+        """Async variant of `get_with_admin_membership`."""
+        member = await MemberRepository._with_admin_membership(username).afirst()
+        return MemberRepository._split_admin_membership(member)
+
     @staticmethod
     def get_by_id(member_id):
         """Retrieve a member by ID."""
@@ -30,12 +134,53 @@ class MemberRepository:
             username=username, name=name, gmail=gmail, password=password
         )
 
+    @staticmethod
+    def set_password(member, encoded_password):
+        """Store a new password hash, writing only that column."""
+        member.password = encoded_password
+        models.Member.objects.filter(pk=member.pk).update(password=encoded_password)
+
+    @staticmethod
+    async def aset_password(member, encoded_password):
+        """Async variant of `set_password`."""
+        member.password = encoded_password
+        await models.Member.objects.filter(pk=member.pk).aupdate(password=encoded_password)
+
+    @staticmethod
+    def update_profile(member, name, username, gmail, password):
+        """
+        Update a member's profile, writing only the columns that changed,
+        and reindex it for search when its name or username did.
+        """
+        changed = _assign_changed(member, {'name': name, 'username': username, 'gmail': gmail, 'password': password})
+        if changed:
+            with transaction.atomic():
+                member.save(update_fields=changed)
+                if {'name', 'username'} & set(changed):
+                    SearchRepository.reindex_member(member)
+        return member
+
     @staticmethod
     def username_exists(username):
         """Check if username is already taken."""
         return models.Member.objects.filter(username=username).exists()
 
+    @staticmethod
+    def existing_usernames(usernames):
+        """Return the subset of `usernames` that are already taken (one IN query)."""
+        return set(
+            models.Member.objects.filter(username__in=usernames).values_list('username', flat=True)
+        )
+
+    @staticmethod
+    def create_many(rows, batch_size=500):
+        """Bulk-create Members from dicts of username/name/gmail/password."""
+        return models.Member.objects.bulk_create(
+            [models.Member(**row) for row in rows], batch_size=batch_size
+        )
+
 
+@instrument
 class TeamRepository:
     """Handle all Team database operations."""
 
@@ -55,6 +200,7 @@ class TeamRepository:
         return models.Team.objects.create(name=name)
 
 
+@instrument
 class TeamMemberRepository:
     """Handle all TeamMember database operations."""
 
@@ -63,6 +209,18 @@ class TeamMemberRepository:
         """Retrieve a TeamMember by ID."""
         return models.TeamMember.objects.filter(id=team_member_id).first()
 
+    @staticmethod
+    def get_in_team(team_member_id, team):
+        """
+        Retrieve a TeamMember of `team` by ID, with its Member.
+        Returns None when it does not exist or belongs to another team.
+        """
+        return (
+            models.TeamMember.objects.select_related('member')
+            .filter(id=team_member_id, team=team)
+            .first()
+        )
+
     @staticmethod
     def get_by_member_and_team(member, team):
         """Retrieve a TeamMember by member and team."""
@@ -70,28 +228,141 @@ class TeamMemberRepository:
 
     @staticmethod
     def get_admin_for_member(member):
-        """Get the admin team membership for a member (if any)."""
-        return models.TeamMember.objects.filter(member=member, is_admin=True).first()
+        """Get the admin team membership for a member (if any), with its team."""
+        return (
+            models.TeamMember.objects.select_related('team')
+            .filter(member=member, is_admin=True)
+            .first()
+        )
+
+    @staticmethod
+    async def aget_admin_for_member(member):
+        """Async variant of `get_admin_for_member`."""
+        return await (
+            models.TeamMember.objects.select_related('team')
+            .filter(member=member, is_admin=True)
+            .afirst()
+        )
 
     @staticmethod
     def get_all_for_team(team):
         """Get all members of a team."""
         return models.TeamMember.objects.filter(team=team)
 
+    @staticmethod
+    def get_rows_for_team(team):
+        """Get the members of a team as flat dicts joined with their Member row."""
+        return (
+            models.TeamMember.objects.filter(team=team)
+            .order_by('id')
+            .values(
+                'id',
+                'is_admin',
+                name=F('member__name'),
+                username=F('member__username'),
+                gmail=F('member__gmail'),
+            )
+        )
+
+    @staticmethod
+    def get_rows_in_team(team, team_member_ids):
+        """Get the `get_rows_for_team` rows of the given members of `team`."""
+        return TeamMemberRepository.get_rows_for_team(team).filter(id__in=team_member_ids)
+
+    @staticmethod
+    def get_ids_in_team(team, team_member_ids):
+        """Return the subset of `team_member_ids` that belong to `team`."""
+        return set(
+            models.TeamMember.objects.filter(team=team, id__in=team_member_ids)
+            .values_list('id', flat=True)
+        )
+
     @staticmethod
     def create(team, member, is_admin=False):
-        """Create and return a new TeamMember."""
-        return models.TeamMember.objects.create(
-            team=team, member=member, is_admin=is_admin
+        """Create and return a new TeamMember, indexed for search."""
+        with transaction.atomic():
+            team_member = models.TeamMember.objects.create(
+                team=team, member=member, is_admin=is_admin
+            )
+            SearchRepository.index_members([team_member])
+        return team_member
+
+    @staticmethod
+    def create_many(team, members, batch_size=500):
+        """Bulk-add non-admin `members` to `team` and return the TeamMembers."""
+        created = models.TeamMember.objects.bulk_create(
+            [models.TeamMember(team=team, member=member, is_admin=False) for member in members],
+            batch_size=batch_size,
+        )
+        SearchRepository.index_members(created)
+        # bulk_create sends no post_save signals.
+        bump_team_generation(team.id)
+        publish([team_channel(team.id)], {'kind': 'member', 'action': 'saved'})
+        return created
+
+    @staticmethod
+    def delete_member(member, batch_size=1000):
+        """
+        Delete a Member with their memberships in every team, their hot and
+        archived assignments, reminders and search entries.
+
+        Assignments go `batch_size` at a time (a SELECT of ids, a DELETE and
+        the batch's tombstones), each batch in its own transaction unless
+        the caller wraps the whole removal in one; Django's collector would
+        load every assignment and send a delete signal for each. The member
+        is deleted last, so an interrupted removal can simply be run again.
+        """
+        memberships = dict(models.TeamMember.objects.filter(member=member).values_list('id', 'team_id'))
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    models.TeamMemberTask.objects.filter(team_member_id__in=memberships)
+                    .values_list('id', 'team_member_id', 'task_id')[:batch_size]
+                )
+                if not rows:
+                    break
+                _delete_assignments([row[0] for row in rows])
+                SyncRepository.record_removals(
+                    [(assignment_id, memberships[tm_id], member.id) for assignment_id, tm_id, _ in rows]
+                )
+                task_ids = {}
+                for _, tm_id, task_id in rows:
+                    task_ids.setdefault(memberships[tm_id], set()).add(task_id)
+                for team_id, ids in task_ids.items():
+                    SearchRepository.prune_tasks(team_id, ids)
+                bump_team_generation(*task_ids)
+        leftovers = (
+            models.ArchivedTask.objects.filter(team_member_id__in=memberships),
+            models.DeadlineNotice.objects.filter(member_id=member.id),
         )
+        for qs in leftovers:
+            while True:
+                ids = list(qs.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                # Neither model has signals or dependents, so this is
+                # still a single DELETE.
+                qs.model.objects.filter(id__in=ids).delete()
+        with transaction.atomic():
+            SearchRepository.unindex_members(list(memberships))
+            # Nothing large is left for the collector: the memberships,
+            # their stats rows and a queued removal.
+            member.delete()
+
+    @staticmethod
+    def queue_removal(member):
+        """Queue `member` for `process_member_removals` (once)."""
+        models.MemberRemoval.objects.get_or_create(member=member)
 
     @staticmethod
-    def delete(team_member,m):
-        """Delete a TeamMember."""
-        team_member.delete()
-        m.delete()
+    def get_queued_removals(limit=100):
+        """Get up to `limit` members queued for removal, oldest request first."""
+        return list(
+            models.Member.objects.filter(memberremoval__isnull=False).order_by('memberremoval__requested_at', 'id')[:limit]
+        )
 
 
+@instrument
 class TaskRepository:
     """Handle all Task database operations."""
 
@@ -101,12 +372,40 @@ class TaskRepository:
         return models.Task.objects.filter(id=task_id).first()
 
     @staticmethod
-    def get_by_name(name):
-        """Retrieve a task by name (or create if not exists)."""
-        task, created = models.Task.objects.get_or_create(name_task=name)
-        return task
+    def get_or_create_id(name):
+        """Resolve one task name to its id, creating the task if needed."""
+        return TaskRepository.get_or_create_many([name])[name]
+
+    @staticmethod
+    def get_or_create_many(names):
+        """
+        Resolve many task names at once, creating the missing ones.
+        Returns a dict of name -> task id. Names interned by this process
+        (see `core.interning`) cost no query; the others cost one, plus an
+        insert and a second select when some are new.
+        """
+        names = set(names)
+        token, ids = task_names.lookup(names)
+        missing = names - ids.keys()
+        if not missing:
+            return ids
+        existing = dict(models.Task.objects.filter(name_task__in=missing).values_list('name_task', 'id'))
+        task_names.store(token, existing)
+        ids.update(existing)
+        missing -= existing.keys()
+        if missing:
+            # ignore_conflicts: a concurrent request may insert the same name.
+            models.Task.objects.bulk_create(
+                [models.Task(name_task=name) for name in missing], ignore_conflicts=True
+            )
+            created = dict(models.Task.objects.filter(name_task__in=missing).values_list('name_task', 'id'))
+            # Rows inserted by this transaction are only interned once it commits.
+            transaction.on_commit(lambda: task_names.store(token, created))
+            ids.update(created)
+        return ids
 
 
+@instrument
 class TeamMemberTaskRepository:
     """Handle all TeamMemberTask database operations."""
 
@@ -115,46 +414,862 @@ class TeamMemberTaskRepository:
         """Retrieve a TeamMemberTask by ID."""
         return models.TeamMemberTask.objects.filter(id=task_id).first()
 
+    @staticmethod
+    def get_in_team(task_id, team, assignee_id=None):
+        """
+        Retrieve an assignment of `team` by ID, with its TeamMember.
+        Returns None when it does not exist or belongs to another team.
+        With `assignee_id`, the same query also checks that TeamMember is in
+        `team`: it is set as `.assignee` (None when it is not).
+        """
+        qs = models.TeamMemberTask.objects.select_related('team_member').filter(
+            id=task_id, team_member__team=team
+        )
+        if assignee_id is None:
+            return qs.first()
+        assignee = models.TeamMember.objects.filter(id=assignee_id, team=team)
+        team_member_task = qs.annotate(
+            assignee_member_id=Subquery(assignee.values('member_id')[:1])
+        ).first()
+        if team_member_task is not None:
+            member_id = team_member_task.assignee_member_id
+            team_member_task.assignee = None if member_id is None else models.TeamMember.from_db(
+                team_member_task._state.db, ['id', 'team_id', 'member_id'], [int(assignee_id), team.id, member_id]
+            )
+        return team_member_task
+
+    @staticmethod
+    def get_for_member(task_id, member):
+        """
+        Retrieve an assignment of `member` by ID, with its TeamMember.
+        Returns None when it does not exist or is assigned to someone else.
+        """
+        return (
+            models.TeamMemberTask.objects.select_related('team_member')
+            .filter(id=task_id, team_member__member=member)
+            .first()
+        )
+
     @staticmethod
     def get_all_for_member(member):
         """Get all tasks assigned to a member."""
         return models.TeamMemberTask.objects.filter(team_member__member=member)
 
     @staticmethod
-    def get_all_for_team(team):
-        """Get all tasks in a team."""
-        return models.TeamMemberTask.objects.filter(team_member__team=team)
+    def get_all_for_team(team, after=None, limit=None):
+        """
+        Get all tasks in a team, ordered by (end_date, id).
+        Pass the `(end_date, id)` of the last row seen as `after` and a `limit`
+        to fetch one keyset page.
+        """
+        qs = keyset_filter(models.TeamMemberTask.objects.filter(team_member__team=team), after)
+        return qs[:limit] if limit else qs
+
+    @staticmethod
+    def get_rows_for_member(member, since=None):
+        """
+        Get a member's assignments as flat dicts with task and team names joined in.
+        Pass a sync version as `since` to get only the rows written after it.
+        """
+        qs = models.TeamMemberTask.objects.filter(team_member__member=member)
+        if since is not None:
+            qs = qs.filter(version__gt=since)
+        return (
+            qs.order_by('id')
+            .values(
+                'id',
+                'start_date',
+                'end_date',
+                'is_finish',
+                'version',
+                task_name=F('task__name_task'),
+                team_name=F('team_member__team__name'),
+            )
+        )
 
     @staticmethod
-    def create(task, team_member, start_date, end_date):
+    def get_rows_for_tasks(team, task_ids):
+        """
+        Get a team's assignments of the given tasks as flat dicts with the
+        task and assignee names joined in, ordered by (end_date, id).
+        """
+        return (
+            # `+ 0` keeps the team's index out of the plan: without table
+            # statistics SQLite would walk every assignment of the team
+            # rather than those of the few tasks.
+            models.TeamMemberTask.objects.alias(team_scope=F('team_member__team_id') + 0)
+            .filter(task_id__in=task_ids, team_scope=team.id)
+            .order_by('end_date', 'id')
+            .values(
+                'id',
+                'task_id',
+                'team_member_id',
+                'start_date',
+                'end_date',
+                'is_finish',
+                task_name=F('task__name_task'),
+                assigned_to=F('team_member__member__name'),
+            )
+        )
+
+    @staticmethod
+    def get_rows_for_team(team, after=None, limit=None, since=None):
+        """
+        Get a team's assignments as flat dicts with task and assignee names joined in.
+        Ordered by (end_date, id) and keyset-paginated like `get_all_for_team`.
+        Pass a sync version as `since` to get only the rows written after it.
+        """
+        qs = models.TeamMemberTask.objects.filter(team_member__team=team)
+        if since is not None:
+            qs = qs.filter(version__gt=since)
+        qs = (
+            keyset_filter(qs, after)
+            .values(
+                'id',
+                'start_date',
+                'end_date',
+                'is_finish',
+                'version',
+                task_name=F('task__name_task'),
+                assigned_to=F('team_member__member__name'),
+            )
+        )
+        return qs[:limit] if limit else qs
+
+    @staticmethod
+    def create(task_id, team_member, start_date, end_date):
         """Create and return a new TeamMemberTask."""
-        return models.TeamMemberTask.objects.create(
-            task=task,
-            team_member=team_member,
-            start_date=start_date,
-            end_date=end_date,
-            is_finish=False,
-        )
-
-    @staticmethod
-    def update(team_member_task, task, team_member, start_date, end_date, is_finish):
-        """Update a TeamMemberTask."""
-        team_member_task.task = task
-        team_member_task.team_member = team_member
-        team_member_task.start_date = start_date
-        team_member_task.end_date = end_date
-        team_member_task.is_finish = is_finish
-        team_member_task.save()
+        # The version stamp (see core.signals) must commit with the row.
+        with transaction.atomic():
+            return models.TeamMemberTask.objects.create(
+                task_id=task_id,
+                team_member=team_member,
+                start_date=start_date,
+                end_date=end_date,
+                is_finish=False,
+            )
+
+    @staticmethod
+    def create_many(team, rows, batch_size=500):
+        """
+        Bulk-insert TeamMemberTask rows for one team and return them.
+        `rows` are (task_id, team_member_id, start_date, end_date) tuples.
+        """
+        with transaction.atomic():
+            version = SyncRepository.next_version()
+            created = models.TeamMemberTask.objects.bulk_create(
+                [
+                    models.TeamMemberTask(
+                        task_id=task_id,
+                        team_member_id=team_member_id,
+                        start_date=start_date,
+                        end_date=end_date,
+                        is_finish=False,
+                        version=version,
+                    )
+                    for task_id, team_member_id, start_date, end_date in rows
+                ],
+                batch_size=batch_size,
+            )
+        # bulk_create sends no post_save signals.
+        bump_team_generation(team.id)
+        member_ids = models.TeamMember.objects.filter(
+            id__in={team_member_id for _, team_member_id, _, _ in rows}
+        ).values_list('member_id', flat=True)
+        publish(
+            [team_channel(team.id), *map(member_channel, member_ids)],
+            {'kind': 'task', 'action': 'saved', 'version': version},
+        )
+        return created
+
+    @staticmethod
+    def update(team_member_task, task_id, team_member, start_date, end_date, is_finish):
+        """
+        Update a TeamMemberTask, writing only the columns that changed (and
+        its version). Reassigning it leaves a tombstone for the old member.
+        """
+        # Read before the reassignment below replaces the cached TeamMember.
+        previous_id = team_member_task.team_member_id
+        previous = None
+        if models.TeamMemberTask.team_member.is_cached(team_member_task):
+            previous = (team_member_task.team_member.team_id, team_member_task.team_member.member_id)
+        changed = _assign_changed(team_member_task, {
+            'task_id': task_id,
+            'team_member_id': team_member.id,
+            'start_date': _to_python(models.TeamMemberTask, 'start_date', start_date),
+            'end_date': _to_python(models.TeamMemberTask, 'end_date', end_date),
+            'is_finish': is_finish,
+        })
+        if not changed:
+            return team_member_task
+        with transaction.atomic():
+            if 'team_member' in changed:
+                if previous is None:
+                    previous = models.TeamMember.objects.filter(pk=previous_id).values_list(
+                        'team_id', 'member_id'
+                    ).first()
+                if previous:
+                    version = SyncRepository.record_removals([(team_member_task.id, *previous)])
+                    publish(
+                        [member_channel(previous[1])],
+                        {'kind': 'task', 'action': 'deleted', 'id': team_member_task.id, 'version': version},
+                    )
+            team_member_task.team_member = team_member
+            team_member_task.save(update_fields=[*changed, 'version', 'updated_at'])
         return team_member_task
 
     @staticmethod
     def mark_complete(team_member_task):
-        """Mark a TeamMemberTask as complete."""
-        team_member_task.is_finish = True
-        team_member_task.save()
-        return team_member_task
+        """
+        Mark a TeamMemberTask as complete. Its row is re-read under a lock,
+        so of two concurrent calls only one writes.
+        Returns True if this call finished it, False if it already was
+        finished or is gone.
+        """
+        if team_member_task.is_finish:
+            return False
+        with transaction.atomic():
+            if TeamMemberTaskRepository._lock(team_member_task.pk) is not False:
+                return False
+            team_member_task.is_finish = True
+            team_member_task.save(update_fields=['is_finish', 'version', 'updated_at'])
+        return True
 
     @staticmethod
     def delete(team_member_task):
-        """Delete a TeamMemberTask."""
-        team_member_task.delete()
+        """
+        Delete a TeamMemberTask, locking its row first.
+        Returns its `is_finish` as deleted, or None if another request
+        already deleted it.
+        """
+        with transaction.atomic():
+            is_finish = TeamMemberTaskRepository._lock(team_member_task.pk)
+            if is_finish is not None:
+                team_member_task.delete()
+        return is_finish
+
+    @staticmethod
+    def _lock(pk):
+        """Get the current `is_finish` of assignment `pk` (None if gone), locking its row where supported."""
+        return models.TeamMemberTask.objects.select_for_update().filter(pk=pk).values_list(
+            'is_finish', flat=True
+        ).first()
+
+    @staticmethod
+    def lock_many(task_ids, team=None, member=None):
+        """
+        Get the assignments among `task_ids` that are in `team` or assigned
+        to `member` (the permission filter of the bulk writes below) as flat
+        dicts, locking them (where the database supports it) until the
+        transaction ends.
+        """
+        scope = Q()
+        if team is not None:
+            scope |= Q(team_member__team=team)
+        if member is not None:
+            scope |= Q(team_member__member=member)
+        if not scope:
+            return []
+        return list(
+            models.TeamMemberTask.objects.select_for_update(of=('self',))
+            .filter(scope, id__in=task_ids)
+            .order_by('id')
+            .values(
+                'id',
+                'task_id',
+                'team_member_id',
+                'is_finish',
+                team_id=F('team_member__team_id'),
+                member_id=F('team_member__member_id'),
+            )
+        )
+
+    @staticmethod
+    def update_many(rows, assignee=None, **changes):
+        """
+        Apply `changes` (field -> value or expression) to the `lock_many`
+        rows in one UPDATE, stamped with one new version. With `assignee`
+        (a TeamMember) the rows are also reassigned to it, and those that
+        leave another member's list get tombstones. Call it in the
+        transaction that locked them. Returns the number of rows updated.
+        """
+        if not rows:
+            return 0
+        if assignee is not None:
+            changes['team_member_id'] = assignee.id
+            moved = [row for row in rows if row['team_member_id'] != assignee.id]
+            version = SyncRepository.record_removals(
+                [(row['id'], row['team_id'], row['member_id']) for row in moved]
+            ) if moved else SyncRepository.next_version()
+        else:
+            version = SyncRepository.next_version()
+        count = models.TeamMemberTask.objects.filter(id__in=[row['id'] for row in rows]).update(
+            **changes, version=version, updated_at=timezone.now()
+        )
+        team_ids = {row['team_id'] for row in rows}
+        member_ids = {row['member_id'] for row in rows}
+        if assignee is not None:
+            member_ids.add(assignee.member_id)
+        bump_team_generation(*team_ids)
+        publish(
+            [*map(team_channel, team_ids), *map(member_channel, member_ids)],
+            {'kind': 'task', 'action': 'saved', 'version': version},
+        )
+        return count
+
+    @staticmethod
+    def shift_many(rows, days):
+        """Move the start and end dates of the `lock_many` rows by `days` with `update_many`."""
+        delta = timedelta(days=days)
+        # Cast: date + interval is a datetime on some backends (SQLite).
+        return TeamMemberTaskRepository.update_many(
+            rows,
+            start_date=Cast(F('start_date') + delta, DateField()),
+            end_date=Cast(F('end_date') + delta, DateField()),
+        )
+
+    @staticmethod
+    def delete_many(rows):
+        """
+        Delete the `lock_many` rows in one DELETE, leaving a tombstone for
+        each. Call it in the transaction that locked them. Returns the
+        number of rows deleted.
+        """
+        if not rows:
+            return 0
+        count = _delete_assignments([row['id'] for row in rows])
+        version = SyncRepository.record_removals([(row['id'], row['team_id'], row['member_id']) for row in rows])
+        team_ids = {row['team_id'] for row in rows}
+        bump_team_generation(*team_ids)
+        publish(
+            [*map(team_channel, team_ids), *map(member_channel, {row['member_id'] for row in rows})],
+            {'kind': 'task', 'action': 'deleted', 'version': version},
+        )
+        return count
+
+
+@instrument
+class ArchiveRepository:
+    """Handle moving finished assignments into `ArchivedTask` and reading them back."""
+
+    @staticmethod
+    def lock_archivable(before, limit):
+        """
+        Get up to `limit` finished assignments that ended before `before`,
+        oldest first, as flat dicts with their team and member ids, locking
+        them (where the database supports it) until the transaction ends.
+        """
+        return list(
+            models.TeamMemberTask.objects.select_for_update(of=('self',))
+            .filter(is_finish=True, end_date__lt=before)
+            .order_by('end_date', 'id')
+            .values(
+                'id',
+                'task_id',
+                'team_member_id',
+                'start_date',
+                'end_date',
+                team_id=F('team_member__team_id'),
+                member_id=F('team_member__member_id'),
+            )[:limit]
+        )
+
+    @staticmethod
+    def archive(rows):
+        """
+        Move `lock_archivable` rows to the archive, leaving a tombstone for
+        each. Call it in the transaction that locked them. Returns the
+        tombstones' version.
+        """
+        models.ArchivedTask.objects.bulk_create([
+            models.ArchivedTask(
+                id=row['id'],
+                task_id=row['task_id'],
+                team_member_id=row['team_member_id'],
+                team_id=row['team_id'],
+                start_date=row['start_date'],
+                end_date=row['end_date'],
+            )
+            for row in rows
+        ])
+        _delete_assignments([row['id'] for row in rows])
+        version = SyncRepository.record_removals([(row['id'], row['team_id'], row['member_id']) for row in rows])
+        team_ids = {row['team_id'] for row in rows}
+        bump_team_generation(*team_ids)
+        publish(
+            [*map(team_channel, team_ids), *map(member_channel, {row['member_id'] for row in rows})],
+            {'kind': 'task', 'action': 'archived', 'version': version},
+        )
+        return version
+
+    @staticmethod
+    def get_rows_for_member(member, after=None, limit=None):
+        """
+        Get a member's archived assignments as flat dicts shaped like
+        `TeamMemberTaskRepository.get_rows_for_member`, keyset-paginated by
+        (end_date, id).
+        """
+        qs = keyset_filter(models.ArchivedTask.objects.filter(team_member__member=member), after).values(
+            'id',
+            'start_date',
+            'end_date',
+            is_finish=Value(True),
+            task_name=F('task__name_task'),
+            team_name=F('team__name'),
+        )
+        return qs[:limit] if limit else qs
+
+    @staticmethod
+    def get_rows_for_team(team, after=None, limit=None):
+        """
+        Get a team's archived assignments as flat dicts shaped like
+        `TeamMemberTaskRepository.get_rows_for_team`, keyset-paginated by
+        (end_date, id).
+        """
+        qs = keyset_filter(models.ArchivedTask.objects.filter(team=team), after).values(
+            'id',
+            'start_date',
+            'end_date',
+            is_finish=Value(True),
+            task_name=F('task__name_task'),
+            assigned_to=F('team_member__member__name'),
+        )
+        return qs[:limit] if limit else qs
+
+
+@instrument
+class SyncRepository:
+    """Handle delta-sync versions and tombstones."""
+
+    @staticmethod
+    def next_version():
+        """
+        Advance the sync clock and return the new version.
+        Call it inside the transaction that writes the versioned rows; the
+        clock row stays locked until that transaction ends.
+        """
+        connection = connections[router.db_for_write(models.SyncClock)]
+        table = connection.ops.quote_name(models.SyncClock._meta.db_table)
+        with connection.cursor() as cursor:
+            if connection.vendor in ('sqlite', 'postgresql'):
+                cursor.execute(f'UPDATE {table} SET version = version + 1 WHERE id = 1 RETURNING version')
+                row = cursor.fetchone()
+            else:
+                cursor.execute(f'UPDATE {table} SET version = version + 1 WHERE id = 1')
+                cursor.execute(f'SELECT version FROM {table} WHERE id = 1')
+                row = cursor.fetchone()
+        if row is None:
+            # The clock row is created by a migration; recreate it if it was flushed.
+            models.SyncClock.objects.get_or_create(pk=1)
+            return SyncRepository.next_version()
+        return row[0]
+
+    @staticmethod
+    def record_removals(rows, version=None):
+        """
+        Write tombstones for (assignment_id, team_id, member_id) tuples, all
+        stamped with `version` (the next clock value by default).
+        """
+        if version is None:
+            version = SyncRepository.next_version()
+        models.TaskTombstone.objects.bulk_create([
+            models.TaskTombstone(assignment_id=assignment_id, team_id=team_id, member_id=member_id, version=version)
+            for assignment_id, team_id, member_id in rows
+        ])
+        return version
+
+    @staticmethod
+    def get_horizon():
+        """
+        Get the highest version whose tombstones may have been purged (0 if
+        none were); a delta sync from an older version cannot be served.
+        Cached until the next purge.
+        """
+        return cache.get_or_set(SYNC_HORIZON_KEY, SyncRepository._load_horizon, None)
+
+    @staticmethod
+    async def aget_horizon():
+        """Async variant of `get_horizon`."""
+        horizon = await cache.aget(SYNC_HORIZON_KEY)
+        if horizon is None:
+            horizon = await models.SyncClock.objects.filter(pk=1).values_list('horizon', flat=True).afirst() or 0
+            await cache.aadd(SYNC_HORIZON_KEY, horizon, None)
+        return horizon
+
+    @staticmethod
+    def _load_horizon():
+        return models.SyncClock.objects.filter(pk=1).values_list('horizon', flat=True).first() or 0
+
+    @staticmethod
+    def purge_tombstones(before, batch_size=1000):
+        """
+        Delete the tombstones written before `before` (a datetime),
+        `batch_size` at a time. The horizon is raised to the highest purged
+        version first, so a client holding an older token is told to resync
+        instead of missing removals; every team's cached dashboard (which
+        carries a token) is invalidated. Returns the number deleted.
+        """
+        horizon = models.TaskTombstone.objects.filter(removed_at__lt=before).aggregate(v=Max('version'))['v']
+        if horizon is None:
+            return 0
+        models.SyncClock.objects.filter(pk=1, horizon__lt=horizon).update(horizon=horizon)
+        # Set rather than deleted, so a reader that loaded the old value
+        # just before the update cannot put it back.
+        cache.set(SYNC_HORIZON_KEY, SyncRepository._load_horizon(), None)
+        bump_team_generation(*models.Team.objects.values_list('id', flat=True))
+        deleted = 0
+        while True:
+            ids = list(
+                models.TaskTombstone.objects.filter(version__lte=horizon).values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            deleted += models.TaskTombstone.objects.filter(id__in=ids).delete()[0]
+
+    @staticmethod
+    def get_removals_for_member(member, since):
+        """Get (assignment_id, version) pairs removed from a member's list after `since`."""
+        return models.TaskTombstone.objects.filter(member_id=member.id, version__gt=since).values_list(
+            'assignment_id', 'version'
+        )
+
+    @staticmethod
+    def get_removals_for_team(team, since):
+        """Get (assignment_id, version) pairs removed from a team after `since`."""
+        return models.TaskTombstone.objects.filter(team_id=team.id, version__gt=since).values_list(
+            'assignment_id', 'version'
+        )
+
+
+@instrument
+class TaskStatsRepository:
+    """Handle per-member open/done/overdue assignment counts."""
+
+    @staticmethod
+    def count_for_team(team, today):
+        """
+        Count each team member's open, done and overdue assignments with one
+        conditional aggregation over the team's assignments.
+        Returns a queryset of flat dicts ordered by TeamMember id.
+        """
+        is_open = Q(teammembertask__is_finish=False)
+        return (
+            models.TeamMember.objects.filter(team=team)
+            .order_by('id')
+            .values('id', name=F('member__name'))
+            .annotate(
+                open=Count('teammembertask', filter=is_open),
+                done=Count('teammembertask', filter=Q(teammembertask__is_finish=True)),
+                overdue=Count('teammembertask', filter=is_open & Q(teammembertask__end_date__lt=today)),
+            )
+        )
+
+    @staticmethod
+    def get_for_team(team, today):
+        """
+        Same rows as `count_for_team`, with open/done read from
+        `TeamMemberTaskStats`. Overdue depends on the date, so it is still
+        counted, but only over each member's open, past-due assignments
+        (a range of the member/finish/end_date index).
+        """
+        overdue = (
+            models.TeamMemberTask.objects.filter(team_member=OuterRef('pk'), is_finish=False, end_date__lt=today)
+            .values('team_member')
+            .annotate(n=Count('id'))
+            .values('n')
+        )
+        return (
+            models.TeamMember.objects.filter(team=team)
+            .order_by('id')
+            .values(
+                'id',
+                name=F('member__name'),
+                open=Coalesce(F('task_stats__open_count'), 0),
+                done=Coalesce(F('task_stats__done_count'), 0),
+                overdue=Coalesce(Subquery(overdue), 0),
+            )
+        )
+
+    @staticmethod
+    def adjust(deltas):
+        """
+        Apply `{team_member_id: (open_delta, done_delta)}` to the counts with
+        F() increments. Call it in the transaction that made the change.
+        """
+        for team_member_id, (open_delta, done_delta) in deltas.items():
+            if not (open_delta or done_delta):
+                continue
+            rows = models.TeamMemberTaskStats.objects.filter(team_member_id=team_member_id)
+            changes = {
+                'open_count': F('open_count') + open_delta,
+                'done_count': F('done_count') + done_delta,
+            }
+            if not rows.update(**changes):
+                # First assignment for this member; another writer may be creating the row too.
+                models.TeamMemberTaskStats.objects.bulk_create(
+                    [models.TeamMemberTaskStats(team_member_id=team_member_id)], ignore_conflicts=True
+                )
+                rows.update(**changes)
+
+    @staticmethod
+    def rebuild(team=None):
+        """Recompute the counts of one team (or all teams) from the assignments."""
+        memberships = models.TeamMember.objects.all() if team is None else models.TeamMember.objects.filter(team=team)
+        counts = memberships.annotate(
+            open=Count('teammembertask', filter=Q(teammembertask__is_finish=False)),
+            done=Count('teammembertask', filter=Q(teammembertask__is_finish=True)),
+        ).values_list('id', 'open', 'done')
+        with transaction.atomic():
+            models.TeamMemberTaskStats.objects.filter(team_member__in=memberships).delete()
+            created = models.TeamMemberTaskStats.objects.bulk_create(
+                [
+                    models.TeamMemberTaskStats(team_member_id=tm_id, open_count=open_count, done_count=done_count)
+                    for tm_id, open_count, done_count in counts
+                    if open_count or done_count
+                ],
+                batch_size=1000,
+            )
+        return len(created)
+
+
+@instrument
+class SearchRepository:
+    """
+    Handle the team-scoped search index (`SearchToken`, see `core.search`).
+
+    Member tokens are kept in sync by `TeamMemberRepository` and
+    `MemberRepository`; task tokens by the task services, which know the
+    names. The index may hold stale hits (e.g. after writes outside those
+    paths); `search` callers drop hits whose rows are gone, and
+    `manage.py rebuild_search_index` rewrites it.
+    """
+
+    @staticmethod
+    def _token_rows(team_id, kind, object_id, *values):
+        return [
+            models.SearchToken(team_id=team_id, kind=kind, object_id=object_id, token=token, rank=rank)
+            for token, rank in search_tokens(*values).items()
+        ]
+
+    @staticmethod
+    def _insert(rows):
+        # ignore_conflicts: the same tokens may already be indexed.
+        models.SearchToken.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+    @staticmethod
+    def index_members(team_members):
+        """Index TeamMembers (with their Member loaded) by name and username."""
+        SearchRepository._insert([
+            row
+            for tm in team_members
+            for row in SearchRepository._token_rows(
+                tm.team_id, models.SearchToken.MEMBER, tm.id, tm.member.name, tm.member.username
+            )
+        ])
+
+    @staticmethod
+    def reindex_member(member):
+        """Replace the tokens of every team membership of `member` after a rename."""
+        memberships = list(models.TeamMember.objects.filter(member=member).values_list('id', 'team_id'))
+        SearchRepository.unindex_members([tm_id for tm_id, _ in memberships])
+        SearchRepository._insert([
+            row
+            for tm_id, team_id in memberships
+            for row in SearchRepository._token_rows(
+                team_id, models.SearchToken.MEMBER, tm_id, member.name, member.username
+            )
+        ])
+
+    @staticmethod
+    def unindex_members(team_member_ids):
+        """Remove the tokens of TeamMembers (ids or a subquery of ids)."""
+        models.SearchToken.objects.filter(kind=models.SearchToken.MEMBER, object_id__in=team_member_ids).delete()
+
+    @staticmethod
+    def index_tasks(team_id, names):
+        """Index task names (`{task_id: name}`) assigned in a team; already indexed ones are kept."""
+        SearchRepository._insert([
+            row
+            for task_id, name in names.items()
+            for row in SearchRepository._token_rows(team_id, models.SearchToken.TASK, task_id, name)
+        ])
+
+    @staticmethod
+    def prune_tasks(team_id, task_ids):
+        """Remove the tokens of tasks that are no longer assigned in the team."""
+        assigned = models.TeamMemberTask.objects.filter(task_id=OuterRef('object_id'), team_member__team_id=team_id)
+        models.SearchToken.objects.filter(
+            team_id=team_id, kind=models.SearchToken.TASK, object_id__in=task_ids
+        ).exclude(Exists(assigned)).delete()
+
+    @staticmethod
+    def search(team, query, after=None, limit=SEARCH_LIMIT):
+        """
+        Find the objects of `team` with a token starting with `query` (a
+        normalized query). Returns up to `limit` dicts with `kind`
+        ('member' or 'task'), `object_id` and `rank` (their best match),
+        ordered by (rank, kind, object_id); pass that key of the last hit
+        as `after` for the next page.
+        """
+        kinds = dict(models.SearchToken.KIND_CHOICES)
+        qs = (
+            models.SearchToken.objects.filter(
+                team=team, token__gte=query, token__lt=query + TOKEN_RANGE_END
+            )
+            .values('kind', 'object_id')
+            .annotate(best=Min('rank'))
+            .order_by('best', 'kind', 'object_id')
+        )
+        if after is not None:
+            rank, kind, object_id = after
+            kind = {label: code for code, label in kinds.items()}.get(kind, kind)
+            qs = qs.filter(
+                Q(best__gt=rank) | Q(best=rank, kind__gt=kind) | Q(best=rank, kind=kind, object_id__gt=object_id)
+            )
+        return [
+            {'kind': kinds[row['kind']], 'object_id': row['object_id'], 'rank': row['best']}
+            for row in qs[:limit]
+        ]
+
+    @staticmethod
+    def rebuild(team=None):
+        """Rewrite the index of one team (or all teams) from the current rows. Returns the token count."""
+        memberships = models.TeamMember.objects.all()
+        assignments = models.TeamMemberTask.objects.all()
+        tokens = models.SearchToken.objects.all()
+        if team is not None:
+            memberships = memberships.filter(team=team)
+            assignments = assignments.filter(team_member__team=team)
+            tokens = tokens.filter(team=team)
+        count = 0
+        with transaction.atomic():
+            tokens.delete()
+            rows = []
+            sources = [
+                ((team_id, models.SearchToken.MEMBER, tm_id, name, username)
+                 for tm_id, team_id, name, username in memberships.values_list(
+                     'id', 'team_id', 'member__name', 'member__username').iterator(chunk_size=2000)),
+                ((team_id, models.SearchToken.TASK, task_id, name)
+                 for team_id, task_id, name in assignments.values_list(
+                     'team_member__team_id', 'task_id', 'task__name_task').distinct().iterator(chunk_size=2000)),
+            ]
+            for source in sources:
+                for args in source:
+                    rows.extend(SearchRepository._token_rows(*args))
+                    if len(rows) >= 5000:
+                        models.SearchToken.objects.bulk_create(rows, batch_size=1000)
+                        count += len(rows)
+                        rows = []
+            models.SearchToken.objects.bulk_create(rows, batch_size=1000)
+            count += len(rows)
+        return count
+
+
+@instrument
+class DeadlineRepository:
+    """Handle deadline scans and the `DeadlineNotice` outbox (see `core.deadlines`)."""
+
+    @staticmethod
+    def get_unnoticed_batch(kind, start, end, after=None, limit=1000):
+        """
+        Get up to `limit` open assignments due between `start` and `end`
+        (inclusive) that have no `kind` notice for their current end date,
+        as (id, end_date, member_id) tuples ordered by (end_date, id).
+        Pass the (end_date, id) of the last row as `after` for the next batch.
+        """
+        noticed = models.DeadlineNotice.objects.filter(
+            assignment=OuterRef('pk'), kind=kind, end_date=OuterRef('end_date')
+        )
+        qs = models.TeamMemberTask.objects.filter(
+            is_finish=False, end_date__gte=start, end_date__lte=end
+        ).exclude(Exists(noticed))
+        return list(keyset_filter(qs, after).values_list('id', 'end_date', 'team_member__member_id')[:limit])
+
+    @staticmethod
+    def queue(kind, rows):
+        """Queue a `kind` notice for each (assignment_id, end_date, member_id); existing ones are kept."""
+        models.DeadlineNotice.objects.bulk_create(
+            [
+                models.DeadlineNotice(assignment_id=assignment_id, member_id=member_id, kind=kind, end_date=end_date)
+                for assignment_id, end_date, member_id in rows
+            ],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def get_pending_members(after=0, limit=100):
+        """Get up to `limit` ids of members with unsent notices, above `after`, in order."""
+        return list(
+            models.DeadlineNotice.objects.filter(sent_at__isnull=True, member_id__gt=after)
+            .order_by('member_id')
+            .values_list('member_id', flat=True)
+            .distinct()[:limit]
+        )
+
+    @staticmethod
+    def get_pending_rows(member_ids, queued_before):
+        """
+        Get the unsent notices of `member_ids` queued before `queued_before`
+        as flat dicts with the member, task and team joined in, ordered by
+        member, kind (overdue first) and end date. Notices whose assignment
+        was finished or moved to another end date since are left out.
+        """
+        return (
+            models.DeadlineNotice.objects.filter(
+                sent_at__isnull=True,
+                member_id__in=member_ids,
+                queued_at__lt=queued_before,
+                assignment__is_finish=False,
+                assignment__end_date=F('end_date'),
+            )
+            .order_by('member_id', '-kind', 'end_date', 'id')
+            .values(
+                'member_id',
+                'kind',
+                'end_date',
+                name=F('member__name'),
+                gmail=F('member__gmail'),
+                task_name=F('assignment__task__name_task'),
+                team_name=F('assignment__team_member__team__name'),
+            )
+        )
+
+    @staticmethod
+    def mark_sent(member_ids, queued_before, now):
+        """Mark the unsent notices of `member_ids` queued before `queued_before` as sent at `now`."""
+        return models.DeadlineNotice.objects.filter(
+            sent_at__isnull=True, member_id__in=member_ids, queued_at__lt=queued_before
+        ).update(sent_at=now)
+
+    @staticmethod
+    def delete_sent(end_before, batch_size):
+        """
+        Delete up to `batch_size` sent notices for end dates before
+        `end_before` (out of every scan window, so they can no longer
+        block a duplicate). Returns the number deleted.
+        """
+        ids = list(
+            models.DeadlineNotice.objects.filter(sent_at__isnull=False, end_date__lt=end_before)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            models.DeadlineNotice.objects.filter(id__in=ids).delete()
+        return len(ids)
+
+
+@instrument
+class SessionRepository:
+    """Handle database session housekeeping."""
+
+    @staticmethod
+    def delete_expired(now, batch_size):
+        """
+        Delete up to `batch_size` sessions that expired before `now`.
+        Returns the number deleted; each call is its own short transaction.
+        """
+        keys = list(
+            Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+        )
+        if keys:
+            Session.objects.filter(session_key__in=keys).delete()
+        return len(keys)
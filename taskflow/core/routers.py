@@ -0,0 +1,87 @@
+"""
+Database routing for an optional read replica.
+
+When `TASKFLOW_REPLICA_DATABASE` names a second alias in DATABASES,
+`ReplicaRoutingMiddleware` sends the reads of safe requests (GET, HEAD,
+OPTIONS) to the replica. Everything else stays on the primary ('default'):
+writes, every query of an unsafe request, reads inside a transaction,
+session lookups, and management commands and other code outside a request.
+
+A dashboard built from replica reads is neither stored in the dashboard
+cache nor given an ETag: stale rows cached under a fresh team generation
+would outlive the lag. Session-cached identities are read from the
+primary for the same reason.
+
+Read-your-writes: after an unsafe request the middleware sets a cookie
+that pins that browser to the primary for `TASKFLOW_REPLICA_PIN_SECONDS`.
+Set it above the replica's usual lag. Other users may see a change only
+once it has replicated.
+
+Bodies of streaming responses are produced after the middleware returns,
+so they are read from the primary.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Cookie pinning a browser to the primary after it wrote.
+PIN_COOKIE = 'taskflow_primary'
+
+_read_alias = ContextVar('taskflow_read_alias', default=None)
+
+
+def replica_alias():
+    """Return the configured replica alias, or None when there is none."""
+    return getattr(settings, 'TASKFLOW_REPLICA_DATABASE', None) or None
+
+
+@contextmanager
+def read_from(alias):
+    """Route reads in this context to `alias` (None: the primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_replica():
+    """Route reads in this context to the replica, if one is configured."""
+    return read_from(replica_alias())
+
+
+def use_primary():
+    """Route reads in this context to the primary."""
+    return read_from(None)
+
+
+def reading_from_replica():
+    """True when reads in this context go to the replica."""
+    return _read_alias.get() is not None and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class PrimaryReplicaRouter:
+    """Send reads where the current context says; writes always to the primary."""
+
+    def db_for_read(self, model, **hints):
+        # Inside a transaction, read what it has written. A session that has
+        # not replicated yet would look logged out.
+        if reading_from_replica() and model._meta.app_label != 'sessions':
+            return _read_alias.get()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica receives the schema through replication.
+        if db == replica_alias():
+            return False
+        return None
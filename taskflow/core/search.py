@@ -0,0 +1,80 @@
+"""
+Tokens for team-scoped search (see `core.repositories.SearchRepository`).
+
+Each searchable value (a task name, a member's name or username) is
+normalized (accents stripped, case folded, punctuation turned into
+spaces) and stored as one `SearchToken` row per character position: the
+suffix of the value starting there, cut to `MAX_TOKEN_LENGTH`. A query
+matches a value when it is a prefix of one of its tokens, so prefix and
+substring search are both a range scan of the (team, token) index.
+
+Each token carries the rank of the match it produces, lowest first:
+`PREFIX` (the value starts with the query), `WORD` (a word does) and
+`SUBSTRING` (anywhere else). Only the first `MAX_INDEXED_CHARS`
+characters of a value are indexed.
+"""
+import base64
+import unicodedata
+
+from .pagination import InvalidCursor
+
+
+MAX_TOKEN_LENGTH = 32
+MAX_INDEXED_CHARS = 64
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 20
+
+PREFIX, WORD, SUBSTRING = 0, 1, 2
+MATCH_NAMES = {PREFIX: 'prefix', WORD: 'word', SUBSTRING: 'substring'}
+
+# Sorts after every character a normalized token can contain.
+TOKEN_RANGE_END = '\U0010ffff'
+
+
+def normalize(text):
+    """Fold case and accents and collapse everything but letters and digits to single spaces."""
+    decomposed = unicodedata.normalize('NFKD', str(text or '')).casefold()
+    chars = (ch if ch.isalnum() else ' ' for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(''.join(chars).split())
+
+
+def tokens(*values):
+    """Return {token: rank} for the given values of one object, keeping each token's best rank."""
+    found = {}
+    for value in values:
+        value = normalize(value)[:MAX_INDEXED_CHARS]
+        for i, ch in enumerate(value):
+            if ch == ' ':
+                continue
+            if i == 0:
+                rank = PREFIX
+            elif value[i - 1] == ' ':
+                rank = WORD
+            else:
+                rank = SUBSTRING
+            token = value[i:i + MAX_TOKEN_LENGTH].rstrip()
+            if rank < found.get(token, SUBSTRING + 1):
+                found[token] = rank
+    return found
+
+
+def normalize_query(query):
+    """Normalize a search query the way values are indexed; None when it is too short."""
+    query = normalize(query)[:MAX_TOKEN_LENGTH].rstrip()
+    return query if len(query) >= MIN_QUERY_LENGTH else None
+
+
+def encode_cursor(rank, kind, object_id):
+    """Encode the `(rank, kind, object_id)` sort key of a hit into an opaque cursor."""
+    raw = f'{rank}:{kind}:{object_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a search cursor back into a `(rank, kind, object_id)` tuple."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, kind, object_id = base64.urlsafe_b64decode(padded.encode()).decode().split(':')
+        return (int(rank), kind, int(object_id))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
@@ -0,0 +1,119 @@
+"""
+Deterministic synthetic data for benchmarks and load tests.
+
+`seed_dataset` bulk-inserts teams, members, task names and assignments.
+The same arguments always produce the same rows (ids aside), so benchmark
+runs on different machines or days are comparable. Used by
+`manage.py seed_benchmark_data` and the scripts in `benchmarks/`.
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+
+from . import models
+from .repositories import SearchRepository, TaskStatsRepository
+
+
+# Fixed reference date for generated start/end dates.
+DEFAULT_ANCHOR = date(2025, 1, 1)
+
+# Every seeded member can log in with this password.
+SEED_PASSWORD = 'secret'
+
+
+def flush_core_data():
+    """Delete all Taskflow rows (members, teams, tasks and assignments).
+
+    Rows are removed with plain DELETE statements, skipping the per-row
+    signal handlers, so the cache (dashboards, identities) is cleared too.
+    Tombstones go as well, since reseeded rows may reuse their ids; the
+    sync clock is kept so versions only ever increase.
+    """
+    with transaction.atomic():
+        for model in (models.DeadlineNotice, models.SearchToken, models.TeamMemberTaskStats, models.ArchivedTask,
+                      models.TaskTombstone, models.TeamMemberTask, models.TeamMember, models.MemberRemoval,
+                      models.Task, models.Member, models.Team):
+            model.objects.all()._raw_delete(model.objects.db)
+    cache.clear()
+
+
+def seed_dataset(teams, members_per_team, tasks_per_member, task_names=5000, seed=0,
+                 anchor=DEFAULT_ANCHOR, finished_ratio=0.6, batch_size=5000):
+    """Bulk-insert a synthetic dataset into an empty database.
+
+    Every team gets one admin (its first member) plus plain members; each
+    member gets `tasks_per_member` assignments drawing from a shared pool
+    of `task_names` names, with start dates in the year before `anchor`.
+    The task stats table and the search index are filled as well.
+    Returns a dict of row counts.
+    """
+    rng = random.Random(seed)
+    # One real hash shared by every member; hashing per row would dominate.
+    password = make_password(SEED_PASSWORD)
+    with transaction.atomic():
+        tasks = models.Task.objects.bulk_create(
+            [models.Task(name_task=f'Task {i}') for i in range(task_names)],
+            batch_size=batch_size,
+        )
+        task_ids = [t.id for t in tasks]
+
+        team_objs = models.Team.objects.bulk_create(
+            [models.Team(name=f'Team {t}') for t in range(teams)], batch_size=batch_size
+        )
+
+        members = models.Member.objects.bulk_create(
+            [
+                models.Member(
+                    username=f'user{t}_{m}',
+                    name=f'User {t}-{m}',
+                    gmail=f'user{t}_{m}@example.com',
+                    password=password,
+                )
+                for t in range(teams)
+                for m in range(members_per_team)
+            ],
+            batch_size=batch_size,
+        )
+
+        team_members = models.TeamMember.objects.bulk_create(
+            [
+                models.TeamMember(
+                    team_id=team_objs[i // members_per_team].id,
+                    member_id=member.id,
+                    is_admin=(i % members_per_team == 0),
+                )
+                for i, member in enumerate(members)
+            ],
+            batch_size=batch_size,
+        )
+
+        batch = []
+        created = 0
+        for tm in team_members:
+            for _ in range(tasks_per_member):
+                start = anchor - timedelta(days=rng.randrange(365))
+                batch.append(models.TeamMemberTask(
+                    task_id=rng.choice(task_ids),
+                    team_member_id=tm.id,
+                    start_date=start,
+                    end_date=start + timedelta(days=rng.randrange(1, 60)),
+                    is_finish=rng.random() < finished_ratio,
+                ))
+                if len(batch) >= batch_size:
+                    models.TeamMemberTask.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+        if batch:
+            models.TeamMemberTask.objects.bulk_create(batch)
+            created += len(batch)
+        TaskStatsRepository.rebuild()
+        SearchRepository.rebuild()
+    return {
+        'teams': len(team_objs),
+        'members': len(members),
+        'tasks': len(tasks),
+        'assignments': created,
+    }
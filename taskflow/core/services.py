@@ -2,9 +2,34 @@
 Service layer: encapsulates business logic and orchestrates repositories.
 All authentication, validation, and business rules go here.
 """
+from contextlib import nullcontext
+from datetime import date
 from re import M
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .hashers import ImportPasswordHasher
+from .importers import MEMBER_FIELDS, ImportFileError
+from . import search
+from .pagination import DEFAULT_PAGE_SIZE, InvalidCursor, decode_cursor
+from .passwords import (
+    acheck_password,
+    ahash_password,
+    check_password,
+    hash_password,
+    hash_passwords,
+    is_hashed,
+)
 from .repositories import (
+    ArchiveRepository,
     MemberRepository,
+    SearchRepository,
+    SyncRepository,
+    TaskStatsRepository,
     TeamRepository,
     TeamMemberRepository,
     TaskRepository,
@@ -12,6 +37,112 @@ from .repositories import (
 )
 
 
+# Upper bound on assignments accepted by one `TaskService.add_tasks_bulk` call.
+MAX_BULK_TASKS = 1000
+
+# Largest date shift accepted by `TaskService.shift_tasks`, in days.
+MAX_SHIFT_DAYS = 3650
+
+# Row errors reported back by `TeamService.import_members`; the rest are only counted.
+MAX_IMPORT_ERRORS = 100
+
+# Default for the `admin_tm` keyword below: "not resolved by the caller".
+_UNRESOLVED = object()
+
+
+def _admin_membership(member, admin_tm):
+    """Return the admin TeamMember for `member`, reusing one the caller already resolved."""
+    if admin_tm is _UNRESOLVED:
+        return TeamMemberRepository.get_admin_for_member(member)
+    return admin_tm
+
+
+def _stats_table_enabled():
+    return getattr(settings, 'TASKFLOW_TASK_STATS_TABLE', False)
+
+
+def _stats_transaction():
+    """Transaction for a task write and its stats update (a no-op when the table is off)."""
+    return transaction.atomic() if _stats_table_enabled() else nullcontext()
+
+
+def _update_stats(*changes):
+    """
+    Record assignment changes in the stats table, if it is on.
+    `changes` are (team_member_id, is_finish, +1 or -1) tuples.
+    """
+    if not _stats_table_enabled():
+        return
+    deltas = {}
+    for team_member_id, is_finish, n in changes:
+        open_delta, done_delta = deltas.get(team_member_id, (0, 0))
+        deltas[team_member_id] = (open_delta, done_delta + n) if is_finish else (open_delta + n, done_delta)
+    TaskStatsRepository.adjust(deltas)
+
+
+def _clean_task_ids(task_ids):
+    """Validate the assignment ids of a bulk change. Returns tuple: (id_set, error_message)."""
+    if not isinstance(task_ids, list) or not task_ids:
+        return (None, "A non-empty list of task ids is required")
+    if len(task_ids) > MAX_BULK_TASKS:
+        return (None, f"At most {MAX_BULK_TASKS} tasks can be changed at once")
+    try:
+        return ({int(task_id) for task_id in task_ids}, None)
+    except (TypeError, ValueError):
+        return (None, "Task ids must be integers")
+
+
+def _clean_member_row(row):
+    """Validate one import row. Returns tuple: (cleaned_fields, error_message)."""
+    if not isinstance(row, dict):
+        return (None, "Malformed row")
+    cleaned = {field: str(row.get(field) or '').strip() for field in MEMBER_FIELDS}
+    if not all(cleaned.values()):
+        return (None, "All fields are required")
+    if any('\x00' in value for value in cleaned.values()):
+        return (None, "Malformed row")
+    if len(cleaned['username']) > 255 or len(cleaned['name']) > 255:
+        return (None, "Username and name must be at most 255 characters")
+    try:
+        validate_email(cleaned['gmail'])
+    except ValidationError:
+        return (None, "Invalid email address")
+    return (cleaned, None)
+
+
+def _hash_import_passwords(rows):
+    """
+    Hash plain-text import passwords in parallel; pre-hashed values are kept.
+    Uses the cheaper import work factor (see `core.hashers.ImportPasswordHasher`);
+    each member's hash is upgraded on their first login.
+    """
+    plain = [row for row in rows if not is_hashed(row['password'])]
+    hasher = ImportPasswordHasher()
+    for row, encoded in zip(plain, hash_passwords((row['password'] for row in plain), hasher=hasher)):
+        row['password'] = encoded
+
+
+def _import_member_batch(team, batch, summary, reject):
+    """Insert one batch of validated import rows, skipping taken usernames."""
+    for attempt in (1, 2):
+        taken = MemberRepository.existing_usernames(batch.keys())
+        fresh = [fields for username, (line, fields) in batch.items() if username not in taken]
+        try:
+            if fresh:
+                _hash_import_passwords(fresh)
+                with transaction.atomic():
+                    members = MemberRepository.create_many(fresh)
+                    TeamMemberRepository.create_many(team, members)
+            break
+        except IntegrityError:
+            # A concurrent signup or import took one of the names; recheck once.
+            if attempt == 2:
+                raise
+    for username in taken:
+        reject(batch[username][0], 'duplicate', "Username already exists")
+    summary['created'] += len(fresh)
+
+
 class AuthService:
     """Handle all authentication and registration logic."""
 
@@ -19,19 +150,43 @@ class AuthService:
     def login(username, password):
         """
         Authenticate a user.
+        The stored hash is upgraded in place when the hasher settings changed.
         Returns tuple: (member, is_admin, error_message)
         """
         if not username or not password:
             return (None, False, "Username and password are required")
 
         member = MemberRepository.get_by_username(username)
-        if not member or member.password != password:
+        is_correct, needs_rehash = check_password(password, member.password if member else None)
+        if not member or not is_correct:
             return (None, False, "Invalid credentials")
+        if needs_rehash:
+            MemberRepository.set_password(member, hash_password(password))
 
         team_member = TeamMemberRepository.get_admin_for_member(member)
         is_admin = bool(team_member)
         return (member, is_admin, None)
 
+    @staticmethod
+    async def alogin(username, password):
+        """
+        Async variant of `login`.
+        Returns tuple: (member, is_admin, error_message)
+        """
+        if not username or not password:
+            return (None, False, "Username and password are required")
+
+        member = await MemberRepository.aget_by_username(username)
+        is_correct, needs_rehash = await acheck_password(password, member.password if member else None)
+        if not member or not is_correct:
+            return (None, False, "Invalid credentials")
+        if needs_rehash:
+            await MemberRepository.aset_password(member, await ahash_password(password))
+
+        team_member = await TeamMemberRepository.aget_admin_for_member(member)
+        is_admin = bool(team_member)
+        return (member, is_admin, None)
+
     @staticmethod
     def register(username, name, gmail, password, team_name):
         """
@@ -44,7 +199,7 @@ class AuthService:
         if MemberRepository.username_exists(username):
             return (None, "Username already exists")
 
-        member = MemberRepository.create(username, name, gmail, password)
+        member = MemberRepository.create(username, name, gmail, hash_password(password))
         team = TeamRepository.create(team_name)
         TeamMemberRepository.create(team, member, is_admin=True)
 
@@ -52,10 +207,14 @@ class AuthService:
 
 
 class TeamService:
-    """Handle team management logic."""
+    """Handle team management logic.
+
+    Team members are looked up within the admin's team in the same query
+    that loads them; members of other teams are reported as not found.
+    """
 
     @staticmethod
-    def add_member_to_team(admin_member, username, name, gmail, password):
+    def add_member_to_team(admin_member, username, name, gmail, password, admin_tm=_UNRESOLVED):
         """
         Add a new member to the admin's team.
         Returns tuple: (team_member, error_message)
@@ -63,40 +222,101 @@ class TeamService:
         if not all([username, name, gmail, password]):
             return (None, "All fields are required")
 
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return (None, "You don't have admin access to any team")
 
         if MemberRepository.username_exists(username):
             return (None, "Username already exists")
 
-        new_member = MemberRepository.create(username, name, gmail, password)
+        new_member = MemberRepository.create(username, name, gmail, hash_password(password))
         team_member = TeamMemberRepository.create(admin_tm.team, new_member, is_admin=False)
         return (team_member, None)
 
     @staticmethod
-    def remove_member(admin_member, member_id):
+    def import_members(admin_member, rows, batch_size=1000, admin_tm=_UNRESOLVED):
+        """
+        Add many new members to the admin's team from an iterable of rows.
+        `rows` yields (line_number, dict-or-None) pairs, as produced by
+        `core.importers.iter_member_rows`; it is consumed lazily, one batch
+        at a time. Each batch costs one username lookup and two bulk inserts.
+        Returns tuple: (summary, error_message) where summary holds
+        `created`, `duplicate` and `invalid` counts plus the first
+        `MAX_IMPORT_ERRORS` row errors. If the file turns unreadable
+        part-way, the rows before that point are still imported (every
+        batch commits on its own) and summary `error` says where it stopped.
+        """
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (None, "You don't have admin access to any team")
+
+        summary = {'created': 0, 'duplicate': 0, 'invalid': 0, 'errors': []}
+
+        def reject(line, kind, message):
+            summary[kind] += 1
+            if len(summary['errors']) < MAX_IMPORT_ERRORS:
+                summary['errors'].append({'line': line, 'error': message})
+
+        batch = {}
+        try:
+            for line, row in rows:
+                cleaned, message = _clean_member_row(row)
+                if message:
+                    reject(line, 'invalid', message)
+                elif cleaned['username'] in batch:
+                    reject(line, 'duplicate', "Duplicate username in file")
+                else:
+                    batch[cleaned['username']] = (line, cleaned)
+                if len(batch) >= batch_size:
+                    _import_member_batch(admin_tm.team, batch, summary, reject)
+                    batch = {}
+        except ImportFileError as exc:
+            summary['error'] = f"{exc} Rows before it were imported and stay committed."
+        if batch:
+            _import_member_batch(admin_tm.team, batch, summary, reject)
+        return (summary, None)
+
+    @staticmethod
+    def get_member(admin_member, member_id, admin_tm=_UNRESOLVED):
+        """
+        Get a TeamMember (with its Member) of the admin's team.
+        Returns tuple: (team_member, error_message)
+        """
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (None, "You don't have admin access to any team")
+
+        tm = TeamMemberRepository.get_in_team(member_id, admin_tm.team)
+        if not tm:
+            return (None, "Team member not found")
+        return (tm, None)
+
+    @staticmethod
+    def remove_member(admin_member, member_id, admin_tm=_UNRESOLVED, background=False):
         """
-        Remove a member from the admin's team.
+        Remove a member from the admin's team, deleting the member with all
+        their assignments, a batch per transaction (see
+        `TeamMemberRepository.delete_member`). With `background`, only queue
+        the removal for `manage.py process_member_removals` (for members
+        with very long task histories).
         Returns: error_message or None if successful
         """
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return "You don't have admin access to any team"
 
-        tm = TeamMemberRepository.get_by_id(member_id)
-        m = MemberRepository.get_by_id(member_id)
+        tm = TeamMemberRepository.get_in_team(member_id, admin_tm.team)
         if not tm:
             return "Team member not found"
 
-        if tm.team != admin_tm.team:
-            return "You don't have permission to delete this team member"
-
-        TeamMemberRepository.delete(tm,m)
+        if background:
+            TeamMemberRepository.queue_removal(tm.member)
+        else:
+            TeamMemberRepository.delete_member(tm.member)
         return None
 
     @staticmethod
-    def edit_member(admin_member, member_id, new_name, new_username, new_email, new_password):
+    def edit_member(admin_member, member_id, new_name, new_username, new_email, new_password, admin_tm=_UNRESOLVED):
         """
         Edit a member's details.
         Returns: error_message or None if successful
@@ -104,35 +324,34 @@ class TeamService:
         if not all([new_name, new_username, new_email, new_password]):
             return "All fields are required"
 
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return "You don't have admin access to any team"
 
-        tm = TeamMemberRepository.get_by_id(member_id)
+        tm = TeamMemberRepository.get_in_team(member_id, admin_tm.team)
         if not tm:
             return "Team member not found"
 
-        if tm.team != admin_tm.team:
-            return "You don't have permission to edit this member"
-
         # Check if new username already exists (and isn't the current one)
         if new_username != tm.member.username and MemberRepository.username_exists(new_username):
             return "Username already exists"
 
-        tm.member.name = new_name
-        tm.member.username = new_username
-        tm.member.gmail = new_email
-        tm.member.password = new_password
-        tm.member.save()
-
+        MemberRepository.update_profile(
+            tm.member, new_name, new_username, new_email, hash_password(new_password)
+        )
         return None
 
 
 class TaskService:
-    """Handle task management logic."""
+    """Handle task management logic.
+
+    Assignments are looked up within the admin's team (or, for members,
+    among their own assignments) in the same query that loads them; any
+    other assignment is reported as not found.
+    """
 
     @staticmethod
-    def add_task(admin_member, task_name, team_member_id, start_date, end_date):
+    def add_task(admin_member, task_name, team_member_id, start_date, end_date, admin_tm=_UNRESOLVED):
         """
         Create and assign a task.
         Returns tuple: (team_member_task, error_message)
@@ -140,21 +359,85 @@ class TaskService:
         if not all([task_name, team_member_id, start_date, end_date]):
             return (None, "All fields are required")
 
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return (None, "You don't have admin access to any team")
 
-        team = admin_tm.team
-        tm = TeamMemberRepository.get_by_id(team_member_id)
-        if not tm or tm.team != team:
+        tm = TeamMemberRepository.get_in_team(team_member_id, admin_tm.team)
+        if not tm:
             return (None, "Selected team member is invalid")
 
-        task = TaskRepository.get_by_name(task_name)
-        team_member_task = TeamMemberTaskRepository.create(task, tm, start_date, end_date)
+        task_id = TaskRepository.get_or_create_id(task_name)
+        with transaction.atomic():
+            team_member_task = TeamMemberTaskRepository.create(task_id, tm, start_date, end_date)
+            SearchRepository.index_tasks(tm.team_id, {task_id: task_name})
+            _update_stats((tm.id, False, 1))
         return (team_member_task, None)
 
     @staticmethod
-    def edit_task(admin_member, task_id, task_name, team_member_id, start_date, end_date):
+    def add_tasks_bulk(admin_member, assignments, admin_tm=_UNRESOLVED):
+        """
+        Create and assign many tasks in one transaction.
+        `assignments` is a list of dicts with the same fields as `add_task`.
+        Invalid items are skipped and reported; the rest are inserted.
+        Returns tuple: (created_team_member_tasks, item_errors, error_message)
+        where `item_errors` is a list of {'index', 'error'} dicts.
+        """
+        if not isinstance(assignments, list) or not assignments:
+            return ([], [], "A non-empty list of tasks is required")
+        if len(assignments) > MAX_BULK_TASKS:
+            return ([], [], f"At most {MAX_BULK_TASKS} tasks can be added at once")
+
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return ([], [], "You don't have admin access to any team")
+
+        team = admin_tm.team
+        item_errors = []
+        valid = []
+        for index, item in enumerate(assignments):
+            if not isinstance(item, dict):
+                item_errors.append({'index': index, 'error': "Each task must be an object"})
+                continue
+            task_name = str(item.get('task_name') or '').strip()
+            team_member_id = item.get('team_member_id')
+            start_date = item.get('start_date')
+            end_date = item.get('end_date')
+            if not all([task_name, team_member_id, start_date, end_date]):
+                item_errors.append({'index': index, 'error': "All fields are required"})
+                continue
+            try:
+                team_member_id = int(team_member_id)
+                start_date = date.fromisoformat(str(start_date))
+                end_date = date.fromisoformat(str(end_date))
+            except (TypeError, ValueError):
+                item_errors.append({'index': index, 'error': "Invalid team member or date"})
+                continue
+            valid.append((index, task_name, team_member_id, start_date, end_date))
+
+        members_in_team = TeamMemberRepository.get_ids_in_team(team, {v[2] for v in valid})
+        rows = []
+        for index, task_name, team_member_id, start_date, end_date in valid:
+            if team_member_id not in members_in_team:
+                item_errors.append({'index': index, 'error': "Selected team member is invalid"})
+                continue
+            rows.append((task_name, team_member_id, start_date, end_date))
+        item_errors.sort(key=lambda e: e['index'])
+
+        if not rows:
+            return ([], item_errors, None)
+
+        with transaction.atomic():
+            task_ids = TaskRepository.get_or_create_many(row[0] for row in rows)
+            created = TeamMemberTaskRepository.create_many(
+                team, [(task_ids[name], *rest) for name, *rest in rows]
+            )
+            SearchRepository.index_tasks(team.id, {task_ids[row[0]]: row[0] for row in rows})
+            _update_stats(*((team_member_id, False, 1) for _, team_member_id, _, _ in rows))
+        return (created, item_errors, None)
+
+    @staticmethod
+    def edit_task(admin_member, task_id, task_name, team_member_id, start_date, end_date, admin_tm=_UNRESOLVED):
         """
         Edit an existing task.
         Returns: error_message or None if successful
@@ -162,45 +445,51 @@ class TaskService:
         if not all([task_name, team_member_id, start_date, end_date]):
             return "All fields are required"
 
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return "You don't have admin access to any team"
 
-        team = admin_tm.team
-        tmt = TeamMemberTaskRepository.get_by_id(task_id)
+        tmt = TeamMemberTaskRepository.get_in_team(task_id, admin_tm.team, assignee_id=team_member_id)
         if not tmt:
             return "Task not found"
 
-        if tmt.team_member.team != team:
-            return "You don't have permission to edit this task"
-
-        tm = TeamMemberRepository.get_by_id(team_member_id)
-        if not tm or tm.team != team:
+        tm = tmt.assignee
+        if not tm:
             return "Selected team member is invalid"
 
-        task = TaskRepository.get_by_name(task_name)
-        TeamMemberTaskRepository.update(tmt, task, tm, start_date, end_date, False)
+        task_id = TaskRepository.get_or_create_id(task_name)
+        previous_task_id = tmt.task_id
+        with transaction.atomic():
+            _update_stats((tmt.team_member_id, tmt.is_finish, -1), (tm.id, False, 1))
+            TeamMemberTaskRepository.update(tmt, task_id, tm, start_date, end_date, False)
+            if task_id != previous_task_id:
+                SearchRepository.index_tasks(tm.team_id, {task_id: task_name})
+                SearchRepository.prune_tasks(tm.team_id, [previous_task_id])
         return None
 
     @staticmethod
-    def delete_task(admin_member, task_id):
+    def delete_task(admin_member, task_id, admin_tm=_UNRESOLVED):
         """
         Delete a task.
         Returns: error_message or None if successful
         """
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return "You don't have admin access to any team"
 
-        team = admin_tm.team
-        tmt = TeamMemberTaskRepository.get_by_id(task_id)
+        tmt = TeamMemberTaskRepository.get_in_team(task_id, admin_tm.team)
         if not tmt:
             return "Task not found"
 
-        if tmt.team_member.team != team:
-            return "You don't have permission to delete this task"
-
-        TeamMemberTaskRepository.delete(tmt)
+        # The stats follow the row as deleted, not as read above: a
+        # concurrent delete or completion may have won in between.
+        with _stats_transaction():
+            is_finish = TeamMemberTaskRepository.delete(tmt)
+            if is_finish is None:
+                return "Task not found"
+            _update_stats((tmt.team_member_id, is_finish, -1))
+        # A token left behind only yields a hit that search drops.
+        SearchRepository.prune_tasks(admin_tm.team_id, [tmt.task_id])
         return None
 
     @staticmethod
@@ -209,37 +498,324 @@ class TaskService:
         Mark a task as complete (member only).
         Returns: error_message or None if successful
         """
-        tmt = TeamMemberTaskRepository.get_by_id(task_id)
+        tmt = TeamMemberTaskRepository.get_for_member(task_id, member)
         if not tmt:
             return "Task not found"
 
-        if tmt.team_member.member != member:
-            return "You don't have permission to update this task"
-
-        TeamMemberTaskRepository.mark_complete(tmt)
+        with _stats_transaction():
+            # Counted only by the call that finished it, not on a stale read.
+            if TeamMemberTaskRepository.mark_complete(tmt):
+                _update_stats((tmt.team_member_id, False, -1), (tmt.team_member_id, True, 1))
         return None
 
+    @staticmethod
+    def complete_tasks(member, task_ids, admin_tm=_UNRESOLVED):
+        """
+        Mark many tasks complete in one UPDATE: the member's own and, for
+        an admin, any in their team. Other ids are skipped.
+        Returns tuple: (updated_count, error_message)
+        """
+        return TaskService._set_finished(member, task_ids, True, admin_tm)
+
+    @staticmethod
+    def reopen_tasks(member, task_ids, admin_tm=_UNRESOLVED):
+        """Reopen many tasks in one UPDATE; the counterpart of `complete_tasks`."""
+        return TaskService._set_finished(member, task_ids, False, admin_tm)
+
+    @staticmethod
+    def _set_finished(member, task_ids, is_finish, admin_tm):
+        ids, error = _clean_task_ids(task_ids)
+        if error:
+            return (0, error)
+        admin_tm = _admin_membership(member, admin_tm)
+
+        with transaction.atomic():
+            rows = [
+                row for row in TeamMemberTaskRepository.lock_many(
+                    ids, team=admin_tm.team if admin_tm else None, member=member
+                )
+                if row['is_finish'] != is_finish
+            ]
+            count = TeamMemberTaskRepository.update_many(rows, is_finish=is_finish)
+            _update_stats(*(
+                change
+                for row in rows
+                for change in ((row['team_member_id'], not is_finish, -1), (row['team_member_id'], is_finish, 1))
+            ))
+        return (count, None)
+
+    @staticmethod
+    def reassign_tasks(admin_member, task_ids, team_member_id, admin_tm=_UNRESOLVED):
+        """
+        Reassign many tasks of the admin's team to one of its members in one
+        UPDATE, keeping their dates and completion state.
+        Returns tuple: (updated_count, error_message)
+        """
+        ids, error = _clean_task_ids(task_ids)
+        if error:
+            return (0, error)
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (0, "You don't have admin access to any team")
+        try:
+            team_member_id = int(team_member_id)
+        except (TypeError, ValueError):
+            return (0, "Selected team member is invalid")
+        tm = TeamMemberRepository.get_in_team(team_member_id, admin_tm.team)
+        if not tm:
+            return (0, "Selected team member is invalid")
+
+        with transaction.atomic():
+            rows = [
+                row for row in TeamMemberTaskRepository.lock_many(ids, team=admin_tm.team)
+                if row['team_member_id'] != tm.id
+            ]
+            count = TeamMemberTaskRepository.update_many(rows, assignee=tm)
+            _update_stats(*(
+                change
+                for row in rows
+                for change in ((row['team_member_id'], row['is_finish'], -1), (tm.id, row['is_finish'], 1))
+            ))
+        return (count, None)
+
+    @staticmethod
+    def shift_tasks(admin_member, task_ids, days, admin_tm=_UNRESOLVED):
+        """
+        Move the start and end dates of many tasks of the admin's team by
+        `days` (negative for earlier) in one UPDATE.
+        Returns tuple: (updated_count, error_message)
+        """
+        ids, error = _clean_task_ids(task_ids)
+        if error:
+            return (0, error)
+        if isinstance(days, bool) or not isinstance(days, int) or not 0 < abs(days) <= MAX_SHIFT_DAYS:
+            return (0, f"Days must be a non-zero whole number of at most {MAX_SHIFT_DAYS}")
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (0, "You don't have admin access to any team")
+
+        with transaction.atomic():
+            rows = TeamMemberTaskRepository.lock_many(ids, team=admin_tm.team)
+            count = TeamMemberTaskRepository.shift_many(rows, days)
+        return (count, None)
+
+    @staticmethod
+    def delete_tasks(admin_member, task_ids, admin_tm=_UNRESOLVED):
+        """
+        Delete many tasks of the admin's team in one DELETE.
+        Returns tuple: (deleted_count, error_message)
+        """
+        ids, error = _clean_task_ids(task_ids)
+        if error:
+            return (0, error)
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (0, "You don't have admin access to any team")
+
+        with transaction.atomic():
+            rows = TeamMemberTaskRepository.lock_many(ids, team=admin_tm.team)
+            count = TeamMemberTaskRepository.delete_many(rows)
+            _update_stats(*((row['team_member_id'], row['is_finish'], -1) for row in rows))
+            if rows:
+                SearchRepository.prune_tasks(admin_tm.team_id, {row['task_id'] for row in rows})
+        return (count, None)
+
+    @staticmethod
+    def archive_finished(before, batch_size=1000):
+        """
+        Move up to `batch_size` finished assignments that ended before
+        `before` (oldest first) to the archive, in one transaction. They
+        leave the task lists, the stats counts and the search index, and
+        delta clients see them as removed.
+        Returns the number of assignments archived.
+        """
+        with transaction.atomic():
+            rows = ArchiveRepository.lock_archivable(before, batch_size)
+            if not rows:
+                return 0
+            ArchiveRepository.archive(rows)
+            _update_stats(*((row['team_member_id'], True, -1) for row in rows))
+            task_ids = {}
+            for row in rows:
+                task_ids.setdefault(row['team_id'], set()).add(row['task_id'])
+            for team_id, ids in task_ids.items():
+                SearchRepository.prune_tasks(team_id, ids)
+        return len(rows)
+
 
 class ViewService:
     """Handle view/dashboard data retrieval logic."""
 
     @staticmethod
-    def get_member_tasks(member):
-        """Get all tasks for a member."""
-        return TeamMemberTaskRepository.get_all_for_member(member)
+    def get_member_tasks(member, since=None):
+        """
+        Get all tasks for a member.
+        Returns a queryset of flat dicts (one joined query, no per-row lookups).
+        With a sync version `since`, only the rows written after it.
+        """
+        return TeamMemberTaskRepository.get_rows_for_member(member, since=since)
+
+    @staticmethod
+    def get_sync_horizon():
+        """Get the oldest sync token a delta can still be served from (see `SyncRepository.get_horizon`)."""
+        return SyncRepository.get_horizon()
+
+    @staticmethod
+    async def aget_sync_horizon():
+        """Async variant of `get_sync_horizon`."""
+        return await SyncRepository.aget_horizon()
+
+    @staticmethod
+    def get_member_removals(member, since):
+        """Get (assignment_id, version) pairs that left a member's task list after `since`."""
+        return SyncRepository.get_removals_for_member(member, since)
+
+    @staticmethod
+    def get_team_removals(team, since):
+        """Get (assignment_id, version) pairs that left a team's task list after `since`."""
+        return SyncRepository.get_removals_for_team(team, since)
 
     @staticmethod
-    def get_team_dashboard(admin_member):
+    def get_team_dashboard(admin_member, cursor=None, limit=None, admin_tm=_UNRESOLVED, since=None):
         """
         Get dashboard data for admin.
         Returns tuple: (team, team_members, team_tasks, error_message)
+        `team_members` and `team_tasks` are querysets of flat dicts. Tasks are
+        ordered by (end_date, id); pass an opaque `cursor` and a `limit` to
+        get a single keyset page, and a sync version `since` to get only the
+        tasks written after it.
+        """
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        return ViewService._dashboard_for(admin_tm, cursor, limit, since)
+
+    @staticmethod
+    async def aget_team_dashboard(admin_member, cursor=None, limit=None, admin_tm=_UNRESOLVED, since=None):
         """
-        admin_tm = TeamMemberRepository.get_admin_for_member(admin_member)
+        Async variant of `get_team_dashboard`.
+        The returned querysets are lazy; iterate them with `async for`.
+        """
+        if admin_tm is _UNRESOLVED:
+            admin_tm = await TeamMemberRepository.aget_admin_for_member(admin_member)
+        return ViewService._dashboard_for(admin_tm, cursor, limit, since)
+
+    @staticmethod
+    def get_member_archive(member, cursor=None, limit=None):
+        """
+        Get one keyset page of a member's archived tasks, ordered by
+        (end_date, id) like the dashboard.
+        Returns tuple: (rows, error_message); `rows` is a queryset of flat dicts.
+        """
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return (None, "Invalid cursor")
+        return (ArchiveRepository.get_rows_for_member(member, after, limit or DEFAULT_PAGE_SIZE), None)
+
+    @staticmethod
+    def get_team_archive(admin_member, cursor=None, limit=None, admin_tm=_UNRESOLVED):
+        """
+        Get the admin's team members and one keyset page of the team's
+        archived tasks.
+        Returns tuple: (team, team_members, rows, error_message), like
+        `get_team_dashboard`.
+        """
+        admin_tm = _admin_membership(admin_member, admin_tm)
         if not admin_tm:
             return (None, None, None, "You don't have admin access to any team")
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return (None, None, None, "Invalid cursor")
+
+        team = admin_tm.team
+        rows = ArchiveRepository.get_rows_for_team(team, after, limit or DEFAULT_PAGE_SIZE)
+        return (team, TeamMemberRepository.get_rows_for_team(team), rows, None)
+
+    @staticmethod
+    def get_team_stats(admin_member, admin_tm=_UNRESOLVED, today=None):
+        """
+        Get per-member open/done/overdue assignment counts for the admin's team.
+        Returns tuple: (team, member_rows, error_message)
+        Counts come from the stats table when `TASKFLOW_TASK_STATS_TABLE` is
+        on, otherwise from one aggregate query over the team's assignments.
+        """
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (None, None, "You don't have admin access to any team")
+
+        today = today or timezone.localdate()
+        team = admin_tm.team
+        if _stats_table_enabled():
+            rows = TaskStatsRepository.get_for_team(team, today)
+        else:
+            rows = TaskStatsRepository.count_for_team(team, today)
+        return (team, list(rows), None)
+
+    @staticmethod
+    def search_team(admin_member, query, cursor=None, limit=None, admin_tm=_UNRESOLVED):
+        """
+        Search the admin's team for members (by name or username) and tasks
+        (by name) with the token index (see `core.search`).
+        Returns tuple: (hits, next_cursor, error_message) where `hits` are
+        ranked dicts with `kind`, `id`, `match` and the object's fields;
+        a task hit lists the team's assignments of that task.
+        """
+        admin_tm = _admin_membership(admin_member, admin_tm)
+        if not admin_tm:
+            return (None, None, "You don't have admin access to any team")
+
+        query = search.normalize_query(query)
+        if query is None:
+            return (None, None, f"Search needs at least {search.MIN_QUERY_LENGTH} letters or digits")
+        try:
+            after = search.decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return (None, None, "Invalid cursor")
+
+        team = admin_tm.team
+        limit = limit or search.DEFAULT_LIMIT
+        found = SearchRepository.search(team, query, after, limit + 1)
+        page = found[:limit]
+        next_cursor = None
+        if len(found) > limit:
+            last = page[-1]
+            next_cursor = search.encode_cursor(last['rank'], last['kind'], last['object_id'])
+
+        ids = {kind: [hit['object_id'] for hit in page if hit['kind'] == kind] for kind in ('member', 'task')}
+        members = {row['id']: row for row in TeamMemberRepository.get_rows_in_team(team, ids['member'])}
+        assignments = {}
+        for row in TeamMemberTaskRepository.get_rows_for_tasks(team, ids['task']):
+            assignments.setdefault(row.pop('task_id'), []).append(row)
+
+        hits = []
+        # Hits whose rows are gone (a stale index entry) are left out.
+        for hit in page:
+            kind, object_id = hit['kind'], hit['object_id']
+            match = search.MATCH_NAMES[hit['rank']]
+            if kind == 'member' and object_id in members:
+                row = members[object_id]
+                hits.append({'kind': kind, 'match': match, 'id': object_id, 'name': row['name'],
+                             'username': row['username'], 'is_admin': row['is_admin']})
+            elif kind == 'task' and object_id in assignments:
+                rows = assignments[object_id]
+                for row in rows:
+                    name = row.pop('task_name')
+                hits.append({'kind': kind, 'match': match, 'id': object_id, 'name': name, 'assignments': rows})
+        return (hits, next_cursor, None)
+
+    @staticmethod
+    def _dashboard_for(admin_tm, cursor, limit, since=None):
+        """Build the (lazy) dashboard querysets for a resolved admin membership."""
+        if not admin_tm:
+            return (None, None, None, "You don't have admin access to any team")
+
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return (None, None, None, "Invalid cursor")
 
         team = admin_tm.team
-        team_members = TeamMemberRepository.get_all_for_team(team)
-        team_tasks = TeamMemberTaskRepository.get_all_for_team(team)
+        team_members = TeamMemberRepository.get_rows_for_team(team)
+        team_tasks = TeamMemberTaskRepository.get_rows_for_team(team, after=after, limit=limit, since=since)
 
         return (team, team_members, team_tasks, None)
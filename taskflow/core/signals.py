@@ -0,0 +1,106 @@
+"""
+Model signal handlers.
+
+Connected in `CoreConfig.ready()`. They keep three caches honest:
+session-cached request identities (`core.middleware`), per-team
+dashboard generations (`core.caching`) and interned task names
+(`core.interning`). They also stamp assignment
+versions and write tombstones for delta sync (`SyncRepository`), and
+publish change events to connected clients (`core.events`).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import models
+from .events import member_channel, publish, team_channel
+from .caching import bump_team_generation
+from .interning import invalidate_task_names
+from .middleware import invalidate_identity
+from .repositories import SyncRepository
+
+
+def _team_ids_for_member(member_id):
+    return list(
+        models.TeamMember.objects.filter(member_id=member_id).values_list('team_id', flat=True)
+    )
+
+
+def _membership_for_assignment(assignment):
+    """Return `(team_id, member_id)` of the assignment's TeamMember, or None."""
+    if models.TeamMemberTask.team_member.is_cached(assignment):
+        return (assignment.team_member.team_id, assignment.team_member.member_id)
+    return (
+        models.TeamMember.objects.filter(pk=assignment.team_member_id)
+        .values_list('team_id', 'member_id')
+        .first()
+    )
+
+
+def _action(signal):
+    return 'deleted' if signal is post_delete else 'saved'
+
+
+@receiver([post_save, post_delete], sender=models.Member)
+def member_changed(sender, instance, signal, **kwargs):
+    invalidate_identity(instance.id)
+    team_ids = _team_ids_for_member(instance.id)
+    bump_team_generation(*team_ids)
+    publish(map(team_channel, team_ids), {'kind': 'member', 'action': 'profile'})
+
+
+@receiver([post_save, post_delete], sender=models.TeamMember)
+def team_member_changed(sender, instance, signal, **kwargs):
+    invalidate_identity(instance.member_id)
+    bump_team_generation(instance.team_id)
+    publish(
+        [team_channel(instance.team_id), member_channel(instance.member_id)],
+        {'kind': 'member', 'action': _action(signal), 'id': instance.id},
+    )
+
+
+@receiver(post_save, sender=models.Team)
+def team_changed(sender, instance, created, **kwargs):
+    if created:
+        return
+    # Admin identities carry the team name.
+    admins = models.TeamMember.objects.filter(team=instance, is_admin=True)
+    for member_id in admins.values_list('member_id', flat=True):
+        invalidate_identity(member_id)
+
+
+@receiver([post_save, post_delete], sender=models.Task)
+def task_changed(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    # A renamed or deleted task shows up on every dashboard that assigns it.
+    teams = (
+        models.TeamMemberTask.objects.filter(task_id=instance.id)
+        .values_list('team_member__team_id', flat=True)
+        .distinct()
+    )
+    bump_team_generation(*teams)
+    # After commit, so no worker re-reads the old name under the new token.
+    transaction.on_commit(invalidate_task_names)
+
+
+@receiver(pre_save, sender=models.TeamMemberTask)
+def stamp_assignment_version(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'version' in update_fields:
+        instance.version = SyncRepository.next_version()
+
+
+@receiver([post_save, post_delete], sender=models.TeamMemberTask)
+def assignment_changed(sender, instance, signal, **kwargs):
+    membership = _membership_for_assignment(instance)
+    if membership is None:
+        return
+    team_id, member_id = membership
+    version = instance.version
+    if signal is post_delete:
+        version = SyncRepository.record_removals([(instance.id, team_id, member_id)])
+    bump_team_generation(team_id)
+    publish(
+        [team_channel(team_id), member_channel(member_id)],
+        {'kind': 'task', 'action': _action(signal), 'id': instance.id, 'version': version},
+    )
@@ -0,0 +1,118 @@
+"""
+The SPA's `index.html`, served from memory.
+
+Every browser navigation that is not an API call falls back to the index
+(see `core.views.spa_index`). The file is read once and kept with gzip
+and, when the optional `brotli` package is installed, brotli variants,
+plus a content hash used for the ETags. Its mtime is checked at most once
+every `CHECK_INTERVAL` seconds and the file is only read again when the
+mtime changed, e.g. after a frontend build.
+"""
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+
+# Seconds between mtime checks of index.html.
+CHECK_INTERVAL = 1.0
+
+
+class IndexFile:
+    """One loaded version of index.html and its encoded variants."""
+
+    __slots__ = ('mtime', 'bodies', 'digest')
+
+    def __init__(self, content, mtime):
+        self.mtime = mtime
+        self.digest = hashlib.sha256(content).hexdigest()[:32]
+        # Content-Encoding -> body, most preferred first.
+        self.bodies = {}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(content, mode=brotli.MODE_TEXT)
+        self.bodies['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+        self.bodies['identity'] = content
+
+    def etag(self, encoding):
+        """Strong ETag of one encoded variant."""
+        if encoding == 'identity':
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def etags(self):
+        return {self.etag(encoding) for encoding in self.bodies}
+
+    def negotiate(self, accept_encoding):
+        """Pick the encoding to send for an `Accept-Encoding` header value."""
+        accepted = _parse_accept_encoding(accept_encoding)
+        for encoding in self.bodies:
+            if encoding == 'identity':
+                break
+            if accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return 'identity'
+
+
+def _parse_accept_encoding(value):
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for item in (value or '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, number = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def index_path():
+    return os.path.join(settings.BASE_DIR, 'static', 'frontend', 'index.html')
+
+
+_lock = threading.Lock()
+_current = None
+_next_check = 0.0
+
+
+def get_index():
+    """Return the current `IndexFile`, or None when index.html is missing."""
+    global _current, _next_check
+    index = _current
+    now = time.monotonic()
+    if index is not None and now < _next_check:
+        return index
+    with _lock:
+        try:
+            mtime = os.stat(index_path()).st_mtime_ns
+        except FileNotFoundError:
+            _current = None
+            return None
+        if _current is None or _current.mtime != mtime:
+            with open(index_path(), 'rb') as fh:
+                _current = IndexFile(fh.read(), mtime)
+        _next_check = now + CHECK_INTERVAL
+        return _current
+
+
+def reset():
+    """Forget the loaded index (used by tests)."""
+    global _current, _next_check
+    with _lock:
+        _current = None
+        _next_check = 0.0
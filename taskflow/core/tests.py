@@ -1,3 +1,1665 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date, timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import get_connection
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections, router, transaction
+from django.db.models import DO_NOTHING
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import async_views, checks, deadlines, metrics, spa
+from .interning import task_names
+from .events import (
+    QUEUE_SIZE, RESYNC, create_broker, get_broker, member_channel, serve_broker, team_channel,
+)
+from .management.commands.copy_replica import copy_sqlite
+from .middleware import MemberIdentityMiddleware, MetricsMiddleware, ReplicaRoutingMiddleware
+from .models import (
+    ArchivedTask, DeadlineNotice, Member, MemberRemoval, SearchToken, Task, TaskTombstone, Team, TeamMember, TeamMemberTask,
+    TeamMemberTaskStats,
+)
+from .passwords import check_password, is_hashed
+from .repositories import SearchRepository, TaskRepository, TaskStatsRepository, TeamMemberRepository
+from .routers import PIN_COOKIE, use_replica
+from .services import AuthService, TaskService, TeamService
+
+
+JSON = {'HTTP_ACCEPT': 'application/json'}
+
+
+@override_settings(TASKFLOW_PASSWORD_ITERATIONS=1000)
+class TaskflowTestCase(TestCase):
+    """Shared fixtures: one team with an admin and a few plain members.
+
+    Fixture passwords are stored as legacy plain text; login upgrades them.
+    """
+
+    member_count = 3
+    tasks_per_member = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.team = Team.objects.create(name='Core')
+        cls.admin = Member.objects.create(
+            username='admin', name='Admin', gmail='admin@example.com', password='secret'
+        )
+        cls.admin_tm = TeamMember.objects.create(team=cls.team, member=cls.admin, is_admin=True)
+        cls.members = []
+        cls.team_members = []
+        for i in range(cls.member_count):
+            member = Member.objects.create(
+                username=f'user{i}', name=f'User {i}', gmail=f'user{i}@example.com', password='secret'
+            )
+            cls.members.append(member)
+            cls.team_members.append(TeamMember.objects.create(team=cls.team, member=member))
+        cls.assignments = []
+        for tm in cls.team_members:
+            for j in range(cls.tasks_per_member):
+                task = Task.objects.create(name_task=f'Task {tm.id}-{j}')
+                cls.assignments.append(TeamMemberTask.objects.create(
+                    task=task,
+                    team_member=tm,
+                    start_date=date(2025, 1, 1),
+                    end_date=date(2025, 1, 10 + j),
+                ))
+
+    def setUp(self):
+        # Dashboard generations and session identities live in the cache,
+        # which is not rolled back between tests.
+        cache.clear()
+
+    def login_as(self, member):
+        session = self.client.session
+        session['member_username'] = member.username
+        session.save()
+
+    def assertMaxQueries(self, budget, func, *args, **kwargs):
+        """Run `func` and fail if it issues more than `budget` SQL queries."""
+        with CaptureQueriesContext(connection) as ctx:
+            result = func(*args, **kwargs)
+        self.assertLessEqual(
+            len(ctx.captured_queries), budget,
+            '\n'.join(q['sql'] for q in ctx.captured_queries),
+        )
+        return result
+
+
+class ReadPathQueryBudgetTests(TaskflowTestCase):
+    """`view` and `dashboard` must cost a fixed number of queries, not one per row."""
+
+    member_count = 10
+    tasks_per_member = 20
+
+    def test_view_query_budget(self):
+        self.login_as(self.members[0])
+        # Session, identity, rows; plus the sync horizon on a cold cache.
+        response = self.assertMaxQueries(4, self.client.get, '/view/', **JSON)
+        self.assertEqual(response.status_code, 200)
+        tasks = response.json()['team_tasks']
+        self.assertEqual(len(tasks), self.tasks_per_member)
+        self.assertEqual(tasks[0]['team_name'], 'Core')
+        self.assertTrue(tasks[0]['task_name'].startswith('Task '))
+
+    def test_dashboard_query_budget(self):
+        self.login_as(self.admin)
+        # Session, identity, members, tasks; plus the sync horizon on a cold cache.
+        response = self.assertMaxQueries(5, self.client.get, '/dashboard/', **JSON)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['team_members']), self.member_count + 1)
+        self.assertEqual(len(data['team_tasks']), self.member_count * self.tasks_per_member)
+        self.assertEqual(data['team_tasks'][0]['assigned_to'], 'User 0')
+
+    def test_dashboard_forbidden_for_non_admin(self):
+        self.login_as(self.members[0])
+        response = self.client.get('/dashboard/', **JSON)
+        self.assertEqual(response.status_code, 403)
+
+
+class DashboardPaginationTests(TaskflowTestCase):
+    """Keyset pages and the streamed body must agree with the full dashboard."""
+
+    def setUp(self):
+        super().setUp()
+        self.login_as(self.admin)
+
+    def full_task_ids(self):
+        return [t['id'] for t in self.client.get('/dashboard/', **JSON).json()['team_tasks']]
+
+    def test_pages_cover_all_tasks_in_order(self):
+        seen = []
+        cursor = ''
+        while True:
+            data = self.client.get(f'/dashboard/?limit=4&cursor={cursor}', **JSON).json()
+            seen.extend(t['id'] for t in data['team_tasks'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, self.full_task_ids())
+        ordered = TeamMemberTask.objects.order_by('end_date', 'id').values_list('id', flat=True)
+        self.assertEqual(seen, list(ordered))
+
+    def test_page_query_budget(self):
+        first = self.client.get('/dashboard/?limit=4', **JSON).json()
+        response = self.assertMaxQueries(
+            4, self.client.get, f"/dashboard/?limit=4&cursor={first['next_cursor']}", **JSON
+        )
+        self.assertEqual(len(response.json()['team_tasks']), 4)
+
+    def test_invalid_cursor_and_limit(self):
+        self.assertEqual(self.client.get('/dashboard/?cursor=%25%25', **JSON).status_code, 400)
+        self.assertEqual(self.client.get('/dashboard/?limit=0', **JSON).status_code, 400)
+
+    def test_streamed_body_matches_full_payload(self):
+        response = self.client.get('/dashboard/?stream=1', **JSON)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([t['id'] for t in data['team_tasks']], self.full_task_ids())
+        self.assertEqual(len(data['team_members']), self.member_count + 1)
+
+
+class MemberIdentityTests(TaskflowTestCase):
+    """`request.member`/`request.admin_tm` come from one lookup, optionally cached in the session."""
+
+    def test_admin_identity_resolved_in_one_query(self):
+        from .repositories import MemberRepository
+
+        member, admin_tm = self.assertMaxQueries(1, MemberRepository.get_with_admin_membership, 'admin')
+        self.assertEqual(member, self.admin)
+        self.assertEqual(admin_tm.pk, self.admin_tm.pk)
+        self.assertEqual(admin_tm.team.name, 'Core')
+
+        member, admin_tm = MemberRepository.get_with_admin_membership('user0')
+        self.assertEqual(member, self.members[0])
+        self.assertIsNone(admin_tm)
+        self.assertEqual(MemberRepository.get_with_admin_membership('nobody'), (None, None))
+
+    def test_mutation_reuses_request_identity(self):
+        self.login_as(self.admin)
+        task = self.assignments[0]
+        # session, identity, the team-scoped assignment lookup, the row lock,
+        # the delete, the sync clock bump, the tombstone insert and the search
+        # index prune, plus the savepoint pair (a transaction outside tests)
+        response = self.assertMaxQueries(10, self.client.post, f'/delete-task/{task.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TeamMemberTask.objects.filter(pk=task.pk).exists())
+
+    @override_settings(TASKFLOW_IDENTITY_SESSION_CACHE=True)
+    def test_session_cached_identity(self):
+        self.login_as(self.admin)
+        self.client.get('/dashboard/', **JSON)
+        # Session read + members + tasks; the identity comes from the session.
+        self.assertMaxQueries(3, self.client.get, '/dashboard/', **JSON)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.name = 'Renamed'
+            self.admin.save()
+        response = self.client.get('/dashboard/', **JSON)
+        self.assertEqual(response.json()['member_name'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin_tm.is_admin = False
+            self.admin_tm.save()
+        self.assertEqual(self.client.get('/dashboard/', **JSON).status_code, 403)
+
+
+class DashboardCacheTests(TaskflowTestCase):
+    """Dashboard payloads are cached per team generation and revalidated by ETag."""
+
+    def setUp(self):
+        super().setUp()
+        self.login_as(self.admin)
+
+    def test_cached_dashboard_and_conditional_get(self):
+        first = self.client.get('/dashboard/', **JSON)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('"'))
+
+        # Session + identity only: members and tasks come from the cache.
+        cached = self.assertMaxQueries(2, self.client.get, '/dashboard/', **JSON)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached['ETag'], etag)
+
+        not_modified = self.assertMaxQueries(
+            2, self.client.get, '/dashboard/', HTTP_IF_NONE_MATCH=etag, **JSON
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_writes_invalidate_the_team(self):
+        etag = self.client.get('/dashboard/', **JSON)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_fresh_task()
+        response = self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=etag, **JSON)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Fresh', [t['task_name'] for t in response.json()['team_tasks']])
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member = self.members[1]
+            member.name = 'Someone Else'
+            member.save()
+        response = self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=etag, **JSON)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Someone Else', [m['name'] for m in response.json()['team_members']])
+
+    def test_generation_changes_on_commit(self):
+        etag = self.client.get('/dashboard/', **JSON)['ETag']
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.add_fresh_task()
+            # Until the write commits, readers keep the old token, so they
+            # cannot cache pre-commit rows under the new one.
+            self.assertEqual(self.client.get('/dashboard/', **JSON)['ETag'], etag)
+        for callback in callbacks:
+            callback()
+        response = self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=etag, **JSON)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Fresh', [t['task_name'] for t in response.json()['team_tasks']])
+
+    def add_fresh_task(self):
+        self.client.post('/add-task/', {
+            'task_name': 'Fresh',
+            'team_member_id': self.team_members[0].id,
+            'start_date': '2025-02-01',
+            'end_date': '2025-02-02',
+        })
+
+    def test_other_team_writes_keep_the_cache(self):
+        etag = self.client.get('/dashboard/', **JSON)['ETag']
+        other = Team.objects.create(name='Other')
+        outsider = Member.objects.create(username='out', name='Out', gmail='o@example.com', password='x')
+        TeamMember.objects.create(team=other, member=outsider)
+        response = self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=etag, **JSON)
+        self.assertEqual(response.status_code, 304)
+
+
+class BulkAddTasksTests(TaskflowTestCase):
+    """`add-tasks/` validates against the admin's team in bulk and reports per-item errors."""
+
+    def setUp(self):
+        super().setUp()
+        self.login_as(self.admin)
+
+    def post_tasks(self, tasks):
+        return self.client.post('/add-tasks/', json.dumps({'tasks': tasks}), content_type='application/json')
+
+    def test_bulk_insert_with_item_errors(self):
+        outsider_team = Team.objects.create(name='Other')
+        outsider = Member.objects.create(username='out', name='Out', gmail='o@example.com', password='x')
+        outsider_tm = TeamMember.objects.create(team=outsider_team, member=outsider)
+        tasks = [
+            {'task_name': f'Sprint {i % 3}', 'team_member_id': tm.id,
+             'start_date': '2025-03-01', 'end_date': '2025-03-14'}
+            for i, tm in enumerate(self.team_members * 10)
+        ]
+        tasks.append({'task_name': 'Nope', 'team_member_id': outsider_tm.id,
+                      'start_date': '2025-03-01', 'end_date': '2025-03-14'})
+        tasks.append({'task_name': 'Bad date', 'team_member_id': self.team_members[0].id,
+                      'start_date': 'soon', 'end_date': '2025-03-14'})
+        tasks.append({'task_name': '', 'team_member_id': self.team_members[0].id})
+
+        before = TeamMemberTask.objects.count()
+        # session, identity, team check, task names (select/insert/select),
+        # two savepoints, sync clock bump, insert, the assignees' member ids
+        # for change events and the search index insert
+        response = self.assertMaxQueries(14, self.post_tasks, tasks)
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(len(data['created']), len(self.team_members) * 10)
+        self.assertEqual([e['index'] for e in data['errors']], [len(tasks) - 3, len(tasks) - 2, len(tasks) - 1])
+        self.assertEqual(TeamMemberTask.objects.count(), before + len(self.team_members) * 10)
+        self.assertEqual(Task.objects.filter(name_task__startswith='Sprint ').count(), 3)
+        self.assertFalse(TeamMemberTask.objects.filter(team_member=outsider_tm).exists())
+
+    def test_rejects_non_admin_and_bad_body(self):
+        self.assertEqual(self.post_tasks([]).status_code, 400)
+        self.assertEqual(
+            self.client.post('/add-tasks/', 'nope', content_type='application/json').status_code, 400
+        )
+        self.login_as(self.members[0])
+        response = self.post_tasks([{'task_name': 'x', 'team_member_id': 1,
+                                     'start_date': '2025-03-01', 'end_date': '2025-03-02'}])
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskNameInterningTests(TaskflowTestCase):
+    """Task names resolve from the per-process cache once seen."""
+
+    def task_queries(self, func, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            func(*args)
+        return [q['sql'] for q in ctx.captured_queries if '"core_task"' in q['sql']]
+
+    def test_known_name_skips_the_database(self):
+        name = self.assignments[0].task.name_task
+        add = TaskService.add_task
+        args = (self.admin, name, self.team_members[1].id, '2025-02-01', '2025-02-10', self.admin_tm)
+        self.assertEqual(len(self.task_queries(add, *args)), 1)
+        self.assertEqual(self.task_queries(add, *args), [])
+        self.assertEqual(
+            TeamMemberTask.objects.filter(task=self.assignments[0].task).count(), 3
+        )
+
+    def test_new_names_interned_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            task_id = TaskRepository.get_or_create_id('Brand new')
+        self.assertEqual(task_names.lookup(['Brand new'])[1], {})
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.task_queries(TaskRepository.get_or_create_id, 'Brand new'), [])
+        self.assertEqual(TaskRepository.get_or_create_id('Brand new'), task_id)
+        self.assertEqual(Task.objects.filter(name_task='Brand new').count(), 1)
+
+    def test_rename_and_delete_invalidate(self):
+        task = self.assignments[0].task
+        old_name = task.name_task
+        TaskRepository.get_or_create_id(old_name)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.name_task = 'Renamed'
+            task.save()
+        self.assertEqual(TaskRepository.get_or_create_id('Renamed'), task.id)
+        self.assertNotEqual(TaskRepository.get_or_create_id(old_name), task.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.get(name_task=old_name).delete()
+        self.assertEqual(len(self.task_queries(TaskRepository.get_or_create_id, old_name)), 3)
+
+    @override_settings(TASKFLOW_TASK_NAME_CACHE_SIZE=2)
+    def test_cache_is_bounded(self):
+        names = [a.task.name_task for a in self.assignments[:3]]
+        TaskRepository.get_or_create_many(names)
+        self.assertEqual(len(task_names), 2)
+
+
+class TeamStatsTests(TaskflowTestCase):
+    """`stats/` counts in the database, from the tasks or from the stats table."""
+
+    member_count = 2
+    tasks_per_member = 3
+
+    def setUp(self):
+        super().setUp()
+        self.login_as(self.admin)
+        # One finished task and, with end dates in January 2025, every open
+        # task overdue.
+        TeamMemberTask.objects.filter(pk=self.assignments[0].pk).update(is_finish=True)
+
+    def get_stats(self):
+        return self.client.get('/stats/', **JSON)
+
+    def test_aggregated_stats(self):
+        # session, identity and one aggregate query
+        response = self.assertMaxQueries(3, self.get_stats)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['total'], data['open'], data['done'], data['overdue']), (6, 5, 1, 5))
+        self.assertEqual(data['completion_rate'], round(1 / 6, 4))
+        self.assertEqual(
+            [(m['id'], m['open'], m['done']) for m in data['members']],
+            [(self.admin_tm.id, 0, 0), (self.team_members[0].id, 2, 1), (self.team_members[1].id, 3, 0)],
+        )
+
+        self.login_as(self.members[0])
+        self.assertEqual(self.get_stats().status_code, 403)
+
+    @override_settings(TASKFLOW_TASK_STATS_TABLE=True)
+    def test_stats_table_follows_task_writes(self):
+        call_command('rebuild_task_stats', stdout=io.StringIO())
+        first, second = self.team_members
+        TaskService.add_task(self.admin, 'New', first.id, '2025-02-01', '2025-02-10')
+        TaskService.add_tasks_bulk(self.admin, [
+            {'task_name': 'Bulk', 'team_member_id': self.admin_tm.id,
+             'start_date': '2025-02-01', 'end_date': '2025-02-10'},
+        ])
+        TaskService.mark_task_complete(self.members[1], self.assignments[3].id)
+        TaskService.mark_task_complete(self.members[1], self.assignments[3].id)
+        # Reassigning the finished task reopens it for the new member.
+        TaskService.edit_task(self.admin, self.assignments[0].id, 'Moved', second.id, '2025-02-01', '2025-02-10')
+        TaskService.delete_task(self.admin, self.assignments[1].id)
+
+        today = date(2025, 2, 5)
+        expected = list(TaskStatsRepository.count_for_team(self.team, today))
+        self.assertEqual(list(TaskStatsRepository.get_for_team(self.team, today)), expected)
+        self.assertEqual(
+            [(row['open'], row['done'], row['overdue']) for row in expected],
+            [(1, 0, 0), (2, 0, 1), (3, 1, 2)],
+        )
+        self.assertEqual(self.get_stats().json()['done'], 1)
+
+        TeamMemberTaskStats.objects.all().delete()
+        TaskStatsRepository.rebuild(self.team)
+        self.assertEqual(list(TaskStatsRepository.get_for_team(self.team, today)), expected)
+
+    @override_settings(TASKFLOW_TASK_STATS_TABLE=True)
+    def test_stats_table_ignores_stale_reads(self):
+        call_command('rebuild_task_stats', stdout=io.StringIO())
+        # Each write below gets the assignment as it was read before
+        # another request completed or deleted it.
+        completed = TeamMemberTask.objects.get(pk=self.assignments[1].pk)
+        deleted = TeamMemberTask.objects.get(pk=self.assignments[2].pk)
+        TaskService.mark_task_complete(self.members[0], completed.id)
+        TaskService.delete_task(self.admin, deleted.id)
+
+        def stale(tmt):
+            return mock.patch.multiple(
+                'core.services.TeamMemberTaskRepository', get_for_member=lambda *args: tmt,
+                get_in_team=lambda *args: tmt,
+            )
+
+        with stale(completed):
+            self.assertIsNone(TaskService.mark_task_complete(self.members[0], completed.id))
+            # Counted as deleted while done, not while open.
+            self.assertIsNone(TaskService.delete_task(self.admin, completed.id))
+        with stale(deleted):
+            self.assertIsNone(TaskService.mark_task_complete(self.members[0], deleted.id))
+            self.assertEqual(TaskService.delete_task(self.admin, deleted.id), "Task not found")
+
+        today = date(2025, 2, 5)
+        self.assertEqual(
+            list(TaskStatsRepository.get_for_team(self.team, today)),
+            list(TaskStatsRepository.count_for_team(self.team, today)),
+        )
+
+
+class SessionEngineTests(TaskflowTestCase):
+    """Session storage is configurable; expired database sessions are purged in batches."""
+
+    def login_with_engine(self, engine):
+        # SessionMiddleware binds the engine when the client's handler is built.
+        self.client = self.client_class()
+        store = import_module(settings.TASKFLOW_SESSION_ENGINES[engine]).SessionStore()
+        store['member_username'] = self.members[0].username
+        store.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+
+    def view_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get('/view/', **JSON).status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_engines_skip_the_session_query(self):
+        self.login_with_engine('db')
+        self.view_queries()  # loads the sync horizon into the cache
+        db_queries = self.view_queries()
+        for engine in ('signed_cookies', 'cache', 'cached_db'):
+            with self.subTest(engine=engine), override_settings(SESSION_ENGINE=settings.TASKFLOW_SESSION_ENGINES[engine]):
+                self.login_with_engine(engine)
+                self.view_queries()  # cached_db fills the cache on first read
+                self.assertEqual(self.view_queries(), db_queries - 1)
+
+    def test_purge_expired_sessions(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'old{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('purge_sessions', batch_size=2, stdout=out)
+        self.assertIn('Deleted 5 expired sessions', out.getvalue())
+        # three batches, each one select and one delete
+        self.assertEqual(len(ctx.captured_queries), 6)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    def test_cache_engines_need_a_shared_cache(self):
+        engines = settings.TASKFLOW_SESSION_ENGINES
+        with override_settings(SESSION_ENGINE=engines['cache']):
+            self.assertEqual([e.id for e in checks.check_session_cache(None)], ['core.E001'])
+        with override_settings(SESSION_ENGINE=engines['cached_db']):
+            self.assertEqual([e.id for e in checks.check_session_cache(None)], ['core.W001'])
+        with override_settings(SESSION_ENGINE=engines['db']):
+            self.assertEqual(checks.check_session_cache(None), [])
+
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            SESSION_ENGINE=engines['cache'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                'LOCATION': cache_dir}},
+        ):
+            self.assertEqual(checks.check_session_cache(None), [])
+
+
+class SpaIndexTests(TestCase):
+    """The SPA index is served from memory, precompressed, and reloaded when it changes."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.makedirs(os.path.join(tmp.name, 'static', 'frontend'))
+        self.path = os.path.join(tmp.name, 'static', 'frontend', 'index.html')
+        self.write(b'<html>v1</html>', 1_000_000_000)
+        override = override_settings(BASE_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        spa.reset()
+        self.addCleanup(spa.reset)
+
+    def write(self, content, mtime):
+        with open(self.path, 'wb') as fh:
+            fh.write(content)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_negotiation_and_etag(self):
+        plain = self.client.get('/')
+        self.assertEqual(plain.content, b'<html>v1</html>')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('no-cache', plain['Cache-Control'])
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        gzipped = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(gzipped.content), b'<html>v1</html>')
+        self.assertNotEqual(gzipped['ETag'], plain['ETag'])
+        self.assertNotIn('Content-Encoding', self.client.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0'))
+
+        revalidated = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=gzipped['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], gzipped['ETag'])
+
+    def test_reloads_only_when_mtime_changes(self):
+        with mock.patch.object(spa, 'CHECK_INTERVAL', 0):
+            index = spa.get_index()
+            self.assertIs(spa.get_index(), index)
+            self.write(b'<html>v2</html>', 1_000_000_100)
+            self.assertEqual(self.client.get('/').content, b'<html>v2</html>')
+            os.remove(self.path)
+            self.assertEqual(self.client.get('/').status_code, 404)
+
+
+class SearchTests(TaskflowTestCase):
+    """`search/` ranks team members and tasks from the token index."""
+
+    member_count = 2
+    tasks_per_member = 3
+
+    def setUp(self):
+        super().setUp()
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.login_as(self.admin)
+
+    def search(self, q, **params):
+        return self.client.get('/search/', {'q': q, **params}, **JSON)
+
+    def hits(self, q):
+        response = self.search(q)
+        self.assertEqual(response.status_code, 200)
+        return [(hit['kind'], hit['name'], hit['match']) for hit in response.json()['results']]
+
+    def test_ranked_prefix_word_and_substring_matches(self):
+        first, second = self.team_members
+        TaskService.add_task(self.admin, 'Écrire le rapport', first.id, '2025-02-01', '2025-02-10')
+        TaskService.add_task(self.admin, 'Rapport annuel', second.id, '2025-02-01', '2025-02-10')
+        TaskService.add_task(self.admin, 'Deport', second.id, '2025-02-01', '2025-02-10')
+        # Another team's member and task never show up.
+        outsider, error = AuthService.register('other', 'Rapporteur', 'o@example.com', 'pw', 'Elsewhere')
+        self.assertIsNone(error)
+        outsider_tm = TeamMember.objects.get(member=outsider)
+        TaskService.add_task(outsider, 'Rapport secret', outsider_tm.id, '2025-02-01', '2025-02-10')
+
+        self.assertEqual(self.hits('RAPPORT'), [
+            ('task', 'Rapport annuel', 'prefix'),
+            ('task', 'Écrire le rapport', 'word'),
+        ])
+        self.assertEqual(self.hits('ecrire le'), [('task', 'Écrire le rapport', 'prefix')])
+        # Ties in creation order.
+        self.assertEqual(self.hits('port'), [
+            ('task', 'Écrire le rapport', 'substring'),
+            ('task', 'Rapport annuel', 'substring'),
+            ('task', 'Deport', 'substring'),
+        ])
+        # Member names and usernames; the best match of the two counts.
+        self.assertEqual(self.hits('user'), [('member', 'User 0', 'prefix'), ('member', 'User 1', 'prefix')])
+        self.assertEqual(self.hits('min'), [('member', 'Admin', 'substring')])
+
+        task_hit = self.search('annuel').json()['results'][0]
+        self.assertEqual(
+            [(a['assigned_to'], a['team_member_id']) for a in task_hit['assignments']],
+            [('User 1', second.id)],
+        )
+
+    def test_cursor_pages(self):
+        seen = []
+        cursor = ''
+        while True:
+            # session, identity, the token range scan and the member and
+            # assignment rows of the page
+            response = self.assertMaxQueries(5, self.search, 'task', limit=4, cursor=cursor)
+            data = response.json()
+            seen += [hit['name'] for hit in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(a.task.name_task for a in self.assignments))
+        self.assertEqual(self.search('task', cursor='nope').status_code, 400)
+
+    def test_index_follows_writes(self):
+        first, second = self.team_members
+        TeamService.edit_member(self.admin, first.id, 'Zoe Quinn', 'zquinn', 'z@example.com', 'pw')
+        self.assertEqual(self.hits('user 0'), [])
+        self.assertEqual(self.hits('quinn'), [('member', 'Zoe Quinn', 'word')])
+
+        TeamService.add_member_to_team(self.admin, 'newbie', 'Newbie', 'n@example.com', 'pw')
+        self.assertEqual(self.hits('newb'), [('member', 'Newbie', 'prefix')])
+
+        assignment = self.assignments[0]
+        name = assignment.task.name_task
+        TaskService.edit_task(self.admin, assignment.id, 'Renamed job', first.id, '2025-02-01', '2025-02-10')
+        self.assertEqual(self.hits('renamed'), [('task', 'Renamed job', 'prefix')])
+        self.assertEqual(self.hits(name), [])
+        TaskService.delete_task(self.admin, assignment.id)
+        self.assertEqual(self.hits('renamed'), [])
+        self.assertFalse(SearchToken.objects.filter(kind=SearchToken.TASK, object_id=assignment.task_id).exists())
+
+        TeamService.remove_member(self.admin, second.id)
+        self.assertEqual(self.hits('user 1'), [])
+        self.assertFalse(SearchToken.objects.filter(kind=SearchToken.MEMBER, object_id=second.id).exists())
+
+    def test_errors(self):
+        self.assertEqual(self.search('a').status_code, 400)
+        self.assertEqual(self.search('!!').status_code, 400)
+        self.login_as(self.members[0])
+        self.assertEqual(self.search('user').status_code, 403)
+
+
+class DeadlineScanTests(TaskflowTestCase):
+    """`scan_deadlines` queues each reminder once and sends one digest per member."""
+
+    # As of 2025-01-13 every member has tasks ending 01-10..01-12 (overdue)
+    # and 01-13..01-14 (due within a day).
+    today = date(2025, 1, 13)
+
+    def scan(self, *args):
+        out = io.StringIO()
+        call_command('scan_deadlines', '--sink', 'locmem', '--batch-size', '2', *args, stdout=out)
+        return out.getvalue().strip()
+
+    def test_one_digest_per_member_then_nothing_new(self):
+        self.assertEqual(
+            self.scan('--today', '2025-01-13'), 'Queued 15 notices; sent 3 digests; purged 0 old notices.'
+        )
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [m.gmail for m in self.members])
+        digest = next(m for m in mail.outbox if m.to == [self.members[0].gmail])
+        self.assertEqual(digest.subject, 'Taskflow reminders for 2025-01-13: 3 overdue, 2 due soon')
+        tm = self.team_members[0]
+        self.assertLess(digest.body.index('Overdue:'), digest.body.index('Due soon:'))
+        self.assertIn(f'- Task {tm.id}-0 (Core), due 2025-01-10', digest.body)
+        self.assertIn(f'- Task {tm.id}-4 (Core), due 2025-01-14', digest.body)
+        self.assertFalse(DeadlineNotice.objects.filter(sent_at__isnull=True).exists())
+
+        mail.outbox.clear()
+        self.assertEqual(
+            self.scan('--today', '2025-01-13'), 'Queued 0 notices; sent 0 digests; purged 0 old notices.'
+        )
+        self.assertEqual(mail.outbox, [])
+
+    def test_moved_tasks_are_reminded_again_and_finished_ones_skipped(self):
+        self.scan('--today', '2025-01-13')
+        mail.outbox.clear()
+        moved, finished = self.assignments[0], self.assignments[5]
+        TeamMemberTask.objects.filter(id=moved.id).update(end_date=date(2025, 1, 14))
+        # Queued but finished before the digest went out.
+        TeamMemberTask.objects.filter(id=finished.id).update(end_date=date(2025, 1, 14))
+        deadlines.scan(self.today)
+        TeamMemberTask.objects.filter(id=finished.id).update(is_finish=True)
+
+        self.assertEqual(deadlines.deliver(get_connection('django.core.mail.backends.locmem.EmailBackend'),
+                                           self.today), (1, 2))
+        [digest] = mail.outbox
+        self.assertEqual(digest.to, [self.members[0].gmail])
+        self.assertEqual(digest.subject, 'Taskflow reminders for 2025-01-13: 1 due soon')
+
+    def test_digest_is_capped(self):
+        with mock.patch.object(deadlines, 'MAX_DIGEST_ITEMS', 2):
+            self.scan('--today', '2025-01-13')
+        self.assertTrue(all(m.body.count('\n- ') == 2 and '...and 3 more.' in m.body for m in mail.outbox))
+
+    def test_sent_notices_are_purged_out_of_the_window(self):
+        self.scan('--today', '2025-01-13')
+        self.assertEqual(
+            self.scan('--today', '2025-01-25'), 'Queued 0 notices; sent 0 digests; purged 15 old notices.'
+        )
+        self.assertFalse(DeadlineNotice.objects.exists())
+
+    def test_errors(self):
+        with self.assertRaises(CommandError):
+            self.scan('--sink', 'nowhere')
+        with self.assertRaises(CommandError):
+            call_command('scan_deadlines', '--batch-size', '0')
+
+
+class ArchiveTests(TaskflowTestCase):
+    """`archive_tasks` moves old finished assignments out of the default task lists."""
+
+    def setUp(self):
+        super().setUp()
+        # User 0's tasks ending 01-10 and 01-11, User 1's ending 01-10.
+        self.finished = [self.assignments[0], self.assignments[1], self.assignments[5]]
+        TeamMemberTask.objects.filter(id__in=[a.id for a in self.finished]).update(is_finish=True)
+
+    def get(self, member, path):
+        self.login_as(member)
+        response = self.client.get(path, **JSON)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command('archive_tasks', '--older-than', '30', *args, stdout=out)
+        return out.getvalue().strip()
+
+    def test_archived_rows_leave_hot_reads_and_page_from_archive(self):
+        token = self.get(self.members[0], '/view/')['sync_token']
+        self.assertEqual(self.archive('--batch-size', '2'), 'Archived 3 finished assignments.')
+        self.assertEqual(self.archive(), 'Archived 0 finished assignments.')
+        archived_ids = {a.id for a in self.finished}
+        self.assertEqual(set(ArchivedTask.objects.values_list('id', flat=True)), archived_ids)
+
+        hot = self.get(self.admin, '/dashboard/')['team_tasks']
+        self.assertEqual(len(hot), len(self.assignments) - 3)
+        self.assertFalse(archived_ids & {t['id'] for t in hot})
+        delta = self.get(self.members[0], f'/view/?since={token}')
+        self.assertEqual(delta['removed'], [self.assignments[0].id, self.assignments[1].id])
+
+        archive = self.get(self.members[0], '/view/?include_archived=1')
+        self.assertEqual([t['id'] for t in archive['team_tasks']], [self.assignments[0].id, self.assignments[1].id])
+        self.assertEqual(archive['team_tasks'][0], {
+            'id': self.assignments[0].id, 'task_name': f'Task {self.team_members[0].id}-0', 'team_name': 'Core',
+            'start_date': '2025-01-01', 'end_date': '2025-01-10', 'is_finish': True,
+        })
+        self.assertIsNone(archive['next_cursor'])
+
+        # Ordered by (end_date, id) across the team.
+        first = self.get(self.admin, '/dashboard/?include_archived=1&limit=2')
+        self.assertEqual([t['id'] for t in first['team_tasks']], [self.assignments[0].id, self.assignments[5].id])
+        self.assertEqual(first['team_tasks'][1]['assigned_to'], 'User 1')
+        self.assertEqual(len(first['team_members']), len(self.members) + 1)
+        second = self.get(self.admin, f"/dashboard/?include_archived=1&limit=2&cursor={first['next_cursor']}")
+        self.assertEqual([t['id'] for t in second['team_tasks']], [self.assignments[1].id])
+        self.assertIsNone(second['next_cursor'])
+
+    @override_settings(TASKFLOW_TASK_STATS_TABLE=True)
+    def test_cutoff_and_stats(self):
+        TaskStatsRepository.rebuild()
+        self.assertEqual(TaskService.archive_finished(date(2025, 1, 11)), 2)
+        self.assertEqual(TaskService.archive_finished(date(2025, 1, 11)), 0)
+        self.assertFalse(ArchivedTask.objects.filter(id=self.assignments[1].id).exists())
+        self.assertEqual(
+            list(TaskStatsRepository.get_for_team(self.team, date(2025, 1, 1))),
+            list(TaskStatsRepository.count_for_team(self.team, date(2025, 1, 1))),
+        )
+
+    def test_errors(self):
+        self.login_as(self.members[0])
+        self.assertEqual(self.client.get('/dashboard/?include_archived=1', **JSON).status_code, 403)
+        self.assertEqual(self.client.get('/view/?include_archived=1&cursor=!', **JSON).status_code, 400)
+        with self.assertRaises(CommandError):
+            call_command('archive_tasks', '--older-than', '-1')
+
+
+class ScopedMutationTests(TaskflowTestCase):
+    """Mutations authorize inside the lookup query and write only changed columns."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_team = Team.objects.create(name='Other')
+        outsider = Member.objects.create(username='out', name='Out', gmail='o@example.com', password='x')
+        self.outsider_tm = TeamMember.objects.create(team=self.other_team, member=outsider)
+        self.outsider_task = TeamMemberTask.objects.create(
+            task=self.assignments[0].task, team_member=self.outsider_tm,
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 2),
+        )
+
+    def updates(self, func, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            result = func(*args)
+        return result, [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "core_')]
+
+    def test_other_teams_rows_are_not_found_in_one_query(self):
+        admin_tm = self.admin_tm
+        self.assertEqual(self.assertMaxQueries(
+            1, TaskService.delete_task, self.admin, self.outsider_task.id, admin_tm
+        ), "Task not found")
+        self.assertEqual(self.assertMaxQueries(
+            1, TaskService.edit_task, self.admin, self.assignments[0].id, 'x', self.outsider_tm.id,
+            '2025-01-01', '2025-01-02', admin_tm,
+        ), "Selected team member is invalid")
+        self.assertEqual(self.assertMaxQueries(
+            1, TaskService.mark_task_complete, self.members[0], self.assignments[-1].id
+        ), "Task not found")
+        self.assertEqual(self.assertMaxQueries(
+            1, TeamService.remove_member, self.admin, self.outsider_tm.id, admin_tm
+        ), "Team member not found")
+        self.assertTrue(TeamMemberTask.objects.filter(pk=self.outsider_task.pk).exists())
+
+        self.login_as(self.admin)
+        self.assertEqual(self.client.get(f'/edit-member/{self.outsider_tm.id}/', **JSON).status_code, 404)
+
+    def test_updates_write_changed_columns_only(self):
+        assignment = self.assignments[0]
+        name = assignment.task.name_task
+        args = (self.admin, assignment.id, name, assignment.team_member_id, '2025-01-01')
+        error, updates = self.updates(TaskService.edit_task, *args, '2025-03-01', self.admin_tm)
+        self.assertIsNone(error)
+        task_update = [sql for sql in updates if 'core_teammembertask' in sql]
+        self.assertEqual(len(task_update), 1)
+        self.assertIn('"end_date"', task_update[0])
+        self.assertNotIn('"start_date"', task_update[0])
+        self.assertNotIn('"task_id"', task_update[0])
+        # Nothing changed, nothing written.
+        error, updates = self.updates(TaskService.edit_task, *args, '2025-03-01', self.admin_tm)
+        self.assertEqual([sql for sql in updates if 'core_teammembertask' in sql], [])
+
+        member = self.members[1]
+        tm = self.team_members[1]
+        error, updates = self.updates(
+            TeamService.edit_member, self.admin, tm.id, 'New Name', member.username, member.gmail, 'pw', self.admin_tm
+        )
+        self.assertIsNone(error)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"name"', updates[0])
+        self.assertNotIn('"username"', updates[0])
+        self.assertEqual(Member.objects.get(pk=member.pk).name, 'New Name')
+
+    def test_remove_member_deletes_that_member(self):
+        # A member without a team shifts Member ids away from TeamMember ids.
+        Member.objects.create(username='solo', name='Solo', gmail='s@example.com', password='x')
+        newcomer = Member.objects.create(username='new', name='New', gmail='n@example.com', password='x')
+        newcomer_tm = TeamMember.objects.create(team=self.team, member=newcomer)
+        self.assertNotEqual(newcomer_tm.id, newcomer.id)
+        self.assertIsNone(TeamService.remove_member(self.admin, newcomer_tm.id, self.admin_tm))
+        self.assertFalse(Member.objects.filter(pk=newcomer.pk).exists())
+        self.assertTrue(Member.objects.filter(pk=newcomer_tm.id).exists())
+
+
+class MemberRemovalTests(TaskflowTestCase):
+    """Removing a member deletes their task history in batches, now or in the background."""
+
+    def remove(self, team_member, **data):
+        self.login_as(self.admin)
+        return self.client.post(f'/delete-member/{team_member.id}/', data)
+
+    def test_removal_deletes_history_and_leaves_tombstones(self):
+        tm, member = self.team_members[0], self.members[0]
+        first = self.assignments[0]
+        ArchivedTask.objects.create(
+            id=10_000, task=first.task, team_member=tm, team=self.team,
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 2),
+        )
+        DeadlineNotice.objects.create(assignment=first, member=member, kind=DeadlineNotice.DUE, end_date=first.end_date)
+        SearchRepository.rebuild(self.team)
+        ids = set(TeamMemberTask.objects.filter(team_member=tm).values_list('id', flat=True))
+
+        with transaction.atomic():
+            TeamMemberRepository.delete_member(member, batch_size=2)
+        self.assertFalse(Member.objects.filter(pk=member.pk).exists())
+        self.assertFalse(TeamMemberTask.objects.filter(id__in=ids).exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertFalse(DeadlineNotice.objects.exists())
+        self.assertFalse(SearchToken.objects.filter(kind=SearchToken.MEMBER, object_id=tm.id).exists())
+        self.assertEqual(
+            set(TaskTombstone.objects.filter(team_id=self.team.id).values_list('assignment_id', flat=True)), ids
+        )
+        self.assertEqual(TeamMemberTask.objects.count(), len(self.assignments) - len(ids))
+
+    def test_queries_do_not_grow_with_history(self):
+        task = self.assignments[0].task
+        TeamMemberTask.objects.bulk_create([
+            TeamMemberTask(task=task, team_member=self.team_members[1],
+                           start_date=date(2025, 1, 1), end_date=date(2025, 1, 2))
+            for _ in range(150)
+        ])
+        counts = []
+        for tm in self.team_members[:2]:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertIsNone(TeamService.remove_member(self.admin, tm.id, self.admin_tm))
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_nothing_cascades_from_assignments(self):
+        # delete_member, delete_many and archive delete assignments
+        # without the collector, which would follow these relations.
+        self.assertEqual(
+            [
+                (rel.related_model, rel.on_delete)
+                for rel in TeamMemberTask._meta.get_fields(include_hidden=True)
+                if rel.auto_created and not rel.concrete
+            ],
+            [(DeadlineNotice, DO_NOTHING)],
+        )
+
+    def test_background_removal(self):
+        tm, member = self.team_members[0], self.members[0]
+        response = self.remove(tm, background='1')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.remove(tm, background='1').status_code, 202)
+        self.assertTrue(TeamMemberTask.objects.filter(team_member=tm).exists())
+
+        out = io.StringIO()
+        call_command('process_member_removals', '--batch-size', '2', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Removed 1 members.')
+        self.assertFalse(Member.objects.filter(pk=member.pk).exists())
+        self.assertFalse(MemberRemoval.objects.exists())
+        self.assertEqual(TeamMemberTask.objects.count(), len(self.assignments) - self.tasks_per_member)
+
+
+class BulkTaskTests(TaskflowTestCase):
+    """The bulk task endpoints change many assignments in one permission-filtered statement."""
+
+    def setUp(self):
+        super().setUp()
+        other_team = Team.objects.create(name='Other')
+        outsider = Member.objects.create(username='out', name='Out', gmail='o@example.com', password='x')
+        outsider_tm = TeamMember.objects.create(team=other_team, member=outsider)
+        self.outsider_task = TeamMemberTask.objects.create(
+            task=self.assignments[0].task, team_member=outsider_tm,
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 2),
+        )
+
+    def post(self, member, action, **body):
+        self.login_as(member)
+        return self.client.post(f'/{action}-tasks/', json.dumps(body), content_type='application/json')
+
+    def updated(self, member, action, **body):
+        response = self.post(member, action, **body)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['updated']
+
+    def ids(self, *indexes):
+        return [self.assignments[i].id for i in indexes]
+
+    def finished(self):
+        return set(TeamMemberTask.objects.filter(is_finish=True).values_list('id', flat=True))
+
+    def test_complete_and_reopen(self):
+        # A member completes only their own tasks; an admin any of the team's.
+        self.assertEqual(self.updated(self.members[0], 'complete', ids=self.ids(0, 1, 5)), 2)
+        self.assertEqual(self.finished(), set(self.ids(0, 1)))
+        self.assertEqual(self.updated(self.admin, 'complete', ids=[*self.ids(0, 5), self.outsider_task.id]), 1)
+        self.assertEqual(self.finished(), set(self.ids(0, 1, 5)))
+        self.assertEqual(self.updated(self.admin, 'reopen', ids=self.ids(0, 1, 5, 6)), 3)
+        self.assertEqual(self.finished(), set())
+
+    def test_one_statement_whatever_the_count(self):
+        self.login_as(self.admin)
+        for count in (1, 10):
+            ids = self.ids(*range(count))
+            response = self.assertMaxQueries(
+                7, self.client.post, '/complete-tasks/', json.dumps({'ids': ids}), content_type='application/json'
+            )
+            self.assertEqual(response.json()['updated'], count if count == 1 else count - 1)
+
+    def test_reassign_and_shift(self):
+        token = self.get_token(self.members[0])
+        self.assertEqual(self.updated(
+            self.admin, 'reassign', ids=self.ids(0, 1, 5), team_member_id=self.team_members[1].id
+        ), 2)
+        self.assertEqual(TeamMemberTask.objects.filter(team_member=self.team_members[1]).count(), 7)
+        self.login_as(self.members[0])
+        delta = self.client.get(f'/view/?since={token}', **JSON).json()
+        self.assertEqual(delta['removed'], self.ids(0, 1))
+
+        self.assertEqual(self.updated(self.admin, 'shift', ids=self.ids(0, 2), days=-3), 2)
+        shifted = TeamMemberTask.objects.get(id=self.assignments[0].id)
+        self.assertEqual((shifted.start_date, shifted.end_date), (date(2024, 12, 29), date(2025, 1, 7)))
+        self.assertGreater(shifted.version, delta['sync_token'])
+
+        self.assertEqual(self.post(self.admin, 'shift', ids=self.ids(0), days=0).status_code, 400)
+        self.assertEqual(self.post(self.admin, 'shift', ids=self.ids(0), days='2').status_code, 400)
+        self.assertEqual(self.post(
+            self.admin, 'reassign', ids=self.ids(0), team_member_id=self.outsider_task.team_member_id
+        ).status_code, 400)
+        self.assertEqual(self.post(self.members[0], 'shift', ids=self.ids(0), days=1).status_code, 403)
+
+    def get_token(self, member):
+        self.login_as(member)
+        return self.client.get('/view/', **JSON).json()['sync_token']
+
+    def test_delete(self):
+        SearchRepository.rebuild(self.team)
+        deleted = self.ids(0, 1)
+        self.assertEqual(self.updated(self.admin, 'delete', ids=[*deleted, self.outsider_task.id]), 2)
+        self.assertFalse(TeamMemberTask.objects.filter(id__in=deleted).exists())
+        self.assertTrue(TeamMemberTask.objects.filter(id=self.outsider_task.id).exists())
+        self.assertEqual(
+            set(TaskTombstone.objects.values_list('assignment_id', flat=True)), set(deleted)
+        )
+        self.assertFalse(SearchToken.objects.filter(kind=SearchToken.TASK, object_id=self.assignments[0].task_id).exists())
+        self.assertEqual(self.post(self.members[0], 'delete', ids=self.ids(2)).status_code, 403)
+        self.assertEqual(self.post(self.admin, 'delete', ids=[]).status_code, 400)
+        self.assertEqual(self.post(self.admin, 'delete', ids=['x']).status_code, 400)
+
+    @override_settings(TASKFLOW_TASK_STATS_TABLE=True)
+    def test_stats_stay_consistent(self):
+        TaskStatsRepository.rebuild()
+        self.updated(self.admin, 'complete', ids=self.ids(0, 1, 2, 5))
+        self.updated(self.admin, 'reopen', ids=self.ids(1))
+        self.updated(self.admin, 'reassign', ids=self.ids(0, 1, 6), team_member_id=self.team_members[2].id)
+        self.updated(self.admin, 'delete', ids=self.ids(2, 10))
+        today = date(2025, 1, 12)
+        self.assertEqual(
+            list(TaskStatsRepository.get_for_team(self.team, today)),
+            list(TaskStatsRepository.count_for_team(self.team, today)),
+        )
+
+
+@override_settings(TASKFLOW_REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(SimpleTestCase):
+    """Safe requests read from the replica unless the browser wrote recently."""
+
+    def route(self, request):
+        seen = {}
+
+        def view(request):
+            seen['read'] = router.db_for_read(Member)
+            seen['write'] = router.db_for_write(Member)
+            seen['session'] = router.db_for_read(Session)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen, response
+
+    def test_reads_writes_and_pinning(self):
+        factory = RequestFactory()
+        seen, response = self.route(factory.get('/view/'))
+        self.assertEqual(seen, {'read': 'replica', 'write': 'default', 'session': 'default'})
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        seen, response = self.route(factory.post('/add-task/'))
+        self.assertEqual(seen, {'read': 'default', 'write': 'default', 'session': 'default'})
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.TASKFLOW_REPLICA_PIN_SECONDS)
+
+        pinned = factory.get('/view/')
+        pinned.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.route(pinned)[0]['read'], 'default')
+        # Outside a request, reads stay on the primary.
+        self.assertEqual(router.db_for_read(Member), 'default')
+
+    def test_transactions_read_the_primary(self):
+        with use_replica():
+            self.assertEqual(router.db_for_read(Member), 'replica')
+            with mock.patch.object(connection, 'in_atomic_block', True):
+                self.assertEqual(router.db_for_read(Member), 'default')
+
+
+@skipUnless(
+    connection.vendor == 'sqlite' and settings.TASKFLOW_SQLITE_TUNED,
+    'the SQLite profile is off',
+)
+class SqliteProfileTests(SimpleTestCase):
+    """The tuned profile applies to every new connection of a database file."""
+
+    def test_pragmas_and_immediate_transactions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = type(connections[DEFAULT_DB_ALIAS])(
+                {**connection.settings_dict, 'NAME': os.path.join(tmp, 'profile.sqlite3')}, alias='profile',
+            )
+            connections['profile'] = db
+            try:
+                with db.cursor() as cursor:
+                    pragmas = {
+                        name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                        for name in ('journal_mode', 'synchronous', 'busy_timeout')
+                    }
+                with CaptureQueriesContext(db) as ctx, transaction.atomic(using='profile'):
+                    pass
+            finally:
+                db.close()
+                del connections['profile']
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': settings.TASKFLOW_SQLITE_BUSY_TIMEOUT,
+        })
+        self.assertEqual(ctx.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+
+class CopyReplicaTests(TransactionTestCase):
+    # The backup waits for open write transactions, so no TestCase here.
+
+    def test_copy_sqlite(self):
+        Member.objects.create(name='Ann', username='ann', password='x')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'replica.sqlite3')
+            copy_sqlite(path)
+            replica = sqlite3.connect(path)
+            try:
+                usernames = replica.execute('SELECT username FROM core_member').fetchall()
+            finally:
+                replica.close()
+        self.assertEqual(usernames, [('ann',)])
+
+
+class ImportMembersTests(TaskflowTestCase):
+    """CSV/NDJSON imports insert in batches and summarize what was skipped."""
+
+    def setUp(self):
+        super().setUp()
+        self.login_as(self.admin)
+
+    def upload(self, name, content, **extra):
+        return self.client.post('/import-members/', {'file': SimpleUploadedFile(name, content), **extra})
+
+    def test_csv_import(self):
+        lines = ['username,name,gmail,password']
+        lines += [f'new{i},New {i},new{i}@example.com,pw' for i in range(25)]
+        lines += [
+            'user0,Taken,taken@example.com,pw',      # already a member
+            'new3,Again,again@example.com,pw',        # repeated in file
+            'bad,Bad,not-an-email,pw',
+            'empty,,empty@example.com,pw',
+        ]
+        # 25 new rows in batches of 1000: one lookup plus two inserts.
+        response = self.assertMaxQueries(8, self.upload, 'people.csv', '\n'.join(lines).encode())
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['duplicate'], summary['invalid']), (25, 2, 2))
+        self.assertEqual(sorted(e['line'] for e in summary['errors']), [27, 28, 29, 30])
+        self.assertEqual(TeamMember.objects.filter(team=self.team, member__username__startswith='new').count(), 25)
+
+    def test_ndjson_import_in_batches(self):
+        from .services import TeamService
+        from .importers import iter_member_rows
+
+        body = '\n'.join(
+            json.dumps({'username': f'nd{i}', 'name': f'Nd {i}', 'gmail': f'nd{i}@example.com', 'password': 'pw'})
+            for i in range(10)
+        ) + '\n{broken\n'
+        summary, error = TeamService.import_members(
+            self.admin, iter_member_rows(io.BytesIO(body.encode()), 'ndjson'), batch_size=3
+        )
+        self.assertIsNone(error)
+        self.assertEqual((summary['created'], summary['invalid']), (10, 1))
+
+        response = self.upload('again.jsonl', body.encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['duplicate'], 10)
+
+    def test_malformed_csv_rows_are_invalid(self):
+        body = (
+            b'username,name,gmail,password\n'
+            b'ok1,Ok,ok1@example.com,pw\n'
+            b'nul,N\x00ul,nul@example.com,pw\n'
+            b'huge,' + b'x' * (csv.field_size_limit() + 1) + b',huge@example.com,pw\n'
+            b'ok2,Ok,ok2@example.com,pw\n'
+        )
+        response = self.upload('people.csv', body)
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['invalid']), (2, 2))
+        self.assertEqual([e['line'] for e in summary['errors']], [3, 4])
+
+    def test_undecodable_file_keeps_committed_rows(self):
+        body = (
+            b'username,name,gmail,password\n'
+            b'ok1,Ok,ok1@example.com,pw\n'
+            b'ok2,Ok,ok2@example.com,pw\n'
+            b'bad,B\xffd,bad@example.com,pw\n'
+        )
+        response = self.upload('people.csv', body)
+        self.assertEqual(response.status_code, 400)
+        summary = response.json()
+        self.assertEqual(summary['created'], 2)
+        self.assertIn('line 4', summary['error'])
+        self.assertIn('committed', summary['error'])
+        self.assertTrue(Member.objects.filter(username='ok2').exists())
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fh:
+            fh.write('username,name,gmail,password\ncmd1,Cmd,cmd1@example.com,pw\n')
+        out = io.StringIO()
+        call_command('import_members', fh.name, '--admin', 'admin', stdout=out)
+        os.unlink(fh.name)
+        self.assertEqual(json.loads(out.getvalue())['created'], 1)
+        self.assertTrue(TeamMember.objects.filter(member__username='cmd1', team=self.team).exists())
+
+
+class AsyncReadViewTests(TaskflowTestCase):
+    """The async read views (ASGI path) answer exactly like the sync ones."""
+
+    async def call(self, view, member, path, method='get', data=None):
+        factory = AsyncRequestFactory()
+        request = getattr(factory, method)(path, data or {}, headers={'Accept': 'application/json'})
+        request.session = SessionStore()
+        if member is not None:
+            await request.session.aset('member_username', member.username)
+        return await MemberIdentityMiddleware(view)(request)
+
+    async def test_view_and_dashboard_match_sync(self):
+        sync_view = await sync_to_async(self.sync_get)(self.members[0], '/view/')
+        response = await self.call(async_views.view, self.members[0], '/view/')
+        self.assertEqual(response.content, sync_view)
+
+        sync_dashboard = await sync_to_async(self.sync_get)(self.admin, '/dashboard/?limit=5')
+        response = await self.call(async_views.dashboard, self.admin, '/dashboard/', data={'limit': '5'})
+        self.assertEqual(response.content, sync_dashboard)
+        self.assertIn('ETag', response)
+
+    async def test_streamed_dashboard(self):
+        response = await self.call(async_views.dashboard, self.admin, '/dashboard/', data={'stream': '1'})
+        body = ''.join([chunk.decode() if isinstance(chunk, bytes) else chunk
+                        async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(body)['team_tasks']), len(self.assignments))
+
+    async def test_login(self):
+        response = await self.call(async_views.login, None, '/login/', method='post',
+                                   data={'username': 'admin', 'password': 'secret'})
+        self.assertEqual(json.loads(response.content)['is_admin'], True)
+        response = await self.call(async_views.login, None, '/login/', method='post',
+                                   data={'username': 'admin', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+
+    def sync_get(self, member, path):
+        self.login_as(member)
+        return self.client.get(path, **JSON).content
+
+
+class PasswordHashingTests(TaskflowTestCase):
+    """Passwords are stored hashed, verified off-thread and upgraded on login."""
+
+    def login(self, username, password):
+        return self.client.post('/login/', {'username': username, 'password': password})
+
+    def test_register_and_edit_store_hashes(self):
+        response = self.client.post('/register/', {
+            'username': 'newbie', 'name': 'Newbie', 'gmail': 'n@example.com',
+            'password': 'pw-123', 'team_name': 'Fresh',
+        })
+        self.assertEqual(response.status_code, 201)
+        stored = Member.objects.get(username='newbie').password
+        self.assertTrue(stored.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual(self.login('newbie', 'pw-123').status_code, 200)
+        self.assertEqual(self.login('newbie', stored).status_code, 401)
+
+        self.login_as(self.admin)
+        self.client.post(f'/edit-member/{self.team_members[0].id}/', {
+            'member_name': 'User 0', 'member_username': 'user0',
+            'member_email': 'user0@example.com', 'member_password': 'changed',
+        })
+        self.assertTrue(is_hashed(Member.objects.get(username='user0').password))
+        self.assertEqual(self.login('user0', 'changed').status_code, 200)
+
+    def test_legacy_plaintext_and_work_factor_upgrade(self):
+        self.assertEqual(self.login('admin', 'wrong').status_code, 401)
+        self.assertEqual(Member.objects.get(pk=self.admin.pk).password, 'secret')
+
+        self.assertEqual(self.login('admin', 'secret').status_code, 200)
+        upgraded = Member.objects.get(pk=self.admin.pk).password
+        self.assertTrue(upgraded.startswith('pbkdf2_sha256$1000$'))
+
+        with self.settings(TASKFLOW_PASSWORD_ITERATIONS=1200):
+            self.assertEqual(self.login('admin', 'secret').status_code, 200)
+            self.assertTrue(Member.objects.get(pk=self.admin.pk).password.startswith('pbkdf2_sha256$1200$'))
+
+    def test_import_hashes_cheaply_and_upgrades_on_login(self):
+        from taskflow import settings as project_settings
+
+        full = project_settings.TASKFLOW_PASSWORD_ITERATIONS
+        cheap = project_settings.TASKFLOW_IMPORT_PASSWORD_ITERATIONS
+        self.assertLess(cheap, full)
+        rows = '\n'.join(f'imp{i},Imp,imp{i}@example.com,pw-{i}' for i in range(20))
+        self.login_as(self.admin)
+        with self.settings(TASKFLOW_PASSWORD_ITERATIONS=full, TASKFLOW_IMPORT_PASSWORD_ITERATIONS=cheap):
+            response = self.client.post('/import-members/', {
+                'file': SimpleUploadedFile('people.csv', f'username,name,gmail,password\n{rows}'.encode()),
+            })
+            self.assertEqual(response.json()['created'], 20)
+            stored = Member.objects.filter(username__startswith='imp').values_list('password', flat=True)
+            self.assertTrue(all(p.startswith(f'pbkdf2_sha256${cheap}$') for p in stored))
+
+            self.assertEqual(self.login('imp3', 'pw-3').status_code, 200)
+            self.assertTrue(Member.objects.get(username='imp3').password.startswith(f'pbkdf2_sha256${full}$'))
+
+    def test_unknown_user_still_runs_hasher(self):
+        self.assertEqual(check_password('x', None), (False, False))
+        self.assertEqual(self.login('ghost', 'secret').status_code, 401)
+
+    def test_data_migration_hashes_plaintext_rows(self):
+        from importlib import import_module
+        from django.apps import apps as global_apps
+
+        migration = import_module('core.migrations.0005_hash_member_passwords')
+        migration.hash_plaintext_passwords(global_apps, None)
+        for member in Member.objects.all():
+            # Pinned work factor, whatever TASKFLOW_PASSWORD_ITERATIONS says.
+            self.assertTrue(member.password.startswith('pbkdf2_sha256$10000$'))
+        self.assertEqual(self.login('user1', 'secret').status_code, 200)
+        self.assertTrue(Member.objects.get(username='user1').password.startswith('pbkdf2_sha256$1000$'))
+
+
+@override_settings(TASKFLOW_PASSWORD_ITERATIONS=1000)
+class SeedBenchmarkDataTests(TestCase):
+    """The benchmark seeder is deterministic and refuses to clobber data."""
+
+    def seed(self, *extra):
+        out = io.StringIO()
+        call_command('seed_benchmark_data', '--teams', '2', '--members-per-team', '3',
+                     '--tasks-per-member', '4', '--task-names', '10', *extra, stdout=out)
+        return json.loads(out.getvalue())
+
+    def snapshot(self):
+        return list(
+            TeamMemberTask.objects.order_by('id').values_list(
+                'task__name_task', 'team_member__member__username', 'start_date', 'end_date', 'is_finish'
+            )
+        )
+
+    def test_seed_is_deterministic(self):
+        counts = self.seed()
+        self.assertEqual((counts['teams'], counts['members'], counts['assignments']), (2, 6, 24))
+        self.assertEqual(TeamMember.objects.filter(is_admin=True).count(), 2)
+        first = self.snapshot()
+        TeamMemberTask.objects.first().delete()
+        self.assertTrue(TaskTombstone.objects.exists())
+
+        self.seed('--flush')
+        self.assertEqual(self.snapshot(), first)
+        self.assertFalse(TaskTombstone.objects.exists())
+        self.assertTrue(check_password('secret', Member.objects.get(username='user0_0').password))
+
+    def test_refuses_non_empty_database(self):
+        Member.objects.create(username='x', name='X', gmail='x@example.com', password='pw')
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+@override_settings(TASKFLOW_METRICS_TOKEN='s3cret')
+class MetricsTests(TaskflowTestCase):
+    """Per-route request, SQL and repository metrics at /metrics."""
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_records_route_queries_and_size(self):
+        self.login_as(self.members[0])
+        response = self.client.get('/view/', **JSON)
+        body = self.scrape()
+        self.assertIn('taskflow_http_request_duration_seconds_count{route="view/",method="GET",status="200"} 1', body)
+        # Session load, identity, sync horizon (cold cache) and task list.
+        self.assertIn('taskflow_http_db_queries_sum{route="view/",method="GET"} 4', body)
+        self.assertIn(f'taskflow_http_response_size_bytes_sum{{route="view/",method="GET"}} {len(response.content)}', body)
+        self.assertIn('taskflow_repository_duration_seconds_count'
+                      '{repository="TeamMemberTaskRepository",method="get_rows_for_member"} 1', body)
+
+        self.client.post(f'/edit-task/{self.assignments[0].id}/', {})
+        self.assertIn('route="edit-task/<int:task_id>/",method="POST"', self.scrape())
+
+    def test_streamed_size_recorded_after_body(self):
+        self.login_as(self.admin)
+        response = self.client.get('/dashboard/?stream=1', **JSON)
+        self.assertNotIn('taskflow_http_response_size_bytes_count{route="dashboard/"', self.scrape())
+        size = len(b''.join(response.streaming_content))
+        self.assertIn(f'taskflow_http_response_size_bytes_sum{{route="dashboard/",method="GET"}} {size}', self.scrape())
+
+    async def test_async_chain_counts_queries(self):
+        factory = AsyncRequestFactory()
+        request = factory.get('/view/', headers={'Accept': 'application/json'})
+        request.session = SessionStore()
+        await request.session.aset('member_username', self.members[0].username)
+        await MetricsMiddleware(MemberIdentityMiddleware(async_views.view))(request)
+        samples = metrics.snapshot()
+        series = samples[('taskflow_http_db_queries', ('<unmatched>', 'GET'))]
+        # Identity, sync horizon (cold cache) and task list.
+        self.assertEqual(series[-1], 3)
+
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.scrape()
+        with self.settings(TASKFLOW_METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    def test_merges_worker_snapshots(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(TASKFLOW_METRICS_DIR=directory):
+            other = [['taskflow_http_db_queries', ['view/', 'GET'], [0, 0, 0, 4] + [0] * 8 + [12]]]
+            with open(os.path.join(directory, '1.json'), 'w') as fh:
+                json.dump(other, fh)
+            self.login_as(self.members[0])
+            self.client.get('/view/', **JSON)
+            body = self.scrape()
+        self.assertIn('taskflow_http_db_queries_count{route="view/",method="GET"} 5', body)
+        self.assertIn('taskflow_http_db_queries_sum{route="view/",method="GET"} 16', body)
+
+
+class MetricsShardTests(TransactionTestCase):
+    """Per-thread metric shards do not pile up under the ASGI handler."""
+
+    def setUp(self):
+        metrics.reset()
+        cache.clear()
+        member = Member.objects.create(username='ann', name='Ann', gmail='ann@example.com', password='x')
+        TeamMember.objects.create(team=Team.objects.create(name='T'), member=member)
+        session = SessionStore()
+        session['member_username'] = 'ann'
+        session.save()
+        self.cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'.encode()
+
+    async def get(self, app, path):
+        body = [{'type': 'http.request', 'body': b''}]
+        sent = []
+
+        async def receive():
+            if body:
+                return body.pop()
+            await asyncio.Event().wait()  # no disconnect before the response
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'scheme': 'http',
+            'headers': [(b'cookie', self.cookie), (b'accept', b'application/json')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+        }
+        await app(scope, receive, send)
+        return sent[0]['status']
+
+    def test_shards_of_finished_threads_are_folded(self):
+        from django.core.handlers.asgi import ASGIHandler
+
+        app = ASGIHandler()
+
+        async def serve():
+            return [await self.get(app, '/view/') for _ in range(40)]
+
+        # Run like a server: outside async_to_sync, each request's sync view
+        # gets a new thread, which records the repository timings.
+        self.assertEqual(asyncio.run(serve()), [200] * 40)
+        self.assertLess(len(metrics._shards), 5)
+        series = metrics.snapshot()[
+            ('taskflow_repository_duration_seconds', ('TeamMemberTaskRepository', 'get_rows_for_member'))
+        ]
+        self.assertEqual(sum(series[:-1]), 40)
+
+
+class DeltaSyncTests(TaskflowTestCase):
+    """`?since=` returns only the task rows changed or removed since a sync token."""
+
+    def get(self, member, path):
+        self.login_as(member)
+        response = self.client.get(path, **JSON)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def edit(self, assignment, team_member, end_date='2025-02-01'):
+        self.login_as(self.admin)
+        response = self.client.post(f'/edit-task/{assignment.id}/', {
+            'task_name': 'Edited', 'team_member_id': team_member.id,
+            'start_date': '2025-01-01', 'end_date': end_date,
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_member_delta(self):
+        token = self.get(self.members[0], '/view/')['sync_token']
+        self.assertEqual(self.get(self.members[0], f'/view/?since={token}'),
+                         {'member_name': 'User 0', 'team_tasks': [], 'removed': [], 'sync_token': token})
+
+        edited, deleted = self.assignments[0], self.assignments[1]
+        self.edit(edited, self.team_members[0])
+        self.login_as(self.admin)
+        self.client.post(f'/delete-task/{deleted.id}/')
+
+        self.login_as(self.members[0])
+        data = self.assertMaxQueries(4, self.client.get, f'/view/?since={token}', **JSON).json()
+        self.assertEqual([t['id'] for t in data['team_tasks']], [edited.id])
+        self.assertEqual(data['team_tasks'][0]['task_name'], 'Edited')
+        self.assertEqual(data['removed'], [deleted.id])
+        self.assertGreater(data['sync_token'], token)
+        self.assertEqual(self.get(self.members[0], f"/view/?since={data['sync_token']}")['team_tasks'], [])
+
+    def test_reassignment(self):
+        moved = self.assignments[0]
+        token = self.get(self.admin, '/dashboard/')['sync_token']
+        self.edit(moved, self.team_members[1])
+
+        self.assertEqual(self.get(self.members[0], f'/view/?since={token}')['removed'], [moved.id])
+        self.assertEqual([t['id'] for t in self.get(self.members[1], f'/view/?since={token}')['team_tasks']], [moved.id])
+        dashboard = self.get(self.admin, f'/dashboard/?since={token}')
+        self.assertEqual([t['assigned_to'] for t in dashboard['team_tasks']], ['User 1'])
+        self.assertEqual(dashboard['removed'], [])
+
+    def test_removed_member_tombstones(self):
+        self.login_as(self.admin)
+        streamed = self.client.get('/dashboard/?stream=1', **JSON)
+        token = json.loads(b''.join(streamed.streaming_content))['sync_token']
+        self.assertEqual(token, max(a.version for a in self.assignments))
+        self.login_as(self.admin)
+        self.client.post(f'/delete-member/{self.team_members[0].id}/')
+        dashboard = self.get(self.admin, f'/dashboard/?since={token}')
+        self.assertEqual(dashboard['removed'], [a.id for a in self.assignments[:self.tasks_per_member]])
+        self.assertEqual(len(dashboard['team_members']), self.member_count)
+
+    def test_purged_tombstones_force_resync(self):
+        token = self.get(self.members[0], '/view/')['sync_token']
+        self.login_as(self.admin)
+        self.client.post(f'/delete-task/{self.assignments[1].id}/')
+        removal = TaskTombstone.objects.get()
+        TaskTombstone.objects.update(removed_at=timezone.now() - timedelta(days=31))
+
+        out = io.StringIO()
+        call_command('purge_tombstones', stdout=out)
+        self.assertEqual(out.getvalue().strip(), f'Purged 1 tombstones; sync horizon is {removal.version}.')
+        self.assertFalse(TaskTombstone.objects.exists())
+
+        self.login_as(self.members[0])
+        self.assertEqual(self.client.get(f'/view/?since={token}', **JSON).status_code, 410)
+        self.login_as(self.admin)
+        self.assertEqual(self.client.get(f'/dashboard/?since={token}', **JSON).status_code, 410)
+        # A full list's token is never below the horizon, so its deltas work.
+        full = self.get(self.members[0], '/view/')
+        self.assertGreaterEqual(full['sync_token'], removal.version)
+        self.assertEqual(self.get(self.members[0], f"/view/?since={full['sync_token']}")['team_tasks'], [])
+        dashboard = self.get(self.admin, '/dashboard/')
+        self.assertEqual(self.get(self.admin, f"/dashboard/?since={dashboard['sync_token']}")['removed'], [])
+
+    def test_invalid_token(self):
+        self.login_as(self.members[0])
+        self.assertEqual(self.client.get('/view/?since=abc', **JSON).status_code, 400)
+        self.login_as(self.admin)
+        self.assertEqual(self.client.get('/dashboard/?since=-1', **JSON).status_code, 400)
+
+
+class ChangeEventTests(TaskflowTestCase):
+    """Mutations publish events that the SSE stream and brokers deliver."""
+
+    async def open_stream(self, member):
+        factory = AsyncRequestFactory()
+        request = factory.get('/events/')
+        request.session = SessionStore()
+        await request.session.aset('member_username', member.username)
+        response = await MemberIdentityMiddleware(async_views.events)(request)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        return response, stream
+
+    async def test_stream_receives_committed_changes(self):
+        admin_response, admin_stream = await self.open_stream(self.admin)
+        member_response, member_stream = await self.open_stream(self.members[0])
+        task = self.assignments[0]
+
+        def edit():
+            self.login_as(self.admin)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(f'/mark-task-complete/{task.id}/')
+                self.login_as(self.members[0])
+                self.client.post(f'/mark-task-complete/{task.id}/')
+        await sync_to_async(edit)()
+
+        for response, stream in ((admin_response, admin_stream), (member_response, member_stream)):
+            frame = (await asyncio.wait_for(anext(stream), 1)).decode()
+            self.assertTrue(frame.startswith('event: change\ndata: '))
+            event = json.loads(frame.split('data: ', 1)[1])
+            self.assertEqual((event['kind'], event['action'], event['id']), ('task', 'saved', task.id))
+            response.close()
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_overflow_sends_resync(self):
+        subscription = get_broker().subscribe([member_channel(0)])
+        for i in range(QUEUE_SIZE + 5):
+            get_broker().publish(member_channel(0), {'i': i})
+        await asyncio.sleep(0)
+        # The backlog is replaced by one resync marker; later events follow it.
+        self.assertIs(await subscription.get(1), RESYNC)
+        self.assertEqual(json.loads(await subscription.get(1)), {'i': QUEUE_SIZE + 1})
+        subscription.close()
+
+    async def test_socket_broker_relays_between_workers(self):
+        started = threading.Event()
+        box = {}
+
+        def run_broker():
+            loop = asyncio.new_event_loop()
+            box['loop'] = loop
+
+            def ready(server):
+                box['port'] = server.sockets[0].getsockname()[1]
+                started.set()
+            box['task'] = loop.create_task(serve_broker('127.0.0.1', 0, ready))
+            try:
+                loop.run_until_complete(box['task'])
+            except asyncio.CancelledError:
+                pass
+            pending = asyncio.all_tasks(loop)
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+        thread = threading.Thread(target=run_broker, daemon=True)
+        thread.start()
+        self.assertTrue(started.wait(5))
+        url = f"tcp://127.0.0.1:{box['port']}"
+        worker_a, worker_b = create_broker(url), create_broker(url)
+        self.assertTrue(worker_a.wait_connected(5) and worker_b.wait_connected(5))
+
+        subscription = worker_b.subscribe([team_channel(self.team.id)])
+        worker_a.publish(team_channel(self.team.id), {'kind': 'member', 'action': 'saved'})
+        self.assertEqual(json.loads(await subscription.get(5)), {'kind': 'member', 'action': 'saved'})
+        subscription.close()
+        worker_a.close()
+        worker_b.close()
+        box['loop'].call_soon_threadsafe(box['task'].cancel)
+        thread.join(5)
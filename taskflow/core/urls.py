@@ -1,24 +1,43 @@
 # from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include # path: is a way to link the view.function to the user include: a groupe of urls in one place
 from . import views 
+# Under ASGI the hot read endpoints run as native async views
+read_views = views
+if settings.TASKFLOW_ASYNC_VIEWS:
+    from . import async_views as read_views
 # from .api import router as api_router 
 
 urlpatterns = [
     path('', views.spa_index, name='spa_index'),
-    path('csrf-token/', views.get_csrf_token, name='csrf_token'),
-    path('login/', views.login, name='login'),
-    path('view/', views.view, name='view'),
+    path('csrf-token/', read_views.get_csrf_token, name='csrf_token'),
+    path('login/', read_views.login, name='login'),
+    path('view/', read_views.view, name='view'),
     path('register/', views.register, name='register'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', read_views.dashboard, name='dashboard'),
+    path('stats/', views.stats, name='stats'),
+    path('search/', views.search, name='search'),
     path('add-member/', views.add_member, name='add_member'),
+    path('import-members/', views.import_members, name='import_members'),
     path('add-task/', views.add_task, name='add_task'),
+    path('add-tasks/', views.add_tasks, name='add_tasks'),
     path('mark-task-complete/<int:task_id>/', views.mark_task_complete, name='mark_task_complete'),
+    path('complete-tasks/', views.bulk_tasks, {'action': 'complete'}, name='complete_tasks'),
+    path('reopen-tasks/', views.bulk_tasks, {'action': 'reopen'}, name='reopen_tasks'),
+    path('reassign-tasks/', views.bulk_tasks, {'action': 'reassign'}, name='reassign_tasks'),
+    path('shift-tasks/', views.bulk_tasks, {'action': 'shift'}, name='shift_tasks'),
+    path('delete-tasks/', views.bulk_tasks, {'action': 'delete'}, name='delete_tasks'),
     path('edit-task/<int:task_id>/', views.edit_task, name='edit_task'),  # type: ignore[arg-type]
     path('delete-task/<int:task_id>/', views.delete_task, name='delete_task'),
     path('edit-member/<int:member_id>/', views.edit_member, name='edit_member'), # type: ignore[arg-type]
     path('delete-member/<int:member_id>/', views.delete_member, name='delete_member'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
  
     # DRF API routes
     # path('api/', include(api_router.urls)),
 
 ]
+
+# Server-Sent Events hold a connection open; only served under ASGI.
+if settings.TASKFLOW_ASYNC_VIEWS:
+    urlpatterns.append(path('events/', read_views.events, name='events'))
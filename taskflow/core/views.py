@@ -6,26 +6,43 @@ application (SPA) and the JSON API used by the React frontend.
 Design goals:
 - Use the authenticated member's unique `username` stored in session
     to resolve database records (avoids ambiguity when display `name`
-    values collide).
+    values collide). `core.middleware.MemberIdentityMiddleware` resolves it
+    once per request into `request.member` and `request.admin_tm`.
 - Provide clear JSON error responses for the SPA to surface to users.
 
 Each view that returns JSON will return a helpful `error` field on
 failure and use appropriate HTTP status codes.
 """
 
-from django.http import JsonResponse
+import json
+
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.views.decorators.http import require_GET
 from django.views.decorators.csrf import ensure_csrf_cookie
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import parse_etags
+from . import metrics, spa
+from .caching import dashboard_cache_key, dashboard_etag, get_dashboard, set_dashboard, team_generation
+from .importers import detect_format, iter_member_rows
+from .pagination import DEFAULT_PAGE_SIZE, encode_cursor, parse_limit, parse_since
+from .routers import reading_from_replica
 from .services import AuthService, TeamService, TaskService, ViewService
-from .repositories import MemberRepository, TeamMemberRepository, TeamMemberTaskRepository
 from django.conf import settings
-from django.http import FileResponse, Http404, HttpResponse
-import os
+from django.http import Http404, HttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 
+# Rows fetched per database round trip (and written per chunk) when the
+# dashboard is streamed with `?stream=1`.
+STREAM_CHUNK_SIZE = 500
+
+# 410 body for a `since` token older than the purged tombstones.
+SYNC_TOKEN_EXPIRED = 'Sync token expired; fetch the full list again.'
+
+
 def _is_api_request(request):
     """Detect whether the incoming request is an API/ajax call.
 
@@ -123,38 +140,114 @@ def view(request):
     session during login/registration. If the session does not contain that
     value the view returns the SPA index so the React app's router can redirect
     to login.
+
+    Archived tasks are left out; `?include_archived=1` pages through them
+    instead (see `archive_page`).
     """
     if request.method == 'GET' and not _is_api_request(request):
         return spa_index(request)
 
-    member_username = request.session.get("member_username")
-    if not member_username:
+    if not request.session.get('member_username'):
         return spa_index(request)
 
-    member = MemberRepository.get_by_username(member_username)
+    member = request.member
     if not member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
-    # Get all tasks assigned to this member
-    team_tasks = ViewService.get_member_tasks(member)
-
-    tasks_data = []
-    for task in team_tasks:
-        tasks_data.append({
-            'id': task.id,  # type: ignore[arg-type]
-            'task_name': task.task.name_task,
-            'team_name': task.team_member.team.name,
-            'start_date': str(task.start_date),
-            'end_date': str(task.end_date),
-            'is_finish': task.is_finish,
-        })
+    if request.GET.get('include_archived') == '1':
+        return archive_page(request, member)
+
+    try:
+        since = parse_since(request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid since token.'}, status=400)
+    horizon = ViewService.get_sync_horizon()
+    if since is not None and since < horizon:
+        return JsonResponse({'error': SYNC_TOKEN_EXPIRED}, status=410)
+
+    # Get all tasks assigned to this member (or those changed since `since`)
+    rows = list(ViewService.get_member_tasks(member, since=since))
+    removals = list(ViewService.get_member_removals(member, since)) if since is not None else ()
+
+    tasks_data = [_serialize_member_task(task) for task in rows]
 
     return JsonResponse({
         'member_name': member.name,
         'team_tasks': tasks_data,
+        **_sync_fields(rows, removals, since, horizon),
     })
 
 
+def archive_page(request, member, team=False):
+    """Return one page of the member's (or, with `team`, the admin's team's) archived tasks.
+
+    The `?include_archived=1` mode of `view` and `dashboard`: the same
+    payload, with archived tasks as `team_tasks`, `limit` per page
+    (default `DEFAULT_PAGE_SIZE`) ordered by (end_date, id). `next_cursor`
+    fetches the next page (null on the last). Archived tasks never change,
+    so there is no `sync_token`; pages are not cached.
+    """
+    try:
+        limit = parse_limit(request.GET.get('limit')) or DEFAULT_PAGE_SIZE
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+    cursor = request.GET.get('cursor') or None
+
+    payload = {'member_name': member.name}
+    if team:
+        _, team_members, rows, error = ViewService.get_team_archive(
+            member, cursor=cursor, limit=limit, admin_tm=request.admin_tm
+        )
+        if error:
+            return JsonResponse({'error': error}, status=400 if 'cursor' in error else 403)
+        payload['team_members'] = [_serialize_team_member(tm) for tm in team_members]
+        serialize = _serialize_dashboard_task
+    else:
+        rows, error = ViewService.get_member_archive(member, cursor=cursor, limit=limit)
+        if error:
+            return JsonResponse({'error': error}, status=400)
+        serialize = _serialize_member_task
+
+    rows = list(rows)
+    last = rows[-1] if len(rows) == limit else None
+    payload['team_tasks'] = [serialize(row) for row in rows]
+    payload['next_cursor'] = encode_cursor(last['end_date'], last['id']) if last else None
+    return JsonResponse(payload)
+
+
+def _sync_fields(rows, removals, since, horizon=0):
+    """Build the delta-sync fields of a task list response.
+
+    `sync_token` is the highest version among the rows (and removals) sent;
+    versions are handed out in commit order, so every later change has a
+    higher one. A full list's token is at least the sync `horizon` (read
+    before the rows, so they include every change up to it): older tokens
+    get a 410 telling the client to fetch the full list again. A delta
+    response (`since` given) also lists the `removed` assignment ids, minus
+    rows that are back in `rows` (e.g. reassigned).
+    """
+    token = max((row['version'] for row in rows), default=horizon)
+    token = max(token, horizon)
+    if since is None:
+        return {'sync_token': token}
+    changed = {row['id'] for row in rows}
+    removed = sorted({assignment_id for assignment_id, _ in removals} - changed)
+    token = max([since, token, *(version for _, version in removals)])
+    return {'removed': removed, 'sync_token': token}
+
+
+def _serialize_member_task(task):
+    """Shape one member task row (a dict from `ViewService`) for JSON."""
+    return {
+        'id': task['id'],
+        'task_name': task['task_name'],
+        'team_name': task['team_name'],
+        'start_date': str(task['start_date']),
+        'end_date': str(task['end_date']),
+        'is_finish': task['is_finish'],
+    }
+
+
 def dashboard(request):
     """Return dashboard data (team members and team tasks) for admins.
 
@@ -162,48 +255,149 @@ def dashboard(request):
     dashboard data. The view returns a JSON payload containing serialized
     `team_members` and `team_tasks` for the admin's team. Non-API requests
     return the SPA index to allow browser navigation.
+
+    Responses are cached per team generation (see `core.caching`) and carry
+    a strong ETag; a matching `If-None-Match` gets a 304.
+
+    Every response has a `sync_token`; `?since=<token>` returns only the
+    tasks changed since then plus the ids `removed` from the team (see
+    `_sync_fields`), or a 410 once the token is older than the tombstone
+    retention. When paging, keep the token of the first page.
+
+    Archived tasks are left out; `?include_archived=1` pages through them
+    instead (see `archive_page`).
     """
     if request.method == 'GET' and not _is_api_request(request):
         return spa_index(request)
 
-    member_username = request.session.get("member_username")
-    if not member_username:
+    if not request.session.get('member_username'):
         return spa_index(request)
 
-    member = MemberRepository.get_by_username(member_username)
+    member = request.member
     if not member:
         return JsonResponse({'error': 'Member not found.'}, status=404)
 
-    team, team_members, team_tasks, error = ViewService.get_team_dashboard(member)
+    if request.GET.get('include_archived') == '1':
+        return archive_page(request, member, team=True)
+
+    try:
+        limit = parse_limit(request.GET.get('limit'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+    try:
+        since = parse_since(request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid since token.'}, status=400)
+    horizon = ViewService.get_sync_horizon()
+    if since is not None and since < horizon:
+        return JsonResponse({'error': SYNC_TOKEN_EXPIRED}, status=410)
+    cursor = request.GET.get('cursor') or None
+    # Deltas are small; they are neither streamed nor cached.
+    stream = request.GET.get('stream') == '1' and since is None
+
+    # Serve from the per-team cache, or answer 304, without querying the
+    # team's members and tasks.
+    cache_key = etag = None
+    admin_tm = request.admin_tm
+    if admin_tm and not stream and since is None:
+        generation = team_generation(admin_tm.team_id)
+        cache_key = dashboard_cache_key(admin_tm.team_id, generation, member.id, cursor, limit)
+        etag = dashboard_etag(cache_key)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return _with_etag(HttpResponseNotModified(), etag)
+        body = get_dashboard(cache_key)
+        if body is not None:
+            return _with_etag(HttpResponse(body, content_type='application/json'), etag)
+
+    team, team_members, team_tasks, error = ViewService.get_team_dashboard(
+        member, cursor=cursor, limit=limit, admin_tm=request.admin_tm, since=since
+    )
     if error or not team or team_members is None or team_tasks is None:
-        return JsonResponse({'error': error or 'Dashboard data not found.'}, status=403)
-
-    members_data = []
-    for tm in team_members:
-        members_data.append({
-            'id': tm.id,  # type: ignore[arg-type]
-            'name': tm.member.name,
-            'username': tm.member.username,
-            'gmail': tm.member.gmail,
-            'is_admin': tm.is_admin,
-        })
+        return JsonResponse({'error': error or 'Dashboard data not found.'}, status=400 if error and 'cursor' in error else 403)
 
-    tasks_data = []
-    for task in team_tasks:
-        tasks_data.append({
-            'id': task.id,  # type: ignore[arg-type]
-            'task_name': task.task.name_task,
-            'assigned_to': task.team_member.member.name,
-            'start_date': str(task.start_date),
-            'end_date': str(task.end_date),
-            'is_finish': task.is_finish,
-        })
+    members_data = [_serialize_team_member(tm) for tm in team_members]
 
-    return JsonResponse({
+    if stream:
+        return StreamingHttpResponse(
+            _stream_dashboard(member.name, members_data, team_tasks, horizon),
+            content_type='application/json',
+        )
+
+    rows = list(team_tasks)
+    tasks_data = [_serialize_dashboard_task(task) for task in rows]
+    removals = list(ViewService.get_team_removals(team, since)) if since is not None else ()
+
+    payload = {
         'member_name': member.name,
         'team_members': members_data,
         'team_tasks': tasks_data,
-    })
+        **_sync_fields(rows, removals, since, horizon),
+    }
+    if limit:
+        # A full page means there may be more rows after the last one.
+        last = rows[-1] if len(rows) == limit else None
+        payload['next_cursor'] = encode_cursor(last['end_date'], last['id']) if last else None
+    response = JsonResponse(payload)
+    # Replica reads may lag; caching them would outlive the lag (see core.routers).
+    if cache_key and not reading_from_replica():
+        set_dashboard(cache_key, response.content)
+        _with_etag(response, etag)
+    return response
+
+
+def _with_etag(response, etag):
+    """Tag a cacheable per-user response and make clients revalidate it."""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _serialize_team_member(tm):
+    """Shape one team member row (a dict from `ViewService`) for JSON."""
+    return {
+        'id': tm['id'],
+        'name': tm['name'],
+        'username': tm['username'],
+        'gmail': tm['gmail'],
+        'is_admin': tm['is_admin'],
+    }
+
+
+def _serialize_dashboard_task(task):
+    """Shape one dashboard task row (a dict from `ViewService`) for JSON."""
+    return {
+        'id': task['id'],
+        'task_name': task['task_name'],
+        'assigned_to': task['assigned_to'],
+        'start_date': str(task['start_date']),
+        'end_date': str(task['end_date']),
+        'is_finish': task['is_finish'],
+    }
+
+
+def _stream_dashboard(member_name, members_data, team_tasks, horizon=0):
+    """Yield the dashboard JSON document piece by piece.
+
+    Task rows are pulled from the database with `.iterator()` and written
+    out in chunks of `STREAM_CHUNK_SIZE`, so neither the queryset cache nor
+    the full response body is ever held in memory.
+    """
+    yield '{"member_name": %s, "team_members": %s, "team_tasks": [' % (
+        json.dumps(member_name), json.dumps(members_data),
+    )
+    separator = ''
+    chunk = []
+    token = horizon
+    for task in team_tasks.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        chunk.append(json.dumps(_serialize_dashboard_task(task)))
+        token = max(token, task['version'])
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield '], "sync_token": %d}' % token
 
 
 def add_member(request):
@@ -218,11 +412,10 @@ def add_member(request):
     if request.method != 'POST':
         return spa_index(request)
 
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    admin_member = MemberRepository.get_by_username(member_username)
+    admin_member = request.member
     if not admin_member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
@@ -231,11 +424,54 @@ def add_member(request):
     gmail = request.POST.get('gmail', '').strip()
     password = request.POST.get('password', '').strip()
 
-    team_member, error = TeamService.add_member_to_team(admin_member, username, name, gmail, password)
+    team_member, error = TeamService.add_member_to_team(admin_member, username, name, gmail, password, admin_tm=request.admin_tm)
     if error:
         return JsonResponse({'error': error}, status=400 if 'required' in error else 409)
 
     return JsonResponse({'message': f'Member "{name}" added to team.'}, status=201)
+def import_members(request):
+    """Admin-only: bulk-add members to the admin's team from an uploaded file.
+
+    Expects a multipart POST with a `file` field holding CSV (header
+    `username,name,gmail,password`) or NDJSON (one object per line). The
+    format comes from the optional `format` field or the file extension.
+    The file is parsed as a stream and inserted in batches; the response
+    summarizes created, duplicate and invalid rows. A file that cannot be
+    read to the end gets a 400 whose `error` says where it stopped; the
+    counts show what was imported (and committed) before that.
+
+    Plain-text passwords are hashed at the import work factor, a few
+    milliseconds per row on the password pool; for files of more than a
+    few thousand members use `manage.py import_members` or pre-hashed
+    passwords rather than holding a request open.
+    """
+    if request.method != 'POST':
+        return spa_index(request)
+
+    if not request.session.get('member_username'):
+        return JsonResponse({'error': 'Please log in first.'}, status=401)
+
+    admin_member = request.member
+    if not admin_member:
+        return JsonResponse({'error': 'User not found.'}, status=404)
+
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': 'A file is required.'}, status=400)
+    fmt = detect_format(upload.name, request.POST.get('format'))
+    try:
+        rows = iter_member_rows(upload, fmt)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    summary, error = TeamService.import_members(admin_member, rows, admin_tm=request.admin_tm)
+    if error:
+        return JsonResponse({'error': error}, status=403)
+    if 'error' in summary:
+        return JsonResponse(summary, status=400)
+    return JsonResponse(summary, status=201 if summary['created'] else 200)
+
+
 def delete_member(request, member_id):
     """Admin-only: remove a TeamMember from the admin's team.
 
@@ -243,22 +479,27 @@ def delete_member(request, member_id):
     `member_name` from the session. The project prefers `member_username` as
     the canonical identity; consider migrating this view to use
     `member_username` (consistency) if you update session handling.
+
+    With `background=1` the removal is queued for `manage.py
+    process_member_removals` and the view answers 202.
     """
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
     
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    admin_member = MemberRepository.get_by_username(member_username)
+    admin_member = request.member
     if not admin_member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
-    error = TeamService.remove_member(admin_member, member_id)
+    background = request.POST.get('background') == '1'
+    error = TeamService.remove_member(admin_member, member_id, admin_tm=request.admin_tm, background=background)
     if error:
         return JsonResponse({'error': error}, status=404 if 'not found' in error.lower() else 403)
+    if background:
+        return JsonResponse({'message': 'Member removal queued.'}, status=202)
     return JsonResponse({'message': 'Member deleted.'})
 
 def edit_member(request, member_id):
@@ -272,18 +513,17 @@ def edit_member(request, member_id):
     `member_username` to avoid ambiguity when display names collide.
     """
     
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    admin_member = MemberRepository.get_by_username(member_username)
+    admin_member = request.member
     if not admin_member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
     if request.method == 'GET':
-        tm = TeamMemberRepository.get_by_id(member_id)
-        if not tm:
-            return JsonResponse({'error': 'Team member not found.'}, status=404)
+        tm, error = TeamService.get_member(admin_member, member_id, admin_tm=request.admin_tm)
+        if error:
+            return JsonResponse({'error': error}, status=404 if 'not found' in error.lower() else 403)
 
         return JsonResponse({
             'team_member': {
@@ -304,12 +544,90 @@ def edit_member(request, member_id):
         new_email = request.POST.get('member_email', '').strip()
         new_password = request.POST.get('member_password', '').strip()
 
-        error = TeamService.edit_member(admin_member, member_id, new_name, new_username, new_email, new_password)
+        error = TeamService.edit_member(
+            admin_member, member_id, new_name, new_username, new_email, new_password, admin_tm=request.admin_tm
+        )
         if error:
+            if 'not found' in error.lower():
+                return JsonResponse({'error': error}, status=404)
             return JsonResponse({'error': error}, status=400 if 'required' in error else 409)
         return JsonResponse({'message': 'Member updated.'})
 
 
+def stats(request):
+    """Return assignment statistics for the admin's team.
+
+    The payload has team totals (`total`, `open`, `done`, `overdue` and
+    `completion_rate`, done/total or 0 for a team without tasks) and the
+    same counts per team member in `members`. An open task is overdue once
+    its `end_date` has passed. Counts are computed by the database (see
+    `ViewService.get_team_stats`).
+    """
+    if request.method == 'GET' and not _is_api_request(request):
+        return spa_index(request)
+
+    if not request.session.get('member_username'):
+        return JsonResponse({'error': 'Please log in first.'}, status=401)
+
+    member = request.member
+    if not member:
+        return JsonResponse({'error': 'Member not found.'}, status=404)
+
+    team, rows, error = ViewService.get_team_stats(member, admin_tm=request.admin_tm)
+    if error:
+        return JsonResponse({'error': error}, status=403)
+
+    members = [
+        {'id': row['id'], 'name': row['name'], 'open': row['open'], 'done': row['done'], 'overdue': row['overdue']}
+        for row in rows
+    ]
+    done = sum(m['done'] for m in members)
+    total = done + sum(m['open'] for m in members)
+    return JsonResponse({
+        'team': {'id': team.id, 'name': team.name},
+        'total': total,
+        'open': total - done,
+        'done': done,
+        'overdue': sum(m['overdue'] for m in members),
+        'completion_rate': round(done / total, 4) if total else 0,
+        'members': members,
+    })
+
+
+def search(request):
+    """Search the admin's team for members and tasks.
+
+    GET parameters: `q` (at least two letters or digits), optional `limit`
+    and `cursor`. Members match on name or username and tasks on name, by
+    prefix or substring; `results` are ranked value prefix first, then word
+    prefix, then substring (`match`). A task hit lists the team's
+    assignments of it. `next_cursor` fetches the next page (null on the
+    last). The lookup is a range scan of a token index (see `core.search`).
+    """
+    if request.method == 'GET' and not _is_api_request(request):
+        return spa_index(request)
+
+    if not request.session.get('member_username'):
+        return JsonResponse({'error': 'Please log in first.'}, status=401)
+
+    member = request.member
+    if not member:
+        return JsonResponse({'error': 'Member not found.'}, status=404)
+
+    try:
+        limit = parse_limit(request.GET.get('limit'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+
+    hits, next_cursor, error = ViewService.search_team(
+        member, request.GET.get('q', ''), cursor=request.GET.get('cursor'), limit=limit, admin_tm=request.admin_tm,
+    )
+    if error:
+        status = 403 if 'admin access' in error else 400
+        return JsonResponse({'error': error}, status=status)
+    return JsonResponse({'results': hits, 'next_cursor': next_cursor})
+
+
 def add_task(request):
     """Create and assign a task to a team member.
 
@@ -320,11 +638,10 @@ def add_task(request):
     if request.method != 'POST':
         return spa_index(request)
 
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    admin_member = MemberRepository.get_by_username(member_username)
+    admin_member = request.member
     if not admin_member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
@@ -333,13 +650,95 @@ def add_task(request):
     start_date = request.POST.get('start_date', '').strip()
     end_date = request.POST.get('end_date', '').strip()
 
-    team_member_task, error = TaskService.add_task(admin_member, task_name, team_member_id, start_date, end_date)
+    team_member_task, error = TaskService.add_task(
+        admin_member, task_name, team_member_id, start_date, end_date, admin_tm=request.admin_tm
+    )
     if error:
         return JsonResponse({'error': error}, status=400 if 'required' in error else 403)
 
     return JsonResponse({'message': f'Task "{task_name}" assigned.'}, status=201)
 
 
+def add_tasks(request):
+    """Create and assign many tasks in one request.
+
+    Expects a JSON body `{"tasks": [{"task_name", "team_member_id",
+    "start_date", "end_date"}, ...]}`. Valid items are inserted together;
+    invalid ones are reported by index in `errors`. Returns 201 when at
+    least one task was created.
+    """
+    if request.method != 'POST':
+        return spa_index(request)
+
+    if not request.session.get('member_username'):
+        return JsonResponse({'error': 'Please log in first.'}, status=401)
+
+    admin_member = request.member
+    if not admin_member:
+        return JsonResponse({'error': 'User not found.'}, status=404)
+
+    try:
+        assignments = json.loads(request.body).get('tasks')
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+
+    created, item_errors, error = TaskService.add_tasks_bulk(
+        admin_member, assignments, admin_tm=request.admin_tm
+    )
+    if error:
+        return JsonResponse({'error': error}, status=403 if 'admin' in error else 400)
+
+    return JsonResponse({
+        'message': f'{len(created)} task(s) assigned.',
+        'created': [tmt.id for tmt in created],
+        'errors': item_errors,
+    }, status=201 if created else 400)
+
+
+def bulk_tasks(request, action):
+    """Apply one change to many TeamMemberTasks at once.
+
+    Routed as `complete-tasks/`, `reopen-tasks/`, `reassign-tasks/`,
+    `shift-tasks/` and `delete-tasks/`. Expects a JSON body `{"ids": [...]}`
+    plus `team_member_id` to reassign or `days` (negative for earlier) to
+    shift. Completing and reopening apply to the member's own tasks and,
+    for admins, to any task of their team; the other actions are
+    admin-only. Ids outside that scope, or already in the requested
+    state, are skipped; `updated` counts the tasks changed.
+    """
+    if request.method != 'POST':
+        return spa_index(request)
+
+    if not request.session.get('member_username'):
+        return JsonResponse({'error': 'Please log in first.'}, status=401)
+
+    member = request.member
+    if not member:
+        return JsonResponse({'error': 'User not found.'}, status=404)
+
+    try:
+        body = json.loads(request.body)
+        ids = body.get('ids')
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+
+    admin_tm = request.admin_tm
+    if action == 'complete':
+        count, error = TaskService.complete_tasks(member, ids, admin_tm=admin_tm)
+    elif action == 'reopen':
+        count, error = TaskService.reopen_tasks(member, ids, admin_tm=admin_tm)
+    elif action == 'reassign':
+        count, error = TaskService.reassign_tasks(member, ids, body.get('team_member_id'), admin_tm=admin_tm)
+    elif action == 'shift':
+        count, error = TaskService.shift_tasks(member, ids, body.get('days'), admin_tm=admin_tm)
+    else:
+        count, error = TaskService.delete_tasks(member, ids, admin_tm=admin_tm)
+    if error:
+        return JsonResponse({'error': error}, status=403 if 'admin' in error else 400)
+
+    return JsonResponse({'message': f'{count} task(s) updated.', 'updated': count})
+
+
 def mark_task_complete(request, task_id):
     """Mark a specific TeamMemberTask as complete.
 
@@ -350,11 +749,10 @@ def mark_task_complete(request, task_id):
     if request.method != 'POST':
         return spa_index(request)
 
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    member = MemberRepository.get_by_username(member_username)
+    member = request.member
     if not member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
@@ -373,11 +771,10 @@ def edit_task(request, task_id):
     `end_date`). The service enforces that only an admin for the task's team may
     perform the update.
     """
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    admin_member = MemberRepository.get_by_username(member_username)
+    admin_member = request.member
     if not admin_member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
@@ -387,8 +784,12 @@ def edit_task(request, task_id):
         start_date = request.POST.get('start_date', '').strip()
         end_date = request.POST.get('end_date', '').strip()
 
-        error = TaskService.edit_task(admin_member, task_id, task_name, team_member_id, start_date, end_date)
+        error = TaskService.edit_task(
+            admin_member, task_id, task_name, team_member_id, start_date, end_date, admin_tm=request.admin_tm
+        )
         if error:
+            if 'not found' in error.lower():
+                return JsonResponse({'error': error}, status=404)
             return JsonResponse({'error': error}, status=400 if 'required' in error else 403)
         return JsonResponse({'message': 'Task updated.'})
 
@@ -404,29 +805,59 @@ def delete_task(request, task_id):
     if request.method != 'POST':
         return spa_index(request)
 
-    member_username = request.session.get('member_username')
-    if not member_username:
+    if not request.session.get('member_username'):
         return JsonResponse({'error': 'Please log in first.'}, status=401)
 
-    admin_member = MemberRepository.get_by_username(member_username)
+    admin_member = request.member
     if not admin_member:
         return JsonResponse({'error': 'User not found.'}, status=404)
 
-    error = TaskService.delete_task(admin_member, task_id)
+    error = TaskService.delete_task(admin_member, task_id, admin_tm=request.admin_tm)
     if error:
         return JsonResponse({'error': error}, status=404 if 'not found' in error.lower() else 403)
     return JsonResponse({'message': 'Task deleted.'})
 
 
 
-def spa_index(request):
-    """Serve the built SPA index.html from static files.
+@require_GET
+def prometheus_metrics(request):
+    """Expose request, SQL and repository metrics for Prometheus to scrape.
+
+    The scraper must send `TASKFLOW_METRICS_TOKEN` as `Authorization:
+    Bearer <token>`; without a configured token the endpoint does not
+    exist, so no deployment exposes its traffic by accident. See
+    `core.metrics`.
+    """
+    token = settings.TASKFLOW_METRICS_TOKEN
+    if not metrics.enabled() or not token:
+        raise Http404
+    if not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 
-    This view returns the `static/frontend/index.html` file so visiting `/`
-    serves the React app. In production WhiteNoise or the webserver should
-    serve static files directly; this view is a safe fallback.
+def spa_index(request):
+    """Serve the built SPA index.html from memory.
+
+    Visiting `/` (or any SPA route) serves the React app. The file is kept
+    in memory, precompressed, and re-read only when it changes (see
+    `core.spa`). Responses are gzip- or brotli-encoded as the client
+    accepts, carry a strong ETag and must be revalidated, so a new frontend
+    build is picked up on the next navigation; a matching `If-None-Match`
+    gets a 304.
     """
-    index_path = os.path.join(settings.BASE_DIR, 'static', 'frontend', 'index.html')
-    if os.path.exists(index_path):
-        return FileResponse(open(index_path, 'rb'), content_type='text/html')
-    raise Http404('SPA index not found')
+    index = spa.get_index()
+    if index is None:
+        raise Http404('SPA index not found')
+
+    encoding = index.negotiate(request.META.get('HTTP_ACCEPT_ENCODING'))
+    if index.etags() & set(parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(index.bodies[encoding], content_type='text/html; charset=utf-8')
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+    response['ETag'] = index.etag(encoding)
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskflow.settings')
+# Serve the read endpoints with the async views in core/async_views.py
+os.environ.setdefault('TASKFLOW_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
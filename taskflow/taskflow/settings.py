@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -53,6 +55,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.MemberIdentityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,6 +91,48 @@ DATABASES = {
     )
 }
 
+# SQLite profile for concurrent use (on by default): WAL lets reads run
+# alongside a writer, writers wait up to TASKFLOW_SQLITE_BUSY_TIMEOUT ms
+# for the lock instead of failing with "database is locked", and every
+# transaction starts with BEGIN IMMEDIATE so it takes the write lock up
+# front rather than failing when it upgrades from reading to writing.
+# benchmarks/bench_sqlite_writers.py compares it with the plain defaults.
+TASKFLOW_SQLITE_TUNED = os.environ.get('TASKFLOW_SQLITE_TUNED', 'True') == 'True'
+TASKFLOW_SQLITE_BUSY_TIMEOUT = int(os.environ.get('TASKFLOW_SQLITE_BUSY_TIMEOUT', '5000'))
+TASKFLOW_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # Durable at every WAL checkpoint; a power cut can lose the last commits, never corrupt.
+    'synchronous': 'NORMAL',
+    'busy_timeout': TASKFLOW_SQLITE_BUSY_TIMEOUT,
+    'mmap_size': int(os.environ.get('TASKFLOW_SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    # Negative: KiB of page cache per connection.
+    'cache_size': -int(os.environ.get('TASKFLOW_SQLITE_CACHE_KB', '32768')),
+    'temp_store': 'MEMORY',
+}
+if TASKFLOW_SQLITE_TUNED and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in TASKFLOW_SQLITE_PRAGMAS.items()),
+        'transaction_mode': 'IMMEDIATE',
+        # Seconds; sqlite3's own busy handler, kept in line with the pragma.
+        'timeout': TASKFLOW_SQLITE_BUSY_TIMEOUT / 1000,
+    })
+
+# Optional read replica: GET requests read from it, everything else uses
+# the primary (see core/routers.py). To try it locally with two SQLite
+# files, run `manage.py copy_replica --interval 2` next to the server.
+if os.environ.get('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ['REPLICA_DATABASE_URL'], conn_max_age=600, conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+TASKFLOW_REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+
+# Seconds a browser keeps reading from the primary after a write, so it
+# sees its own changes. Keep it above the replica's usual lag.
+TASKFLOW_REPLICA_PIN_SECONDS = int(os.environ.get('TASKFLOW_REPLICA_PIN_SECONDS', '5'))
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
 # AUTH_USER_MODEL = "core.Member"
 
 # Password validation
@@ -109,6 +154,30 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Member passwords are hashed with core.hashers.PBKDF2PasswordHasher. Raising
+# TASKFLOW_PASSWORD_ITERATIONS rehashes each member on their next login.
+PASSWORD_HASHERS = [
+    'core.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+TASKFLOW_PASSWORD_ITERATIONS = int(os.environ.get('TASKFLOW_PASSWORD_ITERATIONS', '1000000'))
+
+# Work factor for plain-text passwords in bulk member imports: about 3 ms
+# per row instead of 0.3 s, so a 10,000-row import hashes in about 30
+# CPU-seconds rather than an hour. Each imported hash is upgraded to
+# TASKFLOW_PASSWORD_ITERATIONS on the member's first login; files with
+# pre-hashed passwords skip hashing entirely.
+TASKFLOW_IMPORT_PASSWORD_ITERATIONS = int(os.environ.get('TASKFLOW_IMPORT_PASSWORD_ITERATIONS', '10000'))
+
+# Threads that may hash/verify passwords at once (see core/passwords.py).
+# Defaults to the number of CPUs.
+TASKFLOW_PASSWORD_WORKERS = int(os.environ.get('TASKFLOW_PASSWORD_WORKERS', '0')) or None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -157,9 +226,115 @@ SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SECURE = not DEBUG  # True in production (HTTPS)
 
+# Where sessions are stored (TASKFLOW_SESSION_ENGINE):
+# - db (default): one SELECT per request, plus an UPDATE when it changes.
+# - cached_db: reads from the cache, writes through to the database. Use a
+#   cache shared by all workers (TASKFLOW_CACHE_DIR) so a session ended by
+#   one worker is not still cached by another; `manage.py check` warns
+#   without one.
+# - cache: cache only; sessions are lost when the cache is cleared. Needs
+#   TASKFLOW_CACHE_DIR: with the default per-process memory cache a session
+#   exists in one worker only, so `manage.py check` (and runserver and
+#   migrate) fail with core.E001.
+# - signed_cookies: the session travels in the cookie; nothing is stored,
+#   but a copied cookie stays valid until it expires.
+# Expired database sessions are removed by `manage.py purge_sessions`.
+TASKFLOW_SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = TASKFLOW_SESSION_ENGINES[os.environ.get('TASKFLOW_SESSION_ENGINE', 'db')]
+
+# ============= Cache =============
+# Local memory by default. Point TASKFLOW_CACHE_DIR at a shared directory to
+# use the file backend so all workers see the same dashboard generations.
+if os.environ.get('TASKFLOW_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['TASKFLOW_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a serialized dashboard stays cached (see core/caching.py).
+TASKFLOW_DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('TASKFLOW_DASHBOARD_CACHE_TIMEOUT', '300'))
+
+# Task name -> id pairs each process keeps to skip the lookup when
+# assigning tasks (see core/interning.py).
+TASKFLOW_TASK_NAME_CACHE_SIZE = int(os.environ.get('TASKFLOW_TASK_NAME_CACHE_SIZE', '4096'))
+
+# Keep running open/done counts per team member for stats/ instead of
+# aggregating the team's tasks on every request. Run
+# `manage.py rebuild_task_stats` after turning it on.
+TASKFLOW_TASK_STATS_TABLE = os.environ.get('TASKFLOW_TASK_STATS_TABLE', 'False') == 'True'
+
+# ============= Request identity =============
+# Cache the resolved member/admin membership in the session (see
+# core/middleware.py). Requires a cache shared by all worker processes.
+TASKFLOW_IDENTITY_SESSION_CACHE = os.environ.get('TASKFLOW_IDENTITY_SESSION_CACHE', 'False') == 'True'
+
+# ============= Async views =============
+# Route csrf-token/, login/, view/ and dashboard/ to the async views in
+# core/async_views.py. taskflow/asgi.py turns this on by default.
+TASKFLOW_ASYNC_VIEWS = os.environ.get('TASKFLOW_ASYNC_VIEWS', 'False') == 'True'
+
+# ============= Delta sync =============
+# Days tombstones of removed assignments are kept for `?since=` clients.
+# `manage.py purge_tombstones` deletes older ones (run it daily); clients
+# holding a token from before then get a 410 and fetch the full list.
+TASKFLOW_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TASKFLOW_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# ============= Change events =============
+# Broker for the events/ push stream (see core/events.py): empty for
+# in-process only, or tcp://host:port of `manage.py run_event_broker` to
+# share events between worker processes.
+TASKFLOW_EVENT_BROKER = os.environ.get('TASKFLOW_EVENT_BROKER', '')
+
+# ============= Metrics =============
+# Per-route latency/SQL/size and repository timings served at /metrics in
+# the Prometheus text format (see core/metrics.py).
+TASKFLOW_METRICS = os.environ.get('TASKFLOW_METRICS', 'True') == 'True'
+
+# Required as `Authorization: Bearer <token>` on /metrics. While it is
+# empty /metrics answers 404 (samples are still recorded).
+TASKFLOW_METRICS_TOKEN = os.environ.get('TASKFLOW_METRICS_TOKEN', '')
+
+# Directory shared by all worker processes (e.g. gunicorn workers) so that
+# /metrics reports every worker, not just the one serving the scrape.
+TASKFLOW_METRICS_DIR = os.environ.get('TASKFLOW_METRICS_DIR') or None
+
+# ============= Deadline reminders =============
+# Where `manage.py scan_deadlines` sends its digests (TASKFLOW_DEADLINE_SINK):
+# one of these names or the dotted path of any Django e-mail backend.
+# - console (default): printed to stdout.
+# - file: one file per run under EMAIL_FILE_PATH.
+# - locmem: kept in django.core.mail.outbox (tests, benchmarks).
+# - smtp: EMAIL_HOST/EMAIL_PORT and friends.
+TASKFLOW_DEADLINE_SINKS = {
+    'console': 'django.core.mail.backends.console.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+    'smtp': 'django.core.mail.backends.smtp.EmailBackend',
+}
+TASKFLOW_DEADLINE_SINK = os.environ.get('TASKFLOW_DEADLINE_SINK', 'console')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', str(BASE_DIR / 'sent_mail'))
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'taskflow@localhost')
+
 # ============= Security settings for production =============
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
+    # Scrapers usually talk plain HTTP to the worker.
+    SECURE_REDIRECT_EXEMPT = [r'^metrics$']
     SECURE_HSTS_SECONDS = 31536000
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True